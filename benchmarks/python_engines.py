@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Python highlighting engines
+
+Lexes every sample file with the stdlib ``tokenize`` engine and with
+Pygments' PythonLexer, the way the highlighter does (into a token index of
+scopes), and reports throughput plus how many characters get the same
+scope from both.
+
+Usage:
+    python benchmarks/python_engines.py [--repeat N] [extra files...]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import zipfile
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+
+from copywork.incremental import lex_document  # noqa: E402
+from copywork.lexers import PYTHON_ENGINES  # noqa: E402
+from copywork.syntax_highlighter import scope_for_token  # noqa: E402
+
+SAMPLE_PATTERNS = ['tests/data/*.txt', 'tests/data/*.cw', 'examples/*.py']
+
+
+def sample_files(extra):
+    """Return the default sample files followed by ``extra``"""
+    files = []
+    for pattern in SAMPLE_PATTERNS:
+        files.extend(sorted(glob.glob(os.path.join(project_root, pattern))))
+    return files + list(extra)
+
+
+def read_sample(path):
+    """Return the text of a sample, unpacking .cw archives"""
+    if path.endswith('.cw'):
+        with zipfile.ZipFile(path) as archive:
+            return archive.read('content.txt').decode('utf-8')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def create_lexer(engine):
+    """Instantiate the lexer of a PYTHON_ENGINES entry"""
+    module, class_name = PYTHON_ENGINES[engine]
+    __import__(module)
+    return getattr(sys.modules[module], class_name)()
+
+
+def time_lex(lexer, text, repeat):
+    """Best wall time of ``repeat`` lexes, and the last index"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index = lex_document(lexer, text, scope_for_token)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, index
+
+
+def char_scopes(index):
+    """Expand an index into one scope per character"""
+    scopes = [None] * len(index.text)
+    for start, end, scope in index.spans():
+        scopes[start:end] = [scope] * (end - start)
+    return scopes
+
+
+def main():
+    """Run the benchmark and print one row per file"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per file and engine')
+    parser.add_argument('files', nargs='*', help='additional files to include')
+    args = parser.parse_args()
+
+    lexers = {engine: create_lexer(engine) for engine in ('pygments', 'tokenize')}
+    print(f"{'file':32} {'chars':>8} {'pygments':>10} {'tokenize':>10} {'speedup':>8} {'same scope':>11}")
+
+    total_chars = total_same = 0
+    total_time = {engine: 0.0 for engine in lexers}
+    for path in sample_files(args.files):
+        text = read_sample(path)
+        times, indexes = {}, {}
+        for engine, lexer in lexers.items():
+            times[engine], indexes[engine] = time_lex(lexer, text, args.repeat)
+            total_time[engine] += times[engine]
+
+        expected = char_scopes(indexes['pygments'])
+        actual = char_scopes(indexes['tokenize'])
+        same = sum(1 for a, b in zip(expected, actual) if a == b)
+        total_chars += len(text)
+        total_same += same
+
+        print(f"{os.path.basename(path)[:32]:32} {len(text):8} "
+              f"{times['pygments'] * 1000:8.2f}ms {times['tokenize'] * 1000:8.2f}ms "
+              f"{times['pygments'] / times['tokenize']:7.2f}x "
+              f"{100 * same / max(len(text), 1):10.3f}%")
+
+    print('-' * 84)
+    print(f"{'total':32} {total_chars:8} "
+          f"{total_time['pygments'] * 1000:8.2f}ms {total_time['tokenize'] * 1000:8.2f}ms "
+          f"{total_time['pygments'] / total_time['tokenize']:7.2f}x "
+          f"{100 * total_same / max(total_chars, 1):10.3f}%")
+    for engine, seconds in total_time.items():
+        print(f"{engine}: {total_chars / seconds / 1e6:.2f} M chars/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
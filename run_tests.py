@@ -51,6 +51,27 @@ def main():
         'tests/unit/test_practice_mode_highlighting.py',
         'tests/unit/test_backspace_behavior.py',
         'tests/unit/test_all_text_washed.py',
+        'tests/unit/test_token_index.py',
+        'tests/unit/test_incremental_lexing.py',
+        'tests/unit/test_range_set.py',
+        'tests/unit/test_highlight_worker.py',
+        'tests/unit/test_highlight_scheduler.py',
+        'tests/unit/test_tag_batch.py',
+        'tests/unit/test_lexers.py',
+        'tests/unit/test_token_cache.py',
+        'tests/unit/test_python_tokenize.py',
+        'tests/unit/test_render_state.py',
+        'tests/unit/test_compiled_theme.py',
+        'tests/unit/test_practice_session.py',
+        'tests/unit/test_keystroke_log.py',
+        'tests/unit/test_replay.py',
+        'tests/unit/test_wpm_window.py',
+        'tests/unit/test_typing_activity.py',
+        'tests/unit/test_typing_stats.py',
+        'tests/unit/test_render_queue.py',
+        'tests/unit/test_line_index.py',
+        'tests/unit/test_cw_archive.py',
+        'tests/unit/test_progress_format.py',
         'tests/unit/test_requirements.py',
     ]
     
@@ -3,16 +3,26 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 import tkinter.font as tkfont
 import json
-from datetime import datetime, timedelta
+import time
 import sys  # Import sys module for command line arguments
-import zipfile  # For creating and reading .cw files
-import os  # For file operations
-import tempfile  # For temporary files
+
+from .practice_session import CORRECT, INCORRECT, PracticeSession
+from .keystroke_log import KEYSTROKE_LOG_NAME, dump_keystroke_log, load_keystroke_log
+from .cw_archive import CwReader, write_cw_archive
+from .progress_format import (COLORS_NAME, COMPRESSION_NAMES, COMPRESSION_ZLIB,
+                              PROGRESS_FORMAT_VERSION, PROGRESS_NAME, PROGRESS_TAGS,
+                              dump_progress, is_progress_data, load_progress,
+                              states_from_colors)
+from .token_cache import content_hash
+from .render_queue import FRAME_NS, PendingChanges
+from .tag_batch import TagBatch, remove_tags
+from .replay import SessionReplay
+from .typing_activity import IDLE_TIMEOUT_NS, TypingActivity
+from .wpm_window import WpmMeter
 
 # Import syntax highlighting modules
 try:
     from pygments import highlight
-    from pygments.lexers import PythonLexer
     from pygments.token import Token
     PYGMENTS_AVAILABLE = True
 except ImportError:
@@ -23,6 +33,9 @@ except ImportError:
 try:
     from .theme_loader import ThemeLoader
     from .syntax_highlighter import SyntaxHighlighter
+    from .token_cache import TOKEN_CACHE_NAME
+    from .lexers import DEFAULT_PYTHON_ENGINE, set_python_engine
+    from .settings import Settings
     SYNTAX_MODULES_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Could not import syntax highlighting modules: {e}")
@@ -30,21 +43,29 @@ except ImportError as e:
 
 # Global variables
 current_mode = "edit"  # "edit" or "practice"
-current_position = "1.0"
-wpm_timer = datetime.now()
-wpm_counter = 0
-wpm_10s_avg = 0
-wpm_max = 0  # Track max WPM
-correct_chars = 0  # Track total correct characters
-incorrect_chars = 0  # Track total incorrect characters
-session_start_time = None  # When active typing started
-session_chars = 0  # Characters typed in active session
-session_typing_duration = 0  # Total active typing duration in seconds
-last_typed_time = None  # Time of last keystroke
-is_typing_active = False  # Flag to track if typing is currently active
+practice_session = PracticeSession()  # Target text, cursor and accuracy counters
+wpm_meter = WpmMeter()  # Sliding-window WPM of correct characters
+wpm_text = None  # Text last shown by the WPM label
+accuracy_text = None  # Text last shown by the accuracy label
+typing_activity = TypingActivity()  # Active typing time and session average
+activity_job = None  # Pending after() callback refreshing the practice figures
+pending_changes = PendingChanges()  # Practice changes not drawn yet
+render_job = None  # Pending after() callback drawing them
+last_render_ns = 0  # When they were last drawn
+stats_window = None  # Window showing the typing statistics, if open
+stats_label = None  # Label holding the statistics in that window
+stats_text = None  # Text last shown by the statistics label
 current_file_path = None  # Track the currently open file
 
+# Session replay globals
+session_replay = None  # SessionReplay being shown, if any
+replay_state = None  # Progress of the replay so far
+replay_speed = 1  # Replay speed relative to the recorded session
+replay_job = None  # Pending after() callback of the replay
+replay_saved = None  # Live progress to put back when the replay stops
+
 # Syntax highlighting globals
+settings = None
 theme_loader = None
 syntax_highlighter = None
 
@@ -89,52 +110,99 @@ def save_file():
         if file_path:
             handle_file_save(file_path)
 
-def collect_color_data():
-    """Helper function to collect color tag ranges from the text area"""
-    color_data = {
-        "correct": [],
-        "incorrect": []
-    }
-    
-    # Get all ranges with "correct" tag
-    correct_ranges = text_area.tag_ranges("correct")
-    for i in range(0, len(correct_ranges), 2):
-        start = text_area.index(correct_ranges[i])
-        end = text_area.index(correct_ranges[i+1])
-        color_data["correct"].append((start, end))
-    
-    # Get all ranges with "incorrect" tag
-    incorrect_ranges = text_area.tag_ranges("incorrect")
-    for i in range(0, len(incorrect_ranges), 2):
-        start = text_area.index(incorrect_ranges[i])
-        end = text_area.index(incorrect_ranges[i+1])
-        color_data["incorrect"].append((start, end))
-    
-    return color_data
+def collect_progress():
+    """Helper function to bring the practice states up to date for saving"""
+    # Draw any keystrokes still waiting for a frame
+    if render_job is not None:
+        flush_render()
+    sync_progress()
+    return practice_session.states
+
+def sync_progress():
+    """Practice on the text in the widget, keeping the progress it shows
+
+    The states are the record of progress, but edits move the progress
+    tags along with the text; after an edit the states are rebuilt from
+    the tags, once.
+    """
+    text = text_area.get("1.0", "end-1c")
+    if text == practice_session.text:
+        return
+    practice_session.set_text(text, shared_line_index(text))
+    for tag, state in PROGRESS_TAGS:
+        ranges = text_area.tag_ranges(tag)
+        for i in range(0, len(ranges), 2):
+            practice_session.mark(practice_session.offset_of(str(ranges[i])),
+                                  practice_session.offset_of(str(ranges[i + 1])), state)
+
+def shared_line_index(text):
+    """The token index's line index if it is one of ``text`` (None otherwise)
+
+    Once shared, re-lexing edits that index along with the text, so a
+    practice session started on the edited text can keep using it.
+    """
+    index = syntax_highlighter.token_index if syntax_highlighter else None
+    return index.shared_lines(text) if index is not None else None
+
+def share_line_index():
+    """Let the practice session and the token index use one line index"""
+    index = syntax_highlighter.token_index if syntax_highlighter else None
+    # The token index is lexed with Tk's trailing newline, the session without it
+    if index is not None and index.holds(practice_session.text):
+        index.share_lines(practice_session.lines)
+
+def draw_progress():
+    """Tag a freshly loaded text from the practice states, one Tk call per tag"""
+    batch = TagBatch()
+    for tag, state in PROGRESS_TAGS:
+        for start, end in practice_session.progress_runs(state):
+            batch.add(tag, start, end)
+    batch.flush(text_area, practice_session.lines.index_of)
+
+def restore_progress(states):
+    """Load saved practice states and draw them (None: nothing usable was saved)"""
+    if states is not None:
+        practice_session.states[:] = states
+    draw_progress()
+
+def read_color_file(data):
+    """Practice states stored in a .colors file, v2 binary or v1 JSON"""
+    if is_progress_data(data):
+        return load_progress(data, practice_session.text)
+    return states_from_colors(json.loads(data), practice_session.lines)
 
 def save_to_cw_file(file_path):
     """Save text content and color data to a .cw zip archive"""
     try:
-        # Create a temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save text content to a temporary file
-            text_file_path = os.path.join(temp_dir, "content.txt")
-            with open(text_file_path, 'w', encoding='utf-8') as text_file:
-                text_file.write(text_area.get(1.0, tk.END))
-            
-            # Collect color data using the helper function
-            color_data = collect_color_data()
-            
-            # Save color data to a temporary file
-            color_file_path = os.path.join(temp_dir, "colors.json")
-            with open(color_file_path, 'w', encoding='utf-8') as color_file:
-                json.dump(color_data, color_file)
-            
-            # Create a zip archive containing both files
-            with zipfile.ZipFile(file_path, 'w') as zip_file:
-                zip_file.write(text_file_path, arcname="content.txt")
-                zip_file.write(color_file_path, arcname="colors.json")
-        
+        text = text_area.get(1.0, "end-1c")
+
+        # Collect the practice states using the helper function
+        states = collect_progress()
+
+        members = {
+            "content.txt": text.encode('utf-8'),
+            PROGRESS_NAME: dump_progress(states, text),
+            # Record the format and the highlighting language so they survive any file name
+            "manifest.json": json.dumps({
+                "format": PROGRESS_FORMAT_VERSION,
+                "content_hash": content_hash(text),
+                "compression": COMPRESSION_NAMES[COMPRESSION_ZLIB],
+                "language": syntax_highlighter.language if syntax_highlighter else None,
+            }).encode('utf-8'),
+        }
+
+        # Save the keystrokes typed against this text
+        if len(practice_session.log) and practice_session.text == text:
+            members[KEYSTROKE_LOG_NAME] = dump_keystroke_log(practice_session.log)
+
+        # Save the token table so reopening the archive needs no lexing
+        token_data = syntax_highlighter.export_token_cache() if syntax_highlighter else None
+        if token_data is not None:
+            members[TOKEN_CACHE_NAME] = token_data
+
+        # Written from memory and renamed over the old archive in one step
+        write_cw_archive(file_path, members)
+
         # Show success message
         messagebox.showinfo("Save Successful", f"File saved to {file_path}")
     
@@ -145,16 +213,17 @@ def save_to_txt_file(file_path):
     """Save text content and color data to separate .txt and .colors files"""
     try:
         # Save text content
+        text = text_area.get(1.0, "end-1c")
         with open(file_path, 'w', encoding='utf-8') as text_file:
-            text_file.write(text_area.get(1.0, tk.END))
+            text_file.write(text)
         
-        # Collect color data using the helper function
-        color_data = collect_color_data()
+        # Collect the practice states using the helper function
+        states = collect_progress()
         
-        # Save color data to a companion file
+        # Save the progress to a companion file
         color_file_path = file_path + ".colors"
-        with open(color_file_path, 'w', encoding='utf-8') as color_file:
-            json.dump(color_data, color_file)
+        with open(color_file_path, 'wb') as color_file:
+            color_file.write(dump_progress(states, text))
         
         # Show success message
         messagebox.showinfo("Save Successful", f"File saved to {file_path}")
@@ -165,15 +234,24 @@ def save_to_txt_file(file_path):
 def open_file(file_path):
     global current_file_path
 
+    stop_replay()
     try:
+        # Only .cw archives carry a language hint
+        if syntax_highlighter:
+            syntax_highlighter.language_hint = None
+
         # Check if file is a .cw or .py.cw file
         if file_path.lower().endswith(('.cw', '.py.cw')):
             open_cw_file(file_path)
         else:
             # Handle .txt, .py, and other text files
             with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+                discard_pending_work()
                 text_area.delete(1.0, tk.END)
-                text_area.insert(tk.END, file.read())
+                text_area.insert(tk.END, content)
+            practice_session.set_text(content, shared_line_index(content))
+            typing_activity.reset()
 
             # Set the current file path
             current_file_path = file_path
@@ -181,16 +259,8 @@ def open_file(file_path):
             # Try to load color information from companion file
             color_file_path = file_path + ".colors"
             try:
-                with open(color_file_path, 'r', encoding='utf-8') as color_file:
-                    color_data = json.load(color_file)
-
-                    # Apply "correct" tags
-                    for start, end in color_data["correct"]:
-                        text_area.tag_add("correct", start, end)
-
-                    # Apply "incorrect" tags
-                    for start, end in color_data["incorrect"]:
-                        text_area.tag_add("incorrect", start, end)
+                with open(color_file_path, 'rb') as color_file:
+                    restore_progress(read_color_file(color_file.read()))
             except FileNotFoundError:
                 # No color data file exists, that's okay
                 pass
@@ -198,6 +268,7 @@ def open_file(file_path):
         # Apply syntax highlighting if it's a Python file
         if syntax_highlighter and current_file_path:
             syntax_highlighter.highlight_text(current_file_path)
+            share_line_index()
 
     except FileNotFoundError:
         messagebox.showerror("Error", f"File not found: {file_path}")
@@ -209,36 +280,57 @@ def open_cw_file(file_path):
     global current_file_path
     
     try:
-        # Create a temporary directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Extract the zip archive
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                # Validate required files exist
-                file_list = zip_file.namelist()
-                if 'content.txt' not in file_list:
-                    raise ValueError("Invalid .cw file: missing content.txt")
-                if 'colors.json' not in file_list:
-                    raise ValueError("Invalid .cw file: missing colors.json")
-                zip_file.extractall(temp_dir)
+        # Read the members straight from the archive; nothing is extracted
+        with CwReader(file_path) as archive:
+            # Archives from older versions have no manifest and store colors.json
+            manifest = archive.read_json("manifest.json") if "manifest.json" in archive else {}
+            progress_format = manifest.get("format", 1)
+            if progress_format > PROGRESS_FORMAT_VERSION:
+                raise ValueError("This .cw file was saved by a newer version of CoPywork")
+            progress_name = PROGRESS_NAME if progress_format >= 2 else COLORS_NAME
+
+            # Validate required files exist
+            if 'content.txt' not in archive:
+                raise ValueError("Invalid .cw file: missing content.txt")
+            if progress_name not in archive:
+                raise ValueError(f"Invalid .cw file: missing {progress_name}")
+
+            # Load text content in chunks, letting the window paint between them;
+            # the first chunk is decoded before the old text is cleared
+            text_chunks = archive.iter_text("content.txt")
+            chunks = [next(text_chunks, "")]
+            discard_pending_work()
+            text_area.delete(1.0, tk.END)
+            text_area.insert(tk.END, chunks[0])
+            for chunk in text_chunks:
+                app.update_idletasks()
+                text_area.insert(tk.END, chunk)
+                chunks.append(chunk)
+            content = "".join(chunks)
+            practice_session.set_text(content, shared_line_index(content))
+            typing_activity.reset()
             
-            # Load text content
-            text_file_path = os.path.join(temp_dir, "content.txt")
-            with open(text_file_path, 'r', encoding='utf-8') as text_file:
-                text_area.delete(1.0, tk.END)
-                text_area.insert(tk.END, text_file.read())
-            
-            # Load color data
-            color_file_path = os.path.join(temp_dir, "colors.json")
-            with open(color_file_path, 'r', encoding='utf-8') as color_file:
-                color_data = json.load(color_file)
-                
-                # Apply "correct" tags
-                for start, end in color_data["correct"]:
-                    text_area.tag_add("correct", start, end)
-                
-                # Apply "incorrect" tags
-                for start, end in color_data["incorrect"]:
-                    text_area.tag_add("incorrect", start, end)
+            # Restore the practice states, then draw them in one call per tag;
+            # v2 progress saved for a different content.txt is dropped
+            if progress_format >= 2:
+                restore_progress(load_progress(archive.read(PROGRESS_NAME), content))
+            else:
+                restore_progress(states_from_colors(archive.read_json(COLORS_NAME),
+                                                    practice_session.lines))
+
+            # Load the highlighting language
+            if syntax_highlighter:
+                syntax_highlighter.language_hint = manifest.get("language")
+
+            # Load the keystrokes typed so far (archives from older versions have none)
+            if KEYSTROKE_LOG_NAME in archive:
+                keystroke_log = load_keystroke_log(archive.read(KEYSTROKE_LOG_NAME))
+                if keystroke_log is not None:
+                    practice_session.set_log(keystroke_log)
+
+            # Load the token table; it is only used if content.txt still matches
+            if syntax_highlighter and TOKEN_CACHE_NAME in archive:
+                syntax_highlighter.preload_token_cache(archive.read(TOKEN_CACHE_NAME))
         
         # Set the current file path
         current_file_path = file_path
@@ -266,212 +358,378 @@ def open_file_from_cmdline(file_path):
     open_file(file_path)
 
 def toggle_mode():
-    global current_mode, current_position, wpm_timer, wpm_counter
+    global current_mode
 
     if current_mode == "edit":
         current_mode = "practice"
         mode_label.config(text="Mode: Practice")
         text_area.config(state=tk.DISABLED)
         # Reset WPM tracking when entering practice mode
-        wpm_timer = datetime.now()
-        wpm_counter = 0
+        wpm_meter.reset()
 
-        # Save current cursor position before switching modes
-        current_position = text_area.index("insert")
-        text_area.mark_set("insert", current_position)
+        # Practice on the current text from the cursor position
+        sync_progress()
+        share_line_index()
+        practice_session.move_to_index(text_area.index("insert"))
+        text_area.mark_set("insert", practice_session.cursor_index)
 
-        # Apply washed-out syntax highlighting for practice mode
+        # Switch syntax highlighting to the washed-out palette for practice mode
         if syntax_highlighter and current_file_path:
-            syntax_highlighter.highlight_text_practice_mode(current_file_path)
+            syntax_highlighter.set_washed_out(True)
 
         # Don't remove color tags anymore
         app.bind("<Key>", check_typing)
         text_area.bind("<Button-1>", set_cursor_position)
     else:
+        stop_replay()
+        stop_activity()
+        if render_job is not None:
+            flush_render()
         current_mode = "edit"
         mode_label.config(text="Mode: Edit")
         text_area.config(state=tk.NORMAL)
 
-        # Restore normal syntax highlighting for edit mode
+        # Restore the normal syntax palette for edit mode
         if syntax_highlighter and current_file_path:
-            syntax_highlighter.highlight_text(current_file_path)
+            syntax_highlighter.set_washed_out(False)
 
         app.unbind("<Key>")
         text_area.unbind("<Button-1>")
 
-def update_10s_wpm(delta_t):
-    global wpm_timer, wpm_counter, wpm_10s_avg, wpm_max
-    wpm_10s_avg = (wpm_counter / delta_t) * 60 / 5  # Divide by 5 chars per word
-    
-    # Update max WPM if current 10s average is higher
-    if wpm_10s_avg > wpm_max:
-        wpm_max = wpm_10s_avg
-    
-    # Calculate accuracy
-    total_chars = correct_chars + incorrect_chars
-    accuracy = (correct_chars / total_chars * 100) if total_chars > 0 else 100
-    
-    # Calculate session average if typing is active
-    session_avg = 0
-    if session_typing_duration > 0:
-        session_avg = (session_chars / session_typing_duration) * 60 / 5
-    
-    # Update the WPM and accuracy displays
-    wpm_label.config(text=f'10s: {wpm_10s_avg:.1f} | Avg: {session_avg:.1f} | Max: {wpm_max:.1f} WPM')
-    accuracy_label.config(text=f'Accuracy: {accuracy:.1f}%')
-    
-    wpm_counter = 0
-    wpm_timer = datetime.now()
+def wpm_display_text(now_ns=None):
+    """Text of the WPM label: every sliding window, the session average and the max"""
+    windows = ' | '.join(f'{seconds:g}s: {wpm:.1f}'
+                         for seconds, wpm in zip(wpm_meter.seconds, wpm_meter.wpm(now_ns)))
+    return f'{windows} | Avg: {typing_activity.wpm:.1f} | Max: {wpm_meter.max_wpm:.1f} WPM'
+
+def update_wpm_display(now_ns=None):
+    """Show the current WPM and accuracy, touching a label only when its text changed"""
+    global wpm_text, accuracy_text
+    text = wpm_display_text(now_ns)
+    if text != wpm_text:
+        wpm_text = text
+        wpm_label.config(text=text)
+
+    text = f'Accuracy: {practice_session.accuracy:.1f}%'
+    if text != accuracy_text:
+        accuracy_text = text
+        accuracy_label.config(text=text)
+
+def format_latency(latency_ns):
+    """Show a latency in milliseconds"""
+    return '-' if latency_ns is None else f'{latency_ns / 1_000_000:.0f} ms'
+
+def stats_display_text():
+    """Text of the statistics window: latencies, slow characters and bigrams, error-prone bigrams"""
+    stats = practice_session.stats
+    lines = [
+        f'Timed keystrokes: {len(stats.latency)}',
+        f'Median latency:   {format_latency(stats.latency.quantile(0.5))}',
+        f'95th percentile:  {format_latency(stats.latency.quantile(0.95))}',
+        '',
+        'Slowest characters:',
+    ]
+    lines += [f'  {name:<4} {format_latency(median)}'
+              for name, median in stats.slowest_chars()] or ['  -']
+    lines += ['', 'Slowest bigrams:']
+    lines += [f'  {stat.bigram:<4} {format_latency(stat.mean_ns)}  ({stat.count}x)'
+              for stat in stats.slowest_bigrams()] or ['  -']
+    lines += ['', 'Error-prone bigrams:']
+    lines += [f'  {stat.bigram:<4} {stat.error_rate * 100:.0f}% wrong  ({stat.count}x)'
+              for stat in stats.error_prone_bigrams()] or ['  -']
+    return '\n'.join(lines)
+
+def update_stats_window():
+    """Show the current statistics if the statistics window is open"""
+    global stats_text
+    if stats_window is None:
+        return
+    text = stats_display_text()
+    if text != stats_text:
+        stats_text = text
+        stats_label.config(text=text)
+
+def show_stats_window():
+    """Open the statistics window, or bring it to the front"""
+    global stats_window, stats_label, stats_text
+    if stats_window is not None:
+        stats_window.lift()
+        return
+
+    stats_window = tk.Toplevel(app)
+    stats_window.title("Typing Stats")
+    stats_window.protocol("WM_DELETE_WINDOW", close_stats_window)
+    stats_label = tk.Label(stats_window, font=('Fira Code', 11), justify='left', anchor='nw')
+    stats_label.pack(expand=1, fill='both', padx=10, pady=10)
+    stats_text = None
+    update_stats_window()
+
+def close_stats_window():
+    """Close the statistics window"""
+    global stats_window, stats_label
+    stats_window.destroy()
+    stats_window = stats_label = None
+
+def record_activity(now_ns, correct):
+    """Count a practice keystroke made at ``now_ns`` and refresh the figures"""
+    global activity_job
+    typing_activity.keystroke(now_ns, correct)
+    if correct:
+        wpm_meter.record(now_ns)
+
+    # One refresh loop per burst of typing, armed by its first keystroke
+    if activity_job is None:
+        activity_job = app.after(250, check_activity)
+
+def check_activity():
+    """Refresh the practice figures as the WPM windows slide
+
+    Runs every 250 ms while the user is typing, and keeps going after they
+    stop only until the windows have emptied; then it stops until the next
+    keystroke, so nothing is polled while the user is not practicing.
+    """
+    global activity_job
+    now_ns = time.perf_counter_ns()
+
+    # The labels show the replay's figures while one is running
+    if session_replay is None:
+        update_wpm_display(now_ns)
+        update_stats_window()
+
+    if current_mode == "practice" and not (typing_activity.is_idle(now_ns)
+                                           and wpm_meter.is_empty(now_ns)):
+        activity_job = app.after(250, check_activity)
+    else:
+        activity_job = None
 
-def check_typing_activity():
-    """Check if typing has been inactive for 5 seconds"""
-    global is_typing_active, last_typed_time, session_typing_duration
-    
-    current_time = datetime.now()
-    
-    # If typing is active but no keystrokes for 5 seconds
-    if is_typing_active and last_typed_time:
-        inactive_time = (current_time - last_typed_time).total_seconds()
-        if inactive_time >= 5:
-            # Pause the session timer
-            is_typing_active = False
-            # remove previous 5 seconds from the duration
-            if session_typing_duration >= 5:
-                session_typing_duration -= 5
-            else:
-                session_typing_duration = 0
-        elif session_start_time:
-            session_typing_duration += 1
-            # Don't reset session_start_time so we can resume
-    
-    # Schedule this function to run again in 1 second
-    app.after(1000, check_typing_activity)
+def stop_activity():
+    """Cancel the refresh loop of the practice figures"""
+    global activity_job
+    if activity_job is not None:
+        app.after_cancel(activity_job)
+        activity_job = None
+
+def check_theme_file():
+    """Apply changes to the theme file without restarting"""
+    if syntax_highlighter and theme_loader.has_changed():
+        syntax_highlighter.reload_theme()
 
-def check_wpm_timer():
-    """Check if 10 seconds have passed and update WPM if needed"""
-    global wpm_timer
-    current_time = datetime.now()
-    delta_t = (current_time - wpm_timer).total_seconds()
-    
-    if delta_t >= 10:
-        update_10s_wpm(delta_t)
-    
     # Schedule this function to run again in 1 second
-    app.after(1000, check_wpm_timer)
+    app.after(1000, check_theme_file)
 
 def check_typing(event):
-    global current_position, wpm_counter, correct_chars, incorrect_chars
-    global session_start_time, session_chars, last_typed_time, is_typing_active
-    
-    # Update typing activity tracking
-    current_time = datetime.now()
-    last_typed_time = current_time
-    
-    # If this is the first keystroke or resuming after pause
-    if not is_typing_active:
-        is_typing_active = True
-        session_start_time = current_time
-    
+    # Any key stops a running replay
+    if session_replay is not None:
+        stop_replay()
+        return "break"
+
+    # One monotonic timestamp for the log, the WPM windows and the typing time
+    now_ns = time.perf_counter_ns()
+
     # Handle backspace
     if event.keysym == 'BackSpace':
-        # Get previous position
-        line, col = current_position.split('.')
-        if int(col) > 0:
-            # Move back one character in the same line
-            current_position = f"{line}.{int(col)-1}"
-        elif int(line) > 1:
-            # Move to the end of the previous line
-            prev_line = int(line) - 1
-            prev_line_length = len(text_area.get(f"{prev_line}.0", f"{prev_line}.end"))
-            current_position = f"{prev_line}.{prev_line_length}"
-        
-        # Remove any color tags from the character
-        text_area.tag_remove("correct", current_position)
-        text_area.tag_remove("incorrect", current_position)
-
-        # If we have syntax highlighting, restore washed-out color for this position only
-        if syntax_highlighter and current_file_path:
-            # Restore washed-out syntax highlighting for just this position
-            syntax_highlighter.restore_washed_color_at_position(current_position, current_file_path)
-        
-        # Move cursor to the new position
-        text_area.mark_set("insert", current_position)
+        change = practice_session.backspace(now_ns)
+        if change is not None:
+            pending_changes.add(change)
+        record_activity(now_ns, False)
+        schedule_render()
         return "break"
     
     if event.char and event.keysym not in ('Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R'):
-        # Get the character at current position
-        expected_char = text_area.get(current_position)
-        
-        # Skip newlines and move to next character
-        if expected_char == '\n':
-            line, col = current_position.split('.')
-            current_position = f"{int(line)+1}.0"
-            text_area.mark_set("insert", current_position)
-            return "break"
-            
-        # Check if typed character matches expected character
-        if event.char == expected_char:
-            # Remove any existing syntax highlighting tags and apply correct color
-            if syntax_highlighter and current_file_path:
-                syntax_highlighter.apply_incorrect_color_at_position(current_position)
-                # Restore normal syntax highlighting for this position
-                syntax_highlighter.restore_normal_color_at_position(current_position, current_file_path)
-
-            # Apply green color to the character
-            text_area.tag_add("correct", current_position)
-            # Add one to the character counter
-            wpm_counter += 1
-            correct_chars += 1
-            session_chars += 1
-        else:
-            # Remove any existing syntax highlighting tags and apply incorrect color
-            if syntax_highlighter and current_file_path:
-                syntax_highlighter.apply_incorrect_color_at_position(current_position)
-
-            # Apply red color to the character
-            text_area.tag_add("incorrect", current_position)
-            incorrect_chars += 1
-        
-        # Move to next character
-        line, col = current_position.split('.')
-        current_position = f"{line}.{int(col)+1}"
-        text_area.mark_set("insert", current_position)
+        change = practice_session.type_char(event.char, now_ns)
+        if change is not None:
+            pending_changes.add(change)
+        record_activity(now_ns, change is not None and change.state == CORRECT)
+        schedule_render()
     
     return "break"  # Prevent default handling (to prevent normal text editing)
 
+def schedule_render():
+    """Draw the keystrokes made so far once Tk is idle, at most once per frame"""
+    global render_job
+    if render_job is not None:
+        return
+    wait_ns = last_render_ns + FRAME_NS - time.perf_counter_ns()
+    if wait_ns > 0:
+        render_job = app.after(wait_ns // 1_000_000 + 1, flush_render)
+    else:
+        render_job = app.after_idle(flush_render)
+
+def flush_render():
+    """Apply the widget changes of every keystroke since the last frame"""
+    global render_job, last_render_ns
+    if render_job is not None:
+        app.after_cancel(render_job)
+        render_job = None
+    last_render_ns = time.perf_counter_ns()
+
+    for change in pending_changes.drain():
+        render_change(change)
+
+    # Move the cursor to the next character (newlines are skipped)
+    text_area.mark_set("insert", practice_session.cursor_index)
+    if syntax_highlighter:
+        syntax_highlighter.ensure_highlighted_around(practice_session.line)
+    update_wpm_display(last_render_ns)
+
+def discard_render():
+    """Drop the widget changes not drawn yet (the text or its colors were replaced)"""
+    global render_job
+    if render_job is not None:
+        app.after_cancel(render_job)
+        render_job = None
+    pending_changes.clear()
+
+def discard_pending_work():
+    """Cancel every job queued for the current document before it is replaced
+
+    Frames and highlight jobs queued for the old text would otherwise tag the
+    new one at stale offsets while it is loading.
+    """
+    discard_render()
+    if syntax_highlighter:
+        syntax_highlighter.cancel_pending()
+
+def render_change(change):
+    """Show the practice state of the character a keystroke changed"""
+    position, offset = change.index, change.offset
+    if change.state == CORRECT:
+        # Remove any existing syntax highlighting tags and apply correct color
+        if syntax_highlighter and current_file_path:
+            syntax_highlighter.apply_incorrect_color_at_position(position, offset)
+            # Restore normal syntax highlighting for this position
+            syntax_highlighter.restore_normal_color_at_position(position, current_file_path, offset)
+
+        # Apply green color to the character
+        text_area.tag_add("correct", position)
+    elif change.state == INCORRECT:
+        # Remove any existing syntax highlighting tags and apply incorrect color
+        if syntax_highlighter and current_file_path:
+            syntax_highlighter.apply_incorrect_color_at_position(position, offset)
+
+        # Apply red color to the character
+        text_area.tag_add("incorrect", position)
+    else:
+        # Remove any color tags from the character
+        text_area.tag_remove("correct", position)
+        text_area.tag_remove("incorrect", position)
+
+        # Restore washed-out syntax highlighting for just this position
+        if syntax_highlighter and current_file_path:
+            syntax_highlighter.restore_washed_color_at_position(position, current_file_path, offset)
+
 def set_cursor_position(event):
-    global current_position
-    
     # Get the position where the user clicked
     index = text_area.index(f"@{event.x},{event.y}")
     
     # Update current position
-    current_position = index
+    practice_session.move_to_index(index)
     
     # Move cursor to the new position
-    text_area.mark_set("insert", current_position)
+    text_area.mark_set("insert", practice_session.cursor_index)
+
+    # Make sure the text around the new cursor is highlighted in lazy mode
+    if syntax_highlighter:
+        syntax_highlighter.ensure_highlighted_around(practice_session.line)
     
     return "break"
 
+def clear_progress():
+    """Remove the typing progress colors from the whole text"""
+    discard_render()
+    practice_session.clear_progress()
+    remove_tags(text_area, (tag for tag, _ in PROGRESS_TAGS))
+
+    # Typed characters fall back to the syntax palette of the current mode
+    if syntax_highlighter:
+        syntax_highlighter.clear_typed()
+
+def redraw_progress():
+    """Replace the progress the text shows with the practice states"""
+    discard_render()
+    remove_tags(text_area, (tag for tag, _ in PROGRESS_TAGS))
+    if syntax_highlighter:
+        syntax_highlighter.clear_typed()
+    draw_progress()
+    if syntax_highlighter:
+        syntax_highlighter.draw_typed(practice_session.progress_runs(CORRECT))
+
 def reset_colors():
     # Remove all color tags from the text
-    text_area.tag_remove("correct", "1.0", tk.END)
-    text_area.tag_remove("incorrect", "1.0", tk.END)
-
-    # Restore appropriate syntax highlighting based on current mode
-    if syntax_highlighter and current_file_path:
-        if current_mode == "practice":
-            syntax_highlighter.highlight_text_practice_mode(current_file_path)
-        else:
-            syntax_highlighter.highlight_text(current_file_path)
+    clear_progress()
 
     messagebox.showinfo("Reset", "All color formatting has been reset.")
 
+def start_replay(speed):
+    """Re-type the logged session in the text area at ``speed`` times real time"""
+    global session_replay, replay_state, replay_speed, replay_saved
+
+    stop_replay()
+    if current_mode == "edit":
+        toggle_mode()
+
+    try:
+        replay = SessionReplay(practice_session.text, practice_session.log)
+    except ValueError as e:
+        messagebox.showerror("Replay", f"Cannot replay this session: {e}")
+        return
+    if not len(replay):
+        messagebox.showinfo("Replay", "No keystrokes have been logged for this text yet.")
+        return
+
+    # The replay draws on a cleared text; the live progress is kept aside
+    replay_saved = practice_session.snapshot()
+    clear_progress()
+    session_replay = replay
+    replay_state = replay.state_after(0)
+    replay_speed = speed
+    replay_next()
+
+def replay_next():
+    """Render the next logged keystroke and schedule the one after it"""
+    global replay_job, wpm_text, accuracy_text
+
+    change = session_replay.apply(replay_state)
+    if change is not None:
+        render_change(change)
+    text_area.mark_set("insert", session_replay.lines.index_of(replay_state.offset))
+    wpm_label.config(text=f'Replay {replay_speed}x: {replay_state.wpm:.1f} WPM')
+    accuracy_label.config(text=f'Accuracy: {replay_state.accuracy:.1f}%')
+    wpm_text = accuracy_text = None
+
+    if replay_state.events == len(session_replay):
+        replay_job = None
+        stop_replay()
+        return
+
+    # Idle pauses are shortened to the idle timeout
+    gap = session_replay.log.times[replay_state.events] - replay_state.time_ns
+    delay = min(gap, IDLE_TIMEOUT_NS) / replay_speed / 1_000_000
+    replay_job = app.after(int(delay), replay_next)
+
+def stop_replay():
+    """Stop a running replay and show the live progress again"""
+    global session_replay, replay_job, replay_saved
+
+    if replay_job is not None:
+        app.after_cancel(replay_job)
+        replay_job = None
+    if session_replay is not None:
+        session_replay = None
+        # The replay may not cover all of the progress (older archives, edits
+        # that reset the log), so it is never adopted
+        practice_session.restore(replay_saved)
+        replay_saved = None
+        redraw_progress()
+        text_area.mark_set("insert", practice_session.cursor_index)
+        update_wpm_display()
+
 def on_text_change(event=None):
     """Handle text changes and trigger syntax highlighting"""
     if syntax_highlighter and current_file_path and current_mode == "edit":
-        # Schedule syntax highlighting to avoid blocking UI
-        app.after_idle(lambda: syntax_highlighter.highlight_text(current_file_path))
+        # Schedule syntax highlighting to avoid blocking UI; bursts of events
+        # share one job, and only the lines damaged by the edit are re-tagged
+        syntax_highlighter.schedule_update(current_file_path)
 
 def bind_shortcuts():
     """Bind keyboard shortcuts to functions"""
@@ -511,13 +769,17 @@ mode_label = tk.Label(frame, text="Mode: Edit")
 mode_label.pack(side='left')
 
 # WPM indicator
-wpm_label = tk.Label(frame, text=f'10s: {wpm_10s_avg:.1f} | Avg: 0.0 | Max: {wpm_max:.1f} WPM')
+wpm_label = tk.Label(frame, text=wpm_display_text())
 wpm_label.pack(side='right')
 
 # Accuracy indicator
 accuracy_label = tk.Label(frame, text='Accuracy: 100.0%')
 accuracy_label.pack(side='right', padx=(0, 10))
 
+# Latency and bigram statistics
+stats_button = tk.Button(frame, text="Stats", command=show_stats_window)
+stats_button.pack(side='right', padx=(0, 10))
+
 # Text area
 text_area = tk.Text(app, wrap='word', font=('Fira Code', 12), bg="#333333", fg="#C1E4F6")  # dark gray background
 text_area.pack(expand=1, fill='both')
@@ -529,6 +791,16 @@ text_area.tag_configure("incorrect", foreground="#FF0000")  # Bright red for inc
 # Initialize syntax highlighting
 if SYNTAX_MODULES_AVAILABLE:
     try:
+        settings = Settings()
+        python_engine = settings.get("python_engine")
+        if not set_python_engine(python_engine):
+            print(f"Warning: Unknown python_engine {python_engine!r}. Using {DEFAULT_PYTHON_ENGINE}.")
+        try:
+            wpm_meter = WpmMeter(settings.get("wpm_windows"))
+            wpm_label.config(text=wpm_display_text())
+        except ValueError as e:
+            print(f"Warning: {e}. Using the default windows.")
+
         theme_loader = ThemeLoader()
         syntax_highlighter = SyntaxHighlighter(text_area, theme_loader)
 
@@ -537,6 +809,12 @@ if SYNTAX_MODULES_AVAILABLE:
         text_area.bind('<Button-1>', on_text_change)
         text_area.bind('<ButtonRelease-1>', on_text_change)
 
+        # Very large files are highlighted lazily as they scroll into view
+        text_area.config(yscrollcommand=syntax_highlighter.on_view_changed)
+
+        # Incorrect characters show red above the syntax colors
+        text_area.tag_raise("incorrect")
+
     except Exception as e:
         print(f"Warning: Could not initialize syntax highlighting: {e}")
         theme_loader = None
@@ -559,6 +837,11 @@ menu_bar.add_cascade(label="File", menu=file_menu)
 mode_menu = tk.Menu(menu_bar, tearoff=0)
 mode_menu.add_command(label="Toggle Mode", command=toggle_mode)
 mode_menu.add_command(label="Reset Colors", command=reset_colors)
+mode_menu.add_separator()
+for speed in (1, 2, 4, 8):
+    mode_menu.add_command(label=f"Replay Session ({speed}x)",
+                          command=lambda speed=speed: start_replay(speed))
+mode_menu.add_command(label="Stop Replay", command=stop_replay)
 menu_bar.add_cascade(label="Mode", menu=mode_menu)
 
 app.config(menu=menu_bar)
@@ -577,8 +860,7 @@ def main():
         file_path = sys.argv[1]
         open_file(file_path)
 
-    app.after(1000, check_wpm_timer)
-    app.after(1000, check_typing_activity)
+    app.after(1000, check_theme_file)
     app.mainloop()
 
 if __name__ == "__main__":
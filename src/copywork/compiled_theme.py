@@ -0,0 +1,111 @@
+"""
+Compiled theme styles for CoPywork syntax highlighting
+"""
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+
+# Tag covering text without a scope, so the washed-out palette dims it too
+DEFAULT_TEXT_TAG = "default_text"
+
+# Share of the original color kept by the washed-out palette
+WASH_FACTOR = 0.3
+
+
+def _hex_to_rgb(hex_color: str) -> tuple:
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def _rgb_to_hex(rgb: tuple) -> str:
+    """Convert RGB tuple to hex color"""
+    return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+
+
+def wash_out_color(hex_color: str, background: str, wash_factor: float = WASH_FACTOR) -> str:
+    """Blend ``hex_color`` into ``background``, keeping ``wash_factor`` of it"""
+    fg_rgb = _hex_to_rgb(hex_color)
+    bg_rgb = _hex_to_rgb(background)
+    return _rgb_to_hex(tuple(
+        int(fg_rgb[i] * wash_factor + bg_rgb[i] * (1 - wash_factor))
+        for i in range(3)
+    ))
+
+
+def tag_for_scope(scope: Optional[str]) -> str:
+    """Name of the syntax tag for ``scope``"""
+    return f"syntax_{scope.replace('.', '_')}" if scope else DEFAULT_TEXT_TAG
+
+
+class TokenStyle(NamedTuple):
+    """Everything needed to tag one scope, resolved from the theme
+
+    ``foreground`` is the theme color (used by the typed overlay);
+    ``normal`` and ``washed`` are the two palettes of the syntax tag.
+    Text without a scope keeps the widget's own color (``normal`` empty)
+    in edit mode.
+    """
+    scope: Optional[str]
+    tag: str
+    foreground: str
+    normal: str
+    washed: str
+    bold: bool
+    italic: bool
+
+
+class CompiledTheme:
+    """Theme styles resolved once per scope and per token type
+
+    ``ThemeLoader`` answers style questions by walking scope strings; the
+    highlight loop asks the same few questions for every token. This table
+    keeps the answers: each token type maps straight to the ``TokenStyle``
+    of its scope. Known token types are compiled up front with
+    ``compile_tokens``; any other type is resolved once on first sight.
+    """
+
+    __slots__ = ('theme_loader', 'scope_for', 'background', 'default',
+                 '_scope_styles', '_token_styles')
+
+    def __init__(self, theme_loader, scope_for: Callable[[object], Optional[str]]):
+        self.theme_loader = theme_loader
+        self.scope_for = scope_for
+        self.background = theme_loader.get_editor_color("editor.background", "#333333")
+        self._scope_styles: Dict[Optional[str], TokenStyle] = {}
+        self._token_styles: Dict[object, TokenStyle] = {}
+        self.default = self.style(None)
+
+    def style(self, scope: Optional[str]) -> TokenStyle:
+        """Return the style of ``scope`` (None for text without a scope)"""
+        style = self._scope_styles.get(scope)
+        if style is None:
+            style = self._scope_styles[scope] = self._compile(scope)
+        return style
+
+    def _compile(self, scope: Optional[str]) -> TokenStyle:
+        """Resolve the style of ``scope`` through the theme loader"""
+        loader = self.theme_loader
+        if scope is None:
+            foreground = loader.get_editor_color("editor.foreground", "#C1E4F6")
+            return TokenStyle(None, DEFAULT_TEXT_TAG, foreground, "",
+                              wash_out_color(foreground, self.background), False, False)
+
+        foreground = loader.get_foreground_color(scope)
+        bold, italic = loader.get_font_style(scope)
+        return TokenStyle(scope, tag_for_scope(scope), foreground, foreground,
+                          wash_out_color(foreground, self.background), bold, italic)
+
+    def style_for_token(self, token_type) -> TokenStyle:
+        """Return the style of the scope ``token_type`` maps to"""
+        style = self._token_styles.get(token_type)
+        if style is None:
+            style = self._token_styles[token_type] = self.style(self.scope_for(token_type))
+        return style
+
+    def scope_for_token(self, token_type) -> Optional[str]:
+        """Return the scope ``token_type`` maps to"""
+        return self.style_for_token(token_type).scope
+
+    def compile_tokens(self, token_types: Iterable):
+        """Resolve ``token_types`` now instead of in the highlight loop"""
+        for token_type in token_types:
+            self.style_for_token(token_type)
@@ -0,0 +1,140 @@
+"""
+Reading and writing CoPywork .cw archives
+"""
+import io
+import json
+import os
+import tempfile
+import zipfile
+from typing import Dict, Iterator
+
+# Largest decompressed size accepted for one member, and for all members read
+MAX_MEMBER_SIZE = 128 * 1024 * 1024
+MAX_ARCHIVE_SIZE = 256 * 1024 * 1024
+
+# Characters of text decoded per chunk when streaming a member
+TEXT_CHUNK_SIZE = 256 * 1024
+
+
+def write_cw_archive(file_path: str, members: Dict[str, bytes]):
+    """Atomically replace ``file_path`` with a zip archive of ``members``
+
+    The members are written straight from memory into a temporary file
+    next to the target, which is flushed to disk and then renamed over
+    it. A crash or a full disk part-way through leaves the previous
+    archive untouched; readers only ever see the old file or the new one.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.",
+                                     suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            with zipfile.ZipFile(temp_file, 'w') as zip_file:
+                for name, data in members.items():
+                    zip_file.writestr(name, data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+
+        # mkstemp creates the file private to the user; keep the target's mode
+        try:
+            mode = os.stat(file_path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str):
+    """Make a rename in ``directory`` durable, where the platform allows it"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CwReader:
+    """Reads single members of a .cw archive straight from the zip
+
+    Nothing is extracted to disk and members nobody asks for are never
+    decompressed. Each member's decompressed size is checked against
+    ``max_member_size`` and the running total against ``max_archive_size``
+    before it is opened, so a zip bomb is refused up front; the zip reader
+    stops at the size it was given and fails the CRC check if the data
+    holds more, so the declared sizes can be trusted.
+    """
+
+    def __init__(self, file_path: str, max_member_size: int = MAX_MEMBER_SIZE,
+                 max_archive_size: int = MAX_ARCHIVE_SIZE):
+        self.zip_file = zipfile.ZipFile(file_path, 'r')
+        self.max_member_size = max_member_size
+        self.max_archive_size = max_archive_size
+        self.total_size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.zip_file.close()
+
+    def __contains__(self, name: str) -> bool:
+        try:
+            self.zip_file.getinfo(name)
+        except KeyError:
+            return False
+        return True
+
+    def _open(self, name: str):
+        """Open ``name`` for streaming once its size passes the limits"""
+        info = self.zip_file.getinfo(name)
+        if info.file_size > self.max_member_size:
+            raise ValueError(f"Invalid .cw file: {name} is too large "
+                             f"({info.file_size} bytes uncompressed)")
+        if self.total_size + info.file_size > self.max_archive_size:
+            raise ValueError("Invalid .cw file: archive is too large uncompressed")
+        self.total_size += info.file_size
+        return self.zip_file.open(info)
+
+    def read(self, name: str) -> bytes:
+        """The bytes of member ``name``"""
+        with self._open(name) as member:
+            return member.read()
+
+    def read_json(self, name: str):
+        """Member ``name`` parsed as JSON"""
+        with self._open(name) as member:
+            return json.load(member)
+
+    def iter_text(self, name: str, chunk_size: int = TEXT_CHUNK_SIZE) -> Iterator[str]:
+        """Member ``name`` decoded as UTF-8, ``chunk_size`` characters at a time
+
+        Newlines are translated as ``open()`` translates them, so the text
+        matches what opening the unzipped file would give.
+        """
+        with self._open(name) as member:
+            text = io.TextIOWrapper(member, encoding='utf-8')
+            chunk = text.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = text.read(chunk_size)
+
+    def read_text(self, name: str) -> str:
+        """Member ``name`` decoded as UTF-8"""
+        return "".join(self.iter_text(name))
@@ -0,0 +1,129 @@
+"""
+Coalescing, prioritized scheduling of highlight work for CoPywork
+"""
+import time
+from typing import List, Optional, Tuple
+
+from .range_set import RangeSet
+
+# Job priorities, most urgent first
+PRIORITY_VISIBLE = 0
+PRIORITY_CURSOR = 1
+PRIORITY_REST = 2
+
+# Seconds of tagging per main-loop turn, and characters tagged per step
+CHUNK_TIME_BUDGET = 0.008
+CHUNK_SIZE = 4096
+
+
+class HighlightScheduler:
+    """Merges highlight requests into one pending job owned by a highlighter
+
+    Requests never queue up: while a job is scheduled, further requests are
+    folded into it (counted in ``merged``). Text that needs (re-)tagging is
+    tracked as ``dirty`` offset ranges. When the job runs it first applies a
+    pending edit, then tags dirty text in priority order: the visible
+    region, the cursor neighborhood, then the rest of the document in
+    time-boxed chunks, rescheduling itself until nothing is left. Work that
+    a full re-highlight supersedes is discarded and counted in ``dropped``.
+    """
+
+    def __init__(self, highlighter):
+        self.highlighter = highlighter
+        self.dirty = RangeSet()
+        self.update_pending = False
+        # False when only the viewport and cursor neighborhood get tagged
+        self.tag_rest = True
+        self._after_id = None
+
+        # Statistics
+        self.requests = 0
+        self.merged = 0
+        self.dropped = 0
+
+    @property
+    def pending(self) -> bool:
+        """Check if a job is scheduled"""
+        return self._after_id is not None
+
+    def request_update(self):
+        """Schedule a re-lex of the edited text"""
+        self.update_pending = True
+        self._request()
+
+    def request_view(self):
+        """Schedule tagging of newly visible dirty text"""
+        if self.dirty:
+            self._request()
+
+    def _request(self):
+        """Schedule the job unless one is pending already"""
+        self.requests += 1
+        if self._after_id is not None:
+            self.merged += 1
+            return
+        self._after_id = self.highlighter.text_widget.after_idle(self._run)
+
+    def reset(self, length: int = 0, tag_rest: bool = True):
+        """Drop all pending work and mark ``[0, length)`` as dirty"""
+        if self._after_id is not None:
+            self.highlighter.text_widget.after_cancel(self._after_id)
+            self._after_id = None
+            self.dropped += 1
+        if self.update_pending:
+            self.update_pending = False
+            self.dropped += 1
+        self.dirty.clear()
+        self.dirty.add(0, length)
+        self.tag_rest = tag_rest
+
+    def edited(self, start: int, old_end: int, end: int):
+        """Record that ``[start, old_end)`` was replaced by ``[start, end)``"""
+        self.dirty.remove(start, old_end)
+        self.dirty.shift(old_end, end - old_end)
+        self.dirty.add(start, end)
+
+    def regions(self) -> List[Tuple[int, Tuple[int, int]]]:
+        """Return ``(priority, (start, end))`` regions in the order to tag them"""
+        highlighter = self.highlighter
+        regions = [(PRIORITY_VISIBLE, highlighter.visible_range()),
+                   (PRIORITY_CURSOR, highlighter.cursor_range())]
+        if self.tag_rest:
+            regions.append((PRIORITY_REST, (0, highlighter.document_length())))
+        return regions
+
+    def tag_region(self, start: int, end: int, deadline: Optional[float] = None) -> bool:
+        """Tag dirty text in ``[start, end)``; False if ``deadline`` ran out first"""
+        for gap_start, gap_end in self.dirty.overlapping(start, end):
+            while gap_start < gap_end:
+                chunk_end = min(gap_end, gap_start + CHUNK_SIZE)
+                self.highlighter.retag_region(gap_start, chunk_end)
+                self.dirty.remove(gap_start, chunk_end)
+                gap_start = chunk_end
+                if deadline is not None and time.perf_counter() > deadline:
+                    return False
+        return True
+
+    def run_now(self):
+        """Apply a pending edit and tag every dirty region synchronously"""
+        if self._after_id is not None:
+            self.highlighter.text_widget.after_cancel(self._after_id)
+        self._run(timed=False)
+
+    def _run(self, timed: bool = True):
+        """Job body: apply a pending edit, then tag dirty text by priority"""
+        self._after_id = None
+        if self.update_pending:
+            self.update_pending = False
+            self.highlighter.apply_pending_edit()
+
+        if not self.dirty:
+            return
+
+        deadline = time.perf_counter() + CHUNK_TIME_BUDGET if timed else None
+        for priority, (start, end) in self.regions():
+            # The viewport and cursor neighborhood are always finished
+            limit = deadline if priority == PRIORITY_REST else None
+            if not self.tag_region(start, end, limit):
+                self._after_id = self.highlighter.text_widget.after(1, self._run)
+                return
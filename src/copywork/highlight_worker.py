@@ -0,0 +1,85 @@
+"""
+Background tokenization for CoPywork syntax highlighting
+"""
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+from .incremental import iter_tokens_with_states, supports_checkpoints
+from .token_index import TokenIndex
+
+# Tokens lexed between two checks for a newer job
+CANCEL_CHECK_INTERVAL = 2048
+
+
+class HighlightWorker:
+    """Lexes documents on a worker thread into plain token indexes
+
+    Tk is not thread-safe, so the worker never touches the widget: it only
+    produces a TokenIndex (offset and scope arrays) which the main thread
+    picks up with poll() and applies to the widget itself. Every submit()
+    bumps ``generation``; a job whose generation is no longer current stops
+    lexing at its next check and its result is never delivered. A job that
+    fails delivers None in place of the index, so the main thread stops
+    waiting and can lex in the foreground instead.
+    """
+
+    def __init__(self, lexer, scope_for: Callable[[object], Optional[str]]):
+        self.lexer = lexer
+        self.scope_for = scope_for
+        self.generation = 0
+        self._results = queue.Queue()
+
+    def submit(self, text: str) -> int:
+        """Start lexing ``text`` in the background and return the job's generation"""
+        self.generation += 1
+        generation = self.generation
+        thread = threading.Thread(target=self._run, args=(generation, text), daemon=True)
+        thread.start()
+        return generation
+
+    def cancel(self):
+        """Make every running job stale"""
+        self.generation += 1
+
+    def is_current(self, generation: int) -> bool:
+        """Check if ``generation`` is the most recent job"""
+        return generation == self.generation
+
+    def poll(self) -> Optional[Tuple[int, Optional[TokenIndex]]]:
+        """Return ``(generation, index)`` of the current job once it has finished
+
+        ``index`` is None if the job failed.
+        """
+        while True:
+            try:
+                generation, index = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            if self.is_current(generation):
+                return generation, index
+
+    def _run(self, generation: int, text: str):
+        """Thread body: lex ``text`` unless a newer job supersedes it"""
+        try:
+            index = TokenIndex(text)
+            scope_for = self.scope_for
+            if supports_checkpoints(self.lexer):
+                tokens = iter_tokens_with_states(self.lexer, text)
+            else:
+                tokens = ((offset, token_type, value, None) for offset, token_type, value
+                          in self.lexer.get_tokens_unprocessed(text))
+
+            for count, (offset, token_type, value, state) in enumerate(tokens):
+                if count % CANCEL_CHECK_INTERVAL == 0 and not self.is_current(generation):
+                    return
+                if value:
+                    index.append(offset, scope_for(token_type), state)
+
+            if self.is_current(generation):
+                self._results.put((generation, index))
+
+        except Exception as e:
+            print(f"Error during background tokenization: {e}")
+            if self.is_current(generation):
+                self._results.put((generation, None))
@@ -0,0 +1,216 @@
+"""
+Incremental re-lexing for CoPywork syntax highlighting
+
+Pygments' ``RegexLexer`` keeps its state stack private, so a document can
+only be lexed from the top. This module drives the lexer's compiled token
+definitions directly, recording the state stack at every line start
+(a checkpoint). After an edit, lexing restarts at the last checkpoint before
+the damaged line and stops as soon as it reaches a checkpoint past the edit
+whose state matches the previous run; everything after that point is
+reused from the old token index, shifted by the edit's length delta.
+
+Lexers that are not ``RegexLexer`` subclasses can take part by providing
+``get_tokens_with_states(text, pos, stack)`` with the same contract as
+``iter_tokens_with_states``.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterator, Optional, Tuple
+
+try:
+    from pygments.lexer import RegexLexer
+    from pygments.token import Error, Whitespace, _TokenType
+    PYGMENTS_AVAILABLE = True
+except ImportError:
+    PYGMENTS_AVAILABLE = False
+
+from .token_index import TokenIndex
+
+
+def supports_checkpoints(lexer) -> bool:
+    """Check if the lexer's state can be captured at line boundaries
+
+    Plain ``RegexLexer`` subclasses qualify, as do lexers reporting their own
+    checkpoints through ``get_tokens_with_states``. Lexers that bring their
+    own ``get_tokens_unprocessed`` (such as ``ExtendedRegexLexer``) keep
+    state this module cannot see.
+    """
+    if hasattr(lexer, 'get_tokens_with_states'):
+        return True
+    return (PYGMENTS_AVAILABLE and isinstance(lexer, RegexLexer)
+            and type(lexer).get_tokens_unprocessed is RegexLexer.get_tokens_unprocessed)
+
+
+def iter_tokens_with_states(lexer, text: str, pos: int = 0,
+                            stack: Tuple[str, ...] = ('root',)
+                            ) -> Iterator[Tuple[int, object, str, Optional[tuple]]]:
+    """Yield ``(offset, token_type, value, state)`` for non-empty tokens
+
+    Mirrors ``RegexLexer.get_tokens_unprocessed`` but starts at ``pos`` with
+    an explicit state ``stack``. ``state`` is the lexer state stack when the
+    token starts at the beginning of a line, and None everywhere else.
+    """
+    own_states = getattr(lexer, 'get_tokens_with_states', None)
+    if own_states is not None:
+        yield from own_states(text, pos, stack)
+        return
+
+    tokendefs = lexer._tokens
+    statestack = list(stack)
+    statetokens = tokendefs[statestack[-1]]
+    # (offset, state) of the line start still waiting for its first token
+    pending = (pos, tuple(statestack))
+
+    while True:
+        for rexmatch, action, new_state in statetokens:
+            m = rexmatch(text, pos)
+            if m:
+                if action is not None:
+                    if type(action) is _TokenType:
+                        produced = ((pos, action, m.group()),)
+                    else:
+                        produced = action(lexer, m)
+                    for offset, token_type, value in produced:
+                        if not value:
+                            continue
+                        state = None
+                        if pending is not None and pending[0] == offset:
+                            state = pending[1]
+                        pending = None
+                        yield offset, token_type, value, state
+                pos = m.end()
+                if new_state is not None:
+                    # state transition
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    statetokens = tokendefs[statestack[-1]]
+                if pos > 0 and text[pos - 1] == '\n' and (pending is None or pending[0] != pos):
+                    pending = (pos, tuple(statestack))
+                break
+        else:
+            if pos >= len(text):
+                break
+            if text[pos] == '\n':
+                # at EOL, reset state to "root"
+                statestack = ['root']
+                statetokens = tokendefs['root']
+                state = pending[1] if pending is not None and pending[0] == pos else None
+                yield pos, Whitespace, '\n', state
+                pos += 1
+                pending = (pos, ('root',))
+                continue
+            state = pending[1] if pending is not None and pending[0] == pos else None
+            pending = None
+            yield pos, Error, text[pos], state
+            pos += 1
+
+
+def lex_document(lexer, text: str, scope_for: Callable[[object], Optional[str]]) -> TokenIndex:
+    """Lex ``text`` into a token index, with checkpoints when supported"""
+    if not supports_checkpoints(lexer):
+        return TokenIndex.from_tokens(text, lexer.get_tokens_unprocessed(text), scope_for)
+
+    index = TokenIndex(text)
+    for offset, token_type, value, state in iter_tokens_with_states(lexer, text):
+        index.append(offset, scope_for(token_type), state)
+    return index
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Length of the common prefix of two strings, by bisecting slice compares"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix_length(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix of two strings, at most ``limit``"""
+    lo, hi = 0, limit
+    la, lb = len(a), len(b)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def relex(index: TokenIndex, text: str, lexer,
+          scope_for: Callable[[object], Optional[str]]) -> Tuple[TokenIndex, int, int]:
+    """Bring ``index`` up to date with ``text`` after an edit
+
+    Returns the new index and the ``[start, end)`` offset range of ``text``
+    whose tokens changed and need re-tagging.
+    """
+    old_text = index.text
+    if old_text == text:
+        return index, 0, 0
+
+    if not supports_checkpoints(lexer) or not index.states or index.states[0] is None:
+        return lex_document(lexer, text, scope_for), 0, len(text)
+
+    prefix = _common_prefix_length(old_text, text)
+    suffix = _common_suffix_length(old_text, text, min(len(old_text), len(text)) - prefix)
+    delta = len(text) - len(old_text)
+    damage_end = len(text) - suffix
+
+    # Restart one checkpoint before the one preceding the damaged token, so
+    # that rules looking ahead across a line break are re-evaluated too
+    first = max(index.token_at(max(prefix - 1, 0)), 0)
+    states = index.states
+    restart = first
+    while restart > 0 and states[restart] is None:
+        restart -= 1
+    previous = restart - 1
+    while previous > 0 and states[previous] is None:
+        previous -= 1
+    if previous >= 0 and states[previous] is not None:
+        restart = previous
+
+    start = index.starts[restart]
+    new_starts = array('l')
+    new_scope_ids = array('H')
+    new_states = []
+    resume = len(index)
+    end = len(text)
+
+    for offset, token_type, value, state in iter_tokens_with_states(
+            lexer, text, start, states[restart]):
+        if state is not None and offset >= damage_end:
+            old_offset = offset - delta
+            k = bisect_left(index.starts, old_offset)
+            if k < len(index) and index.starts[k] == old_offset and states[k] == state:
+                resume = k
+                end = offset
+                break
+        new_starts.append(offset)
+        new_scope_ids.append(index.scope_id(scope_for(token_type)))
+        new_states.append(state)
+
+    tail_starts = array('l', [offset + delta for offset in index.starts[resume:]])
+    index.text = text
+    index.starts = index.starts[:restart] + new_starts + tail_starts
+    index.scope_ids = index.scope_ids[:restart] + new_scope_ids + index.scope_ids[resume:]
+    index.states = states[:restart] + new_states + states[resume:]
+    index.edit_lines(prefix, len(old_text) - suffix, text[prefix:damage_end])
+    return index, start, end
@@ -0,0 +1,112 @@
+"""
+Append-only keystroke log for CoPywork practice sessions
+"""
+import struct
+import time
+from array import array
+from typing import Iterator, NamedTuple, Optional
+
+from .token_cache import little_endian, read_array
+
+# Archive member holding the log
+KEYSTROKE_LOG_NAME = "keystrokes.bin"
+
+# Bump when the log layout changes
+KEYSTROKE_LOG_VERSION = 1
+
+# Typed character recorded for a backspace
+BACKSPACE = "\b"
+
+_MAGIC = b"CWKS"
+_HEADER = struct.Struct("<4sHI")
+
+
+class Keystroke(NamedTuple):
+    """One logged keystroke"""
+    time_ns: int   # Nanoseconds since the first keystroke of the log
+    offset: int    # Cursor offset when the key was pressed
+    expected: str  # Character under the cursor ("" at the end of the text)
+    typed: str     # Character typed, or BACKSPACE
+    state: int     # Practice state the keystroke gave the character
+
+
+class KeystrokeLog:
+    """Every practice keystroke, kept in parallel typed arrays
+
+    Each entry costs 21 bytes (int64 time, uint32 offset, two uint32 code
+    points and a state byte), so hours of practice stay in the low
+    megabytes. Times come from ``time.perf_counter_ns`` and are stored
+    relative to the first keystroke; a log loaded from an archive carries
+    on from its last entry, without counting the time in between.
+    """
+
+    def __init__(self):
+        self.times = array('q')
+        self.offsets = array('I')
+        self.expected = array('I')
+        self.typed = array('I')
+        self.states = bytearray()
+        self._origin = None
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def record(self, offset: int, expected: str, typed: str, state: int,
+               now_ns: Optional[int] = None):
+        """Append a keystroke made at ``now_ns`` (default: now)"""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        if self._origin is None:
+            self._origin = now_ns - (self.times[-1] if self.times else 0)
+        self.times.append(now_ns - self._origin)
+        self.offsets.append(offset)
+        self.expected.append(ord(expected[0]) if expected else 0)
+        self.typed.append(ord(typed[0]) if typed else 0)
+        self.states.append(state)
+
+    def __getitem__(self, i: int) -> Keystroke:
+        expected = self.expected[i]
+        return Keystroke(self.times[i], self.offsets[i], chr(expected) if expected else "",
+                         chr(self.typed[i]), self.states[i])
+
+    def __iter__(self) -> Iterator[Keystroke]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def dump_keystroke_log(log: KeystrokeLog) -> bytes:
+    """Serialize ``log``
+
+    Layout: magic, format version, entry count, then the time, offset,
+    expected and typed arrays (little-endian) and the state bytes.
+    """
+    return b"".join((
+        _HEADER.pack(_MAGIC, KEYSTROKE_LOG_VERSION, len(log)),
+        little_endian(log.times),
+        little_endian(log.offsets),
+        little_endian(log.expected),
+        little_endian(log.typed),
+        bytes(log.states),
+    ))
+
+
+def load_keystroke_log(data: bytes) -> Optional[KeystrokeLog]:
+    """Rebuild a log from ``data``; None if it is damaged or from another version"""
+    try:
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != KEYSTROKE_LOG_VERSION:
+            return None
+
+        log = KeystrokeLog()
+        offset = _HEADER.size
+        for name in ("times", "offsets", "expected", "typed"):
+            column = read_array(getattr(log, name).typecode, data, offset, count)
+            setattr(log, name, column)
+            offset += count * column.itemsize
+        if offset + count != len(data):
+            return None
+        log.states = bytearray(data[offset:])
+        return log
+
+    except (struct.error, ValueError):
+        return None
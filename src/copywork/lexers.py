@@ -0,0 +1,97 @@
+"""
+Lexer registry for CoPywork syntax highlighting
+"""
+import importlib
+import threading
+from typing import Dict, Optional, Tuple
+
+# Engines that can highlight Python, as (module, class)
+PYTHON_ENGINES: Dict[str, Tuple[str, str]] = {
+    "tokenize": (f"{__package__}.python_tokenize", "TokenizeLexer"),
+    "pygments": ("pygments.lexers.python", "PythonLexer"),
+}
+DEFAULT_PYTHON_ENGINE = "tokenize"
+
+# Language -> (module, class) of its lexer, imported on first use
+LEXER_CLASSES: Dict[str, Tuple[str, str]] = {
+    "python": PYTHON_ENGINES[DEFAULT_PYTHON_ENGINE],
+    "go": ("pygments.lexers.go", "GoLexer"),
+    "rust": ("pygments.lexers.rust", "RustLexer"),
+    "bash": ("pygments.lexers.shell", "BashLexer"),
+    "yaml": ("pygments.lexers.data", "YamlLexer"),
+}
+
+# File extension -> language
+EXTENSION_LANGUAGES: Dict[str, str] = {
+    ".py": "python",
+    ".pyw": "python",
+    ".go": "go",
+    ".rs": "rust",
+    ".sh": "bash",
+    ".bash": "bash",
+    ".zsh": "bash",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+# One lexer instance per language for the whole process
+_instances: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def register_language(language: str, module: str, class_name: str, *extensions: str):
+    """Add a language (or replace its lexer) and map ``extensions`` to it"""
+    LEXER_CLASSES[language] = (module, class_name)
+    for extension in extensions:
+        EXTENSION_LANGUAGES[extension.lower()] = language
+    with _lock:
+        _instances.pop(language, None)
+
+
+def set_python_engine(engine: str) -> bool:
+    """Highlight Python with ``engine`` (a PYTHON_ENGINES key); False if unknown"""
+    if engine not in PYTHON_ENGINES:
+        return False
+    if LEXER_CLASSES["python"] != PYTHON_ENGINES[engine]:
+        register_language("python", *PYTHON_ENGINES[engine])
+    return True
+
+
+def language_for_file(file_path: Optional[str], hint: Optional[str] = None) -> Optional[str]:
+    """Pick the language for ``file_path``
+
+    A known ``hint`` (e.g. stored in a .cw archive) wins; otherwise the
+    extension decides, looking through a trailing ``.cw`` so ``main.go.cw``
+    is Go. Returns None for files that get no highlighting.
+    """
+    if hint in LEXER_CLASSES:
+        return hint
+    if not file_path:
+        return None
+
+    name = file_path.lower()
+    if name.endswith(".cw"):
+        name = name[:-3]
+    dot = name.rfind(".")
+    if dot == -1:
+        return None
+    return EXTENSION_LANGUAGES.get(name[dot:])
+
+
+def get_lexer(language: str):
+    """Return the shared lexer for ``language`` (None if unavailable)"""
+    lexer = _instances.get(language)
+    if lexer is not None:
+        return lexer
+
+    with _lock:
+        lexer = _instances.get(language)
+        if lexer is None:
+            try:
+                module, class_name = LEXER_CLASSES[language]
+                lexer_class = getattr(importlib.import_module(module), class_name)
+                lexer = lexer_class()
+            except (KeyError, ImportError, AttributeError):
+                return None
+            _instances[language] = lexer
+    return lexer
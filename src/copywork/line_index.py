@@ -0,0 +1,71 @@
+"""
+Line start index for converting between offsets and Tk indices
+"""
+from bisect import bisect_right
+from typing import Iterator, List
+
+
+def _newlines(text: str) -> Iterator[int]:
+    """Positions of the newlines in ``text``"""
+    find = text.find
+    pos = find('\n')
+    while pos != -1:
+        yield pos
+        pos = find('\n', pos + 1)
+
+
+def line_starts(text: str) -> List[int]:
+    """Offsets at which each line of ``text`` starts (line 1 is element 0)"""
+    return [0] + [pos + 1 for pos in _newlines(text)]
+
+
+class LineIndex:
+    """Start offset of every line of a text, kept in sync with its edits
+
+    The starts are the prefix sums of the line lengths, so converting an
+    offset to a Tk ``"line.col"`` index is a bisect and the reverse is a
+    list lookup; nothing asks the widget how long a line is. ``edit``
+    updates the index in place for a replaced range instead of rescanning
+    the text. The practice session and the token index share one instance
+    while they hold the same text.
+    """
+
+    __slots__ = ('starts', 'length')
+
+    def __init__(self, text: str = ""):
+        self.starts = line_starts(text)
+        self.length = len(text)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        """1-based line containing ``offset``"""
+        return bisect_right(self.starts, offset)
+
+    def line_end(self, line: int) -> int:
+        """Offset of the newline ending ``line`` (the text length for the last line)"""
+        return self.starts[line] - 1 if line < len(self.starts) else self.length
+
+    def index_of(self, offset: int) -> str:
+        """Convert an offset into a Tk ``"line.col"`` index"""
+        line = bisect_right(self.starts, offset)
+        return f"{line}.{offset - self.starts[line - 1]}"
+
+    def offset_of(self, index: str) -> int:
+        """Convert a Tk ``"line.col"`` index into an offset, clamped to the text"""
+        line, col = (int(part) for part in index.split('.'))
+        if line > len(self.starts):
+            return self.length
+        line = max(line, 1)
+        return min(self.starts[line - 1] + max(col, 0), self.line_end(line))
+
+    def edit(self, start: int, old_end: int, new_text: str):
+        """Update the index for ``[start, old_end)`` having been replaced by ``new_text``"""
+        starts = self.starts
+        first = bisect_right(starts, start)
+        last = bisect_right(starts, old_end)
+        delta = len(new_text) - (old_end - start)
+        added = [start + pos + 1 for pos in _newlines(new_text)]
+        starts[first:] = added + [offset + delta for offset in starts[last:]]
+        self.length += delta
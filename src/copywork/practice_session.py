@@ -0,0 +1,173 @@
+"""
+Headless typing practice session for CoPywork
+"""
+import re
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+from .keystroke_log import BACKSPACE, KeystrokeLog
+from .line_index import LineIndex
+from .typing_stats import TypingStats
+
+# State of a character after a keystroke
+UNTYPED = 0
+CORRECT = 1
+INCORRECT = 2
+
+# Runs of one state in a progress array
+_RUNS = {state: re.compile(re.escape(bytes([state])) + b'+') for state in (CORRECT, INCORRECT)}
+
+
+class Change(NamedTuple):
+    """A character whose practice state a keystroke changed"""
+    offset: int
+    index: str  # Tk "line.col" index of ``offset``
+    state: int  # UNTYPED, CORRECT or INCORRECT
+
+
+class ProgressSnapshot(NamedTuple):
+    """Copy of a session's progress, to put back after showing something else"""
+    states: bytes
+    offset: int
+    correct_chars: int
+    incorrect_chars: int
+
+
+class PracticeSession:
+    """Typing practice over a target text, without any Tk dependency
+
+    The cursor is a character offset into ``text``; its line is tracked as
+    it moves, so every keystroke is O(1) and yields at most one ``Change``
+    for the UI to render. Newlines are skipped over rather than typed.
+    ``states`` holds the UNTYPED, CORRECT or INCORRECT state of every
+    character and is the record the progress tags are drawn from and saved.
+    Every keystroke is appended to ``log`` and counted in ``stats``; both
+    belong to the text and are replaced by ``set_text``, while the accuracy
+    counters survive it.
+    """
+
+    def __init__(self, text: str = ""):
+        self.correct_chars = 0
+        self.incorrect_chars = 0
+        self.set_text(text)
+
+    def set_text(self, text: str, lines: Optional[LineIndex] = None):
+        """Practice on ``text`` from its beginning
+
+        ``lines`` is the line index of ``text`` if one already exists.
+        """
+        self.text = text
+        self.lines = lines if lines is not None else LineIndex(text)
+        self.states = bytearray(len(text))
+        self.offset = 0
+        self.line = 1
+        self.set_log(KeystrokeLog())
+
+    def set_log(self, log: KeystrokeLog):
+        """Carry on from ``log``, typed earlier on this text"""
+        self.log = log
+        self.stats = TypingStats()
+        for keystroke in log:
+            self.stats.record(keystroke.time_ns, keystroke.expected, keystroke.typed,
+                              keystroke.state == INCORRECT)
+        # The log resumes from its last timestamp, not from when it was typed
+        self.stats.pause()
+
+    def _record(self, offset: int, expected: str, typed: str, state: int,
+                now_ns: Optional[int]):
+        """Log a keystroke and count it in the statistics"""
+        self.log.record(offset, expected, typed, state, now_ns)
+        self.stats.record(self.log.times[-1], expected, typed, state == INCORRECT)
+
+    def mark(self, start: int, end: int, state: int):
+        """Give the characters in ``[start, end)`` ``state``"""
+        start, end = max(start, 0), min(end, len(self.text))
+        if start < end:
+            self.states[start:end] = bytes([state]) * (end - start)
+
+    def clear_progress(self):
+        """Mark every character untyped"""
+        self.states[:] = bytes(len(self.states))
+
+    def progress_runs(self, state: int) -> Iterator[Tuple[int, int]]:
+        """Merged ``(start, end)`` offset ranges of the characters in ``state``"""
+        for match in _RUNS[state].finditer(self.states):
+            yield match.span()
+
+    @property
+    def cursor_index(self) -> str:
+        """Tk ``"line.col"`` index of the cursor"""
+        return f"{self.line}.{self.offset - self.lines.starts[self.line - 1]}"
+
+    @property
+    def accuracy(self) -> float:
+        """Percentage of typed characters that were correct"""
+        total = self.correct_chars + self.incorrect_chars
+        return self.correct_chars / total * 100 if total > 0 else 100
+
+    def offset_of(self, index: str) -> int:
+        """Convert a Tk ``"line.col"`` index into an offset within ``text``"""
+        return self.lines.offset_of(index)
+
+    def snapshot(self) -> ProgressSnapshot:
+        """Copy the states, the cursor and the accuracy counters"""
+        return ProgressSnapshot(bytes(self.states), self.offset,
+                                self.correct_chars, self.incorrect_chars)
+
+    def restore(self, snapshot: ProgressSnapshot):
+        """Put back the progress copied by ``snapshot`` (taken on the same text)"""
+        self.states[:] = snapshot.states
+        self.move_to(snapshot.offset)
+        self.correct_chars = snapshot.correct_chars
+        self.incorrect_chars = snapshot.incorrect_chars
+
+    def move_to(self, offset: int):
+        """Put the cursor at ``offset`` (clamped to the text)"""
+        self.offset = min(max(offset, 0), len(self.text))
+        self.line = self.lines.line_of(self.offset)
+
+    def move_to_index(self, index: str):
+        """Put the cursor at the Tk ``"line.col"`` index"""
+        self.move_to(self.offset_of(index))
+
+    def type_char(self, char: str, now_ns: Optional[int] = None) -> Optional[Change]:
+        """Check ``char`` against the text at the cursor and advance
+
+        Returns None when no character changed: at the end of the text, or
+        when the cursor was on a newline, which is skipped. ``now_ns`` is the
+        ``time.perf_counter_ns`` timestamp logged (default: now).
+        """
+        offset = self.offset
+        if offset >= len(self.text):
+            self._record(offset, "", char, UNTYPED, now_ns)
+            return None
+
+        expected = self.text[offset]
+        if expected == '\n':
+            self._record(offset, expected, char, UNTYPED, now_ns)
+            self.offset += 1
+            self.line += 1
+            return None
+
+        index = self.cursor_index
+        if char == expected:
+            state = CORRECT
+            self.correct_chars += 1
+        else:
+            state = INCORRECT
+            self.incorrect_chars += 1
+        self.states[offset] = state
+        self._record(offset, expected, char, state, now_ns)
+        self.offset += 1
+        return Change(offset, index, state)
+
+    def backspace(self, now_ns: Optional[int] = None) -> Optional[Change]:
+        """Step back one character and mark it untyped"""
+        offset = self.offset
+        self._record(offset, self.text[offset:offset + 1], BACKSPACE, UNTYPED, now_ns)
+        if offset == 0:
+            return None
+        self.offset -= 1
+        self.states[self.offset] = UNTYPED
+        if self.offset < self.lines.starts[self.line - 1]:
+            self.line -= 1
+        return Change(self.offset, self.cursor_index, UNTYPED)
@@ -0,0 +1,112 @@
+"""
+Practice progress as stored in .cw archives and .colors files
+"""
+import re
+import struct
+import zlib
+from array import array
+from typing import Optional
+
+from .line_index import LineIndex
+from .practice_session import CORRECT, INCORRECT
+from .token_cache import content_hash, little_endian, read_array
+
+# Progress tags and the practice state each one shows
+PROGRESS_TAGS = (("correct", CORRECT), ("incorrect", INCORRECT))
+
+# Archive members holding the progress: v1 is colors.json, v2 is progress.bin
+COLORS_NAME = "colors.json"
+PROGRESS_NAME = "progress.bin"
+
+# Bump when the progress layout changes (1 is the colors.json format)
+PROGRESS_FORMAT_VERSION = 2
+
+# How the runs of a v2 progress member are stored
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_NAMES = {COMPRESSION_NONE: "none", COMPRESSION_ZLIB: "zlib"}
+
+_MAGIC = b"CWPG"
+_HEADER = struct.Struct("<4sHBI32sI")
+
+# Runs of one typed state
+_RUNS = re.compile(rb'([^\x00])\1*')
+
+
+def is_progress_data(data: bytes) -> bool:
+    """True if ``data`` is v2 progress rather than v1 JSON"""
+    return data[:len(_MAGIC)] == _MAGIC
+
+
+def dump_progress(states: bytes, text: str, compression: int = COMPRESSION_ZLIB) -> bytes:
+    """Serialize the practice ``states`` of ``text``
+
+    Layout: magic, format version, compression, text length, SHA-256 of
+    the text and run count, then the runs as three little-endian columns:
+    untyped characters before each run, run lengths and run states. The
+    columns are zlib-compressed unless ``compression`` is COMPRESSION_NONE.
+    """
+    gaps, lengths, run_states = array('I'), array('I'), bytearray()
+    previous_end = 0
+    for match in _RUNS.finditer(states):
+        start, end = match.span()
+        gaps.append(start - previous_end)
+        lengths.append(end - start)
+        run_states.append(states[start])
+        previous_end = end
+
+    body = b"".join((little_endian(gaps), little_endian(lengths), bytes(run_states)))
+    if compression == COMPRESSION_ZLIB:
+        body = zlib.compress(body)
+    return _HEADER.pack(_MAGIC, PROGRESS_FORMAT_VERSION, compression, len(states),
+                        bytes.fromhex(content_hash(text)), len(run_states)) + body
+
+
+def load_progress(data: bytes, text: str) -> Optional[bytearray]:
+    """Rebuild the states of ``text`` from ``data``
+
+    Returns None if the data is damaged, from another version, or was
+    saved for a different text.
+    """
+    try:
+        magic, version, compression, length, digest, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != PROGRESS_FORMAT_VERSION:
+            return None
+        if length != len(text) or digest != bytes.fromhex(content_hash(text)):
+            return None
+
+        body = data[_HEADER.size:]
+        if compression == COMPRESSION_ZLIB:
+            body = zlib.decompress(body)
+        elif compression != COMPRESSION_NONE:
+            return None
+
+        gaps = read_array('I', body, 0, count)
+        lengths = read_array('I', body, count * gaps.itemsize, count)
+        run_states = body[2 * count * gaps.itemsize:]
+        if len(run_states) != count:
+            return None
+
+        states = bytearray(length)
+        position = 0
+        for gap, run_length, state in zip(gaps, lengths, run_states):
+            position += gap
+            if state not in (CORRECT, INCORRECT) or position + run_length > length:
+                return None
+            states[position:position + run_length] = bytes([state]) * run_length
+            position += run_length
+        return states
+
+    except (struct.error, ValueError, zlib.error):
+        return None
+
+
+def states_from_colors(color_data: dict, lines: LineIndex) -> bytearray:
+    """Rebuild practice states from v1 ``"line.col"`` ranges per tag"""
+    states = bytearray(lines.length)
+    for tag, state in PROGRESS_TAGS:
+        for start, end in color_data.get(tag, ()):
+            start, end = lines.offset_of(start), lines.offset_of(end)
+            if start < end:
+                states[start:end] = bytes([state]) * (end - start)
+    return states
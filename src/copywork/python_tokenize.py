@@ -0,0 +1,405 @@
+"""
+Stdlib ``tokenize`` engine for CoPywork Python highlighting
+"""
+import re
+import sys
+import tokenize
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pygments.lexers.python import PythonLexer
+from pygments.token import (Comment, Error, Keyword, Name, Operator, String, Text,
+                            _TokenType)
+
+# State reported at checkpoints; lexing restarts there from scratch
+ROOT_STATE = ('root',)
+
+# Scanner events besides tokenize's own token types
+_FALLBACK = -1      # lex [start, end) with PythonLexer
+_UNTERMINATED = -2  # a string running to the end of the text
+_RESTART = -3       # tokenize was restarted at ``start``
+
+_SKIPPED = frozenset((tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER))
+_LINE_ENDS = frozenset((tokenize.NEWLINE, tokenize.NL))
+_FSTRING_START = getattr(tokenize, 'FSTRING_START', None)
+_FSTRING_END = getattr(tokenize, 'FSTRING_END', None)
+
+# Error columns of the C tokenizer (Python 3.12+) are 1-based
+_ERROR_COLUMN_BASE = 1 if sys.version_info >= (3, 12) else 0
+
+_STRING_PREFIX = re.compile(r'[A-Za-z]*')
+_PREFIX_NAME = re.compile(r'(?i)(?:rf|fr|rb|br|[rfub])\Z')
+_DOC_PREFIX = re.compile(r'[rRuUbB]{,2}\Z')
+_QUOTES = frozenset('\'"')
+_OPEN_BRACKETS = frozenset('([{')
+_CLOSE_BRACKETS = frozenset(')]}')
+
+# Spellings whose split is memoized before the memo is started afresh
+PARTS_CACHE_SIZE = 4096
+
+# Contexts set by the keyword before a name, as in PythonLexer
+_FUNCNAME, _CLASSNAME, _IMPORT, _FROMIMPORT = range(4)
+
+
+class TokenizeLexer:
+    """Python lexer built on the stdlib ``tokenize`` module
+
+    ``tokenize`` splits the source and every token is then given the type
+    Pygments' ``PythonLexer`` would give it, so scopes, token indexes and
+    cached token tables do not depend on the engine. Names, numbers and
+    operators are classified with ``PythonLexer``'s own rules, memoized per
+    spelling (up to PARTS_CACHE_SIZE of them); f-strings and lines ``tokenize`` rejects are handed to
+    ``PythonLexer`` itself.
+
+    Indentation carries no color and is stripped before tokenizing, so
+    lexing can restart at any line start outside brackets, strings and
+    continuation lines. Those line starts are reported as checkpoints
+    through ``get_tokens_with_states`` for incremental re-lexing.
+    """
+
+    name = 'Python (tokenize)'
+
+    def __init__(self):
+        self.fallback = PythonLexer()
+        tokendefs = self.fallback._tokens
+        # Rules that emit a single token type, in PythonLexer's order
+        self._rules = [(rexmatch, action) for rexmatch, action, _ in tokendefs['root']
+                       if type(action) is _TokenType]
+        self._soft_keyword = tokendefs['soft-keywords'][0][0]
+        self._soft_underscore = tokendefs['soft-keywords-inner'][0][0]
+        self._parts: Dict[str, List[Tuple[int, object, int]]] = {}
+
+    def get_tokens_unprocessed(self, text: str) -> Iterator[Tuple[int, object, str]]:
+        """Yield ``(offset, token_type, value)`` like a Pygments lexer"""
+        for offset, token_type, value, _ in self.get_tokens_with_states(text):
+            yield offset, token_type, value
+
+    def get_tokens_with_states(self, text: str, pos: int = 0,
+                               stack: Tuple[str, ...] = ROOT_STATE
+                               ) -> Iterator[Tuple[int, object, str, Optional[tuple]]]:
+        """Yield ``(offset, token_type, value, state)`` starting at line start ``pos``
+
+        Tokens cover the text without gaps. ``state`` is ROOT_STATE for the
+        first token of every line lexing can restart at, None elsewhere.
+        ``stack`` is accepted for symmetry with RegexLexer checkpoints; no
+        other state is needed at those lines.
+        """
+        end = pos
+        checkpoint = pos
+        for offset, token_type, stop in self._classify(text, pos):
+            if token_type is None:
+                checkpoint = offset
+                continue
+            if offset > end:
+                if end < checkpoint < offset:
+                    yield end, Text, text[end:checkpoint], None
+                    end = checkpoint
+                state = None
+                if end == checkpoint:
+                    state, checkpoint = ROOT_STATE, -1
+                yield end, Text, text[end:offset], state
+                end = offset
+            elif offset < end:
+                offset = end
+            if stop <= offset:
+                continue
+            state = None
+            if offset == checkpoint:
+                state, checkpoint = ROOT_STATE, -1
+            yield offset, token_type, text[offset:stop], state
+            end = stop
+
+        if end < len(text):
+            if end < checkpoint < len(text):
+                yield end, Text, text[end:checkpoint], None
+                end = checkpoint
+            yield end, Text, text[end:], ROOT_STATE if end == checkpoint else None
+
+    def _classify(self, text: str, pos: int) -> Iterator[Tuple[int, object, int]]:
+        """Yield ``(start, token_type, end)`` for the tokens of ``text[pos:]``
+
+        A None ``token_type`` marks ``start`` as a checkpoint.
+        """
+        context = None
+        # End of the last token in ``context``; -1 right after whitespace it allows
+        context_end = -1
+        depth = 0
+        decorator = None
+        underscore = -1
+
+        for kind, start, end, first in self._scan(text, pos):
+            if kind == tokenize.NAME:
+                value = text[start:end]
+                if decorator is not None and decorator == start - 1:
+                    yield decorator, Name.Decorator, end
+                    decorator = None
+                    context = None
+                    continue
+
+                if context is not None:
+                    token_type = self._name_in_context(context, value,
+                                                       context_end in (-1, start),
+                                                       text[start - 1].isspace())
+                    if token_type is not None:
+                        if token_type is Name.Namespace or (token_type is Keyword
+                                                            and context == _IMPORT):
+                            context_end = -1 if token_type is Keyword else end
+                        else:
+                            context = None
+                        yield start, token_type, end
+                        continue
+                    context = None
+
+                if value == 'from' and text[start - 6:start] == 'yield ':
+                    # PythonLexer has 'yield from' as one keyword
+                    yield start - 1, Keyword, end
+                    continue
+                if value in ('def', 'class', 'from', 'import') and _followed_by_space(text, end):
+                    if value == 'def':
+                        yield start, Keyword, end
+                        context = _FUNCNAME
+                    elif value == 'class':
+                        yield start, Keyword, end
+                        context = _CLASSNAME
+                    else:
+                        yield start, Keyword.Namespace, end
+                        context = _FROMIMPORT if value == 'from' else _IMPORT
+                    context_end = -1
+                    continue
+
+                if first and value in ('match', 'case'):
+                    line_start = text.rfind('\n', 0, start) + 1
+                    m = self._soft_keyword(text, line_start)
+                    if m and m.start(2) == start:
+                        m = self._soft_underscore(text, end)
+                        underscore = m.start(3) if m else -1
+                        yield start, Keyword, end
+                        continue
+                if start == underscore and value == '_':
+                    yield start, Keyword, end
+                    continue
+
+                dotted = start > 0 and text[start - 1] == '.'
+                for offset, token_type, length in self._split(value, dotted):
+                    yield start + offset, token_type, start + offset + length
+
+            elif kind == tokenize.OP:
+                value = text[start:end]
+                if value in _OPEN_BRACKETS:
+                    depth += 1
+                elif value in _CLOSE_BRACKETS and depth:
+                    depth -= 1
+                elif value == '@' and text[end:end + 1].isidentifier():
+                    decorator = start
+                    continue
+
+                if context is not None:
+                    adjacent = context_end in (-1, start)
+                    if value in ('.', '...') and adjacent and context in (_IMPORT, _FROMIMPORT):
+                        yield start, Name.Namespace, end
+                        context_end = end
+                        continue
+                    if value == ',' and context == _IMPORT:
+                        yield start, Operator, end
+                        context_end = -1
+                        continue
+                    context = None
+
+                for offset, token_type, length in self._split(value, False):
+                    yield start + offset, token_type, start + offset + length
+
+            elif kind in _LINE_ENDS:
+                context = None
+                if depth == 0:
+                    yield end, None, end
+
+            elif kind == tokenize.STRING:
+                context = None
+                yield from self._string(text, start, end, first)
+
+            elif kind == tokenize.COMMENT:
+                if start == 0 and text.startswith('#!'):
+                    yield start, Comment.Hashbang, end
+                else:
+                    yield start, Comment.Single, end
+
+            elif kind == _FALLBACK:
+                context = None
+                for offset, token_type, value in self.fallback.get_tokens_unprocessed(text[start:end]):
+                    yield start + offset, token_type, start + offset + len(value)
+
+            elif kind == _UNTERMINATED:
+                yield start, String, end
+
+            elif kind == _RESTART:
+                context = None
+                depth = 0
+                yield start, None, start
+
+            else:
+                # NUMBER and error tokens
+                context = None
+                for offset, token_type, length in self._split(text[start:end], False):
+                    yield start + offset, token_type, start + offset + length
+
+    def _name_in_context(self, context: int, value: str, adjacent: bool, spaced: bool):
+        """Type of a name following def/class/import/from; None leaves the context
+
+        ``adjacent`` tells if the name directly follows the context's last
+        token (or whitespace it allows), ``spaced`` if whitespace precedes it.
+        """
+        if context == _FUNCNAME:
+            return Name.Function
+        if context == _CLASSNAME:
+            return Name.Class
+        if context == _IMPORT:
+            if value == 'as' and spaced:
+                return Keyword
+            return Name.Namespace if adjacent else None
+        if value == 'import' and spaced:
+            return Keyword.Namespace
+        if not adjacent:
+            return None
+        return Keyword.Constant if value == 'None' else Name.Namespace
+
+    def _string(self, text: str, start: int, end: int, first: bool):
+        """Yield the tokens of the string literal ``text[start:end]``"""
+        prefix = _STRING_PREFIX.match(text, start).end()
+        if 'f' in text[start:prefix].lower():
+            for offset, token_type, value in self.fallback.get_tokens_unprocessed(text[start:end]):
+                yield start + offset, token_type, start + offset + len(value)
+            return
+
+        triple = text.startswith(('"""', "'''"), prefix)
+        if prefix > start:
+            yield start, String.Affix, prefix
+        if first and triple and _DOC_PREFIX.match(text, start, prefix):
+            yield prefix, String.Doc, end
+        elif text[prefix] == '"':
+            yield prefix, String.Double, end
+        else:
+            yield prefix, String.Single, end
+
+    def _split(self, value: str, dotted: bool) -> List[Tuple[int, object, int]]:
+        """Split a name, number or operator with PythonLexer's rules
+
+        Returns ``(offset, token_type, length)`` parts; ``dotted`` tells if
+        the text right before ``value`` is a '.', which some rules look at.
+        """
+        probe = '.' + value if dotted else value
+        parts = self._parts.get(probe)
+        if parts is not None:
+            return parts
+
+        parts = []
+        pos = base = 1 if dotted else 0
+        while pos < len(probe):
+            for rexmatch, token_type in self._rules:
+                m = rexmatch(probe, pos)
+                if m and m.end() > pos:
+                    parts.append((pos - base, token_type, m.end() - pos))
+                    pos = m.end()
+                    break
+            else:
+                parts.append((pos - base, Error, 1))
+                pos += 1
+        # Clearing is a single step, so the worker thread can share the memo
+        if len(self._parts) >= PARTS_CACHE_SIZE:
+            self._parts.clear()
+        self._parts[probe] = parts
+        return parts
+
+    def _scan(self, text: str, pos: int) -> Iterator[Tuple[int, int, int, bool]]:
+        """Yield ``(kind, start, end, first_on_line)`` from tokenize
+
+        Lines are fed to tokenize without their indentation. f-strings come
+        out as single STRING tokens on every Python version. When tokenize
+        gives up, the rest of the line goes to the fallback lexer and
+        tokenize restarts on the next line.
+        """
+        length = len(text)
+        while pos < length:
+            # Offset in ``text`` of the first character handed to tokenize, per row
+            bases = []
+            offset = pos
+
+            def readline():
+                nonlocal offset
+                if offset >= length:
+                    return ''
+                newline = text.find('\n', offset) + 1 or length
+                line = text[offset:newline].lstrip(' \t\f')
+                bases.append(newline - len(line))
+                offset = newline
+                return line
+
+            last_end = pos
+            skip_until = pos
+            fstrings = 0
+            fstring_start = fstring_first = None
+            try:
+                for kind, string, (srow, scol), (erow, ecol), _ in tokenize.generate_tokens(readline):
+                    if kind in _SKIPPED:
+                        continue
+                    start = bases[srow - 1] + scol
+                    end = bases[erow - 1] + ecol if erow <= len(bases) else length
+
+                    if fstrings:
+                        if kind == _FSTRING_START:
+                            fstrings += 1
+                        elif kind == _FSTRING_END:
+                            fstrings -= 1
+                            if not fstrings:
+                                yield tokenize.STRING, fstring_start, end, fstring_first
+                                last_end = end
+                        continue
+                    if kind == _FSTRING_START:
+                        fstrings = 1
+                        fstring_start, fstring_first = start, scol == 0
+                        continue
+
+                    if start < skip_until:
+                        continue
+                    if (kind == tokenize.ERRORTOKEN and string[:1] in _QUOTES
+                            or kind == tokenize.NAME and text[end:end + 1] in _QUOTES
+                            and _PREFIX_NAME.match(string)):
+                        # Unterminated string (or its prefix): the rest of its line
+                        skip_until = text.find('\n', start) + 1 or length
+                        yield _FALLBACK, start, skip_until, False
+                        last_end = skip_until
+                        continue
+
+                    yield kind, start, end, scol == 0
+                    last_end = max(last_end, end)
+                return
+
+            except (tokenize.TokenError, SyntaxError) as error:
+                message, row, column = _error_position(error)
+                if 'multi-line statement' in message:
+                    return
+                if row <= len(bases):
+                    error_at = max(bases[row - 1] + column, last_end)
+                else:
+                    error_at = length
+                if 'multi-line string' in message or 'triple-quoted' in message:
+                    yield _UNTERMINATED, error_at, length, False
+                    return
+
+                pos = text.find('\n', error_at) + 1 or length
+                yield _FALLBACK, last_end, pos, False
+                yield _RESTART, pos, pos, True
+
+
+def _followed_by_space(text: str, end: int) -> bool:
+    """Check for the whitespace PythonLexer requires after def/class/from/import"""
+    char = text[end:end + 1]
+    if char == '\\':
+        char = text[end + 1:end + 2]
+    return char.isspace()
+
+
+def _error_position(error: Exception) -> Tuple[str, int, int]:
+    """Return ``(message, row, column)`` of a tokenize failure, column 0-based"""
+    if isinstance(error, SyntaxError):
+        return error.msg or '', error.lineno or 1, max((error.offset or 1) - 1, 0)
+    message, (row, column) = error.args
+    return message, row, max(column - _ERROR_COLUMN_BASE, 0)
@@ -0,0 +1,79 @@
+"""
+Sorted set of half-open offset ranges for CoPywork
+"""
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Tuple
+
+
+class RangeSet:
+    """Disjoint, merged ``[start, end)`` ranges kept in sorted order
+
+    Used to remember which parts of a document have already been tagged and
+    which parts are waiting to be re-highlighted.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(list(zip(self._starts, self._ends)))
+
+    def clear(self):
+        """Remove every range"""
+        self._starts = []
+        self._ends = []
+
+    def add(self, start: int, end: int):
+        """Add ``[start, end)``, merging it with overlapping or adjacent ranges"""
+        if start >= end:
+            return
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def remove(self, start: int, end: int):
+        """Remove ``[start, end)``, splitting ranges that straddle it"""
+        if start >= end:
+            return
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        if lo >= hi:
+            return
+        starts: List[int] = []
+        ends: List[int] = []
+        if self._starts[lo] < start:
+            starts.append(self._starts[lo])
+            ends.append(start)
+        if self._ends[hi - 1] > end:
+            starts.append(end)
+            ends.append(self._ends[hi - 1])
+        self._starts[lo:hi] = starts
+        self._ends[lo:hi] = ends
+
+    def overlapping(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return the parts of the set that fall inside ``[start, end)``"""
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        return [(max(s, start), min(e, end))
+                for s, e in zip(self._starts[lo:hi], self._ends[lo:hi])]
+
+    def shift(self, offset: int, delta: int):
+        """Move every range boundary at or after ``offset`` by ``delta``"""
+        i = bisect_left(self._ends, offset)
+        if i < len(self._starts) and self._starts[i] < offset:
+            self._ends[i] += delta
+            i += 1
+        for j in range(i, len(self._starts)):
+            self._starts[j] += delta
+            self._ends[j] += delta
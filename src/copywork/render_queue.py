@@ -0,0 +1,46 @@
+"""
+Practice changes waiting to be drawn by CoPywork
+"""
+from typing import Dict, Iterator, List
+
+from .practice_session import UNTYPED, Change
+
+# Shortest time between two renders (one frame at 60 Hz)
+FRAME_NS = 16_666_667
+
+
+class PendingChanges:
+    """Changes made by keystrokes since the last frame, per character
+
+    Drawing a character as untyped clears whatever it showed before, so
+    only the changes since its last UNTYPED change need drawing: a key that
+    is typed and backspaced within a frame costs one render, and a burst
+    touches each character at most a couple of times however many
+    keystrokes it holds. Drawing the remaining changes in order gives the
+    same result as drawing every change as it happened.
+    """
+
+    __slots__ = ('_changes',)
+
+    def __init__(self):
+        self._changes: Dict[int, List[Change]] = {}
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def add(self, change: Change):
+        """Queue ``change`` for the next frame"""
+        if change.state == UNTYPED:
+            self._changes[change.offset] = [change]
+        else:
+            self._changes.setdefault(change.offset, []).append(change)
+
+    def clear(self):
+        """Forget every queued change"""
+        self._changes.clear()
+
+    def drain(self) -> Iterator[Change]:
+        """Yield the queued changes, oldest first for each character, and forget them"""
+        changes, self._changes = self._changes, {}
+        for offset_changes in changes.values():
+            yield from offset_changes
@@ -0,0 +1,82 @@
+"""
+Per-character render state for CoPywork practice highlighting
+"""
+from array import array
+from typing import Dict, List, Optional
+
+
+class RenderState:
+    """Remembers which typed overlay tag each character carries
+
+    ``cells`` holds one entry per character offset: 0 for no overlay,
+    otherwise 1 + the position of the overlay's name in ``tags``. Knowing
+    the single overlay on a character lets a keystroke swap exactly that tag
+    instead of removing every overlay the theme could have put there. The
+    array grows on demand, so offsets past its end simply have no overlay.
+    It describes one version of the text; after an edit it is rebuilt from
+    the widget with ``reset`` and ``fill``.
+    """
+
+    def __init__(self):
+        self.cells = array('H')
+        self.tags: List[str] = []
+        self._tag_ids: Dict[str, int] = {}
+        self.count = 0
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def tag_at(self, offset: int) -> Optional[str]:
+        """Return the overlay at ``offset`` (None if it has none)"""
+        if 0 <= offset < len(self.cells):
+            cell = self.cells[offset]
+            if cell:
+                return self.tags[cell - 1]
+        return None
+
+    def _tag_id(self, tag: str) -> int:
+        """Return the cell value standing for ``tag``"""
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            self.tags.append(tag)
+            tag_id = self._tag_ids[tag] = len(self.tags)
+        return tag_id
+
+    def _grow(self, length: int):
+        """Make room for ``length`` cells"""
+        cells = self.cells
+        if length > len(cells):
+            cells.frombytes(bytes(cells.itemsize * (length - len(cells))))
+
+    def set(self, offset: int, tag: str) -> Optional[str]:
+        """Record ``tag`` as the overlay at ``offset``; returns the previous one"""
+        tag_id = self._tag_id(tag)
+        self._grow(offset + 1)
+        previous = self.cells[offset]
+        self.cells[offset] = tag_id
+        if not previous:
+            self.count += 1
+            return None
+        return self.tags[previous - 1]
+
+    def fill(self, start: int, end: int, tag: str):
+        """Record ``tag`` as the overlay of every character in ``[start, end)``"""
+        if start >= end:
+            return
+        self._grow(end)
+        replaced = self.cells[start:end]
+        self.count += replaced.count(0)
+        self.cells[start:end] = array('H', [self._tag_id(tag)]) * (end - start)
+
+    def clear(self, offset: int) -> Optional[str]:
+        """Forget the overlay at ``offset``; returns the one that was there"""
+        tag = self.tag_at(offset)
+        if tag is not None:
+            self.cells[offset] = 0
+            self.count -= 1
+        return tag
+
+    def reset(self):
+        """Forget every overlay"""
+        self.cells = array('H')
+        self.count = 0
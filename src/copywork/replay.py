@@ -0,0 +1,198 @@
+"""
+Replay of logged practice sessions for CoPywork
+
+Usage:
+    python -m copywork.replay FILE.cw [--at SECONDS]
+"""
+import argparse
+import sys
+import zipfile
+from bisect import bisect_right
+from typing import List, Optional
+
+from .cw_archive import CwReader
+from .keystroke_log import BACKSPACE, KEYSTROKE_LOG_NAME, KeystrokeLog, load_keystroke_log
+from .line_index import LineIndex
+from .practice_session import CORRECT, UNTYPED, Change
+from .typing_activity import IDLE_TIMEOUT_NS
+from .wpm_window import words_per_minute
+
+# Keystrokes between keyframes, at least
+KEYFRAME_INTERVAL = 256
+
+# Keyframes copy one byte per character of the text; on long texts they are
+# spaced out so that they cost at most this many bytes per logged keystroke
+KEYFRAME_BYTES_PER_KEYSTROKE = 16
+
+_BACKSPACE_CODE = ord(BACKSPACE)
+
+
+class ReplayState:
+    """Practice progress after the first ``events`` logged keystrokes"""
+
+    __slots__ = ('events', 'time_ns', 'offset', 'correct', 'incorrect', 'active_ns', 'states')
+
+    def __init__(self, text_length: int = 0):
+        self.events = 0
+        self.time_ns = 0
+        self.offset = 0
+        self.correct = 0
+        self.incorrect = 0
+        self.active_ns = 0
+        # UNTYPED, CORRECT or INCORRECT per character
+        self.states = bytearray(text_length)
+
+    def copy(self) -> 'ReplayState':
+        """Independent copy of this state"""
+        state = ReplayState()
+        for name in self.__slots__:
+            setattr(state, name, getattr(self, name))
+        state.states = bytearray(self.states)
+        return state
+
+    @property
+    def accuracy(self) -> float:
+        """Percentage of typed characters that were correct"""
+        total = self.correct + self.incorrect
+        return self.correct / total * 100 if total > 0 else 100
+
+    @property
+    def wpm(self) -> float:
+        """Correct words per minute of typing time"""
+        return words_per_minute(self.correct, self.active_ns)
+
+
+class SessionReplay:
+    """Re-runs a keystroke log against the text it was typed on
+
+    Building the replay runs the log once, keeping a keyframe (a copy of
+    the progress state) every ``interval`` keystrokes. ``state_at`` bisects
+    the log's timestamps and replays at most ``interval`` keystrokes from
+    the keyframe before that point instead of starting over. Raises
+    ValueError if the log was not typed on ``text``.
+    """
+
+    def __init__(self, text: str, log: KeystrokeLog, interval: Optional[int] = None):
+        self.text = text
+        self.log = log
+        self.lines = LineIndex(text)
+        if interval is None:
+            interval = max(KEYFRAME_INTERVAL, len(text) // KEYFRAME_BYTES_PER_KEYSTROKE)
+        self.interval = interval
+
+        self.keyframes: List[ReplayState] = []
+        state = ReplayState(len(text))
+        for i in range(len(log)):
+            if i % interval == 0:
+                self.keyframes.append(state.copy())
+            self._apply(state, i)
+        self.final = state
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    @property
+    def duration_ns(self) -> int:
+        """Time from the first to the last logged keystroke"""
+        return self.log.times[-1] if len(self.log) else 0
+
+    def _apply(self, state: ReplayState, i: int) -> Optional[int]:
+        """Apply keystroke ``i``; returns the offset whose state changed"""
+        log = self.log
+        time_ns = log.times[i]
+        if state.events:
+            gap = time_ns - state.time_ns
+            if gap < IDLE_TIMEOUT_NS:
+                state.active_ns += gap
+        state.time_ns = time_ns
+        state.events = i + 1
+
+        offset = log.offsets[i]
+        if log.typed[i] == _BACKSPACE_CODE:
+            if offset == 0:
+                state.offset = 0
+                return None
+            state.offset = offset - 1
+            state.states[offset - 1] = UNTYPED
+            return offset - 1
+
+        if offset >= len(self.text):
+            state.offset = len(self.text)
+            return None
+        if ord(self.text[offset]) != log.expected[i]:
+            raise ValueError(f"keystroke {i} was not typed on this text")
+
+        state.offset = offset + 1
+        mark = log.states[i]
+        if mark == UNTYPED:
+            # A skipped newline
+            return None
+        state.states[offset] = mark
+        if mark == CORRECT:
+            state.correct += 1
+        else:
+            state.incorrect += 1
+        return offset
+
+    def apply(self, state: ReplayState) -> Optional[Change]:
+        """Apply the next keystroke to ``state`` and describe what changed"""
+        offset = self._apply(state, state.events)
+        if offset is None:
+            return None
+        return Change(offset, self.lines.index_of(offset), state.states[offset])
+
+    def state_after(self, events: int) -> ReplayState:
+        """Progress after the first ``events`` keystrokes"""
+        events = min(max(events, 0), len(self.log))
+        if events == len(self.log):
+            return self.final.copy()
+        state = self.keyframes[events // self.interval].copy()
+        for i in range(state.events, events):
+            self._apply(state, i)
+        return state
+
+    def state_at(self, time_ns: int) -> ReplayState:
+        """Progress once every keystroke logged at or before ``time_ns`` is in"""
+        return self.state_after(bisect_right(self.log.times, time_ns))
+
+
+def load_archive(path: str) -> SessionReplay:
+    """Build the replay of the session stored in a .cw archive"""
+    with CwReader(path) as archive:
+        text = archive.read_text("content.txt")
+        if KEYSTROKE_LOG_NAME not in archive:
+            raise ValueError(f"{path} has no keystroke log")
+        log = load_keystroke_log(archive.read(KEYSTROKE_LOG_NAME))
+    if log is None:
+        raise ValueError(f"{path} has a damaged keystroke log")
+    return SessionReplay(text, log)
+
+
+def main(argv=None) -> int:
+    """Replay a saved session as fast as possible and print its figures"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("archive", help=".cw archive with a keystroke log")
+    parser.add_argument("--at", type=float, metavar="SECONDS",
+                        help="stop at this many seconds into the session")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = load_archive(args.archive)
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error replaying session: {e}")
+        return 1
+
+    if args.at is None:
+        state = replay.final
+    else:
+        state = replay.state_at(int(args.at * 1_000_000_000))
+    print(f"Keystrokes: {state.events}/{len(replay)}")
+    print(f"Time: {state.time_ns / 1_000_000_000:.1f} s "
+          f"({state.active_ns / 1_000_000_000:.1f} s typing)")
+    print(f"WPM: {state.wpm:.1f}")
+    print(f"Accuracy: {state.accuracy:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+User settings for CoPywork
+"""
+import json
+import os
+from typing import Any, Dict
+
+# Values used for any setting missing from the settings file
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    # Python highlighting engine: "tokenize" (stdlib, faster) or "pygments"
+    "python_engine": "tokenize",
+    # Sliding windows of the WPM display, in seconds
+    "wpm_windows": [1, 10, 60],
+}
+
+
+class Settings:
+    """Loads optional JSON settings, falling back to DEFAULT_SETTINGS"""
+
+    def __init__(self, settings_path: str = "config/settings.json"):
+        self.settings_path = settings_path
+        self.values: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+        self.load_settings()
+
+    def load_settings(self) -> bool:
+        """Load settings from the JSON file; a missing file just keeps the defaults"""
+        self.values = dict(DEFAULT_SETTINGS)
+        if not os.path.exists(self.settings_path):
+            return False
+
+        try:
+            with open(self.settings_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading settings: {e}. Using defaults.")
+            return False
+
+        if not isinstance(data, dict):
+            print(f"Warning: Settings file {self.settings_path} is not a JSON object. Using defaults.")
+            return False
+
+        self.values.update(data)
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a setting, or ``default`` if it is unknown"""
+        return self.values.get(key, default)
@@ -3,12 +3,12 @@ Syntax highlighter for CoPywork using Pygments and VSCode themes
 """
 import tkinter as tk
 import tkinter.font as tkfont
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 import re
 
 try:
     from pygments import highlight
-    from pygments.lexers import PythonLexer, get_lexer_by_name
+    from pygments.lexers import get_lexer_by_name
     from pygments.token import Token
     from pygments.formatters import get_formatter_by_name
     PYGMENTS_AVAILABLE = True
@@ -48,6 +48,82 @@ except ImportError:
     Token.Literal.String.Doc = DummyToken()
 
 from .theme_loader import ThemeLoader
+from .compiled_theme import CompiledTheme, TokenStyle, wash_out_color
+from .lexers import get_lexer, language_for_file
+from .token_index import TokenIndex
+from .incremental import lex_document, relex
+from .highlight_worker import HighlightWorker
+from .highlight_scheduler import HighlightScheduler
+from .render_state import RenderState
+from .tag_batch import TagBatch, remove_tags
+from .token_cache import dump_token_index, lexer_key, load_token_index
+
+# Documents larger than this (in characters) are lexed on a worker thread and
+# tagged viewport-first by the scheduler, with the rest in time-boxed chunks
+BACKGROUND_HIGHLIGHT_THRESHOLD = 64 * 1024
+
+# Documents larger than this (in characters) are highlighted lazily: only the
+# visible lines plus a margin are tagged, the rest as it scrolls into view
+LAZY_HIGHLIGHT_THRESHOLD = 256 * 1024
+
+# Lines above and below the viewport (or practice cursor) tagged in lazy mode
+LAZY_HIGHLIGHT_MARGIN = 100
+
+# Milliseconds between checks for a finished background lex
+BACKGROUND_POLL_INTERVAL = 15
+
+# Suffix of the overlay tags that show typed characters in their normal color
+TYPED_SUFFIX = "_typed"
+
+# Empty tag separating syntax tags (below) from typed overlays (above)
+TYPED_FLOOR_TAG = "syntax_typed_floor"
+
+# Map Pygments tokens to VSCode scopes
+TOKEN_SCOPE_MAP = {
+    Token.Comment: "comment",
+    Token.Comment.Single: "comment",
+    Token.Comment.Multiline: "comment",
+    Token.Keyword: "keyword",
+    Token.Keyword.Constant: "keyword.control",
+    Token.Keyword.Declaration: "keyword.control",
+    Token.Keyword.Namespace: "keyword.control.import",
+    Token.Keyword.Reserved: "keyword.control",
+    Token.String: "string",
+    Token.String.Double: "string",
+    Token.String.Single: "string",
+    Token.Number: "constant.numeric",
+    Token.Number.Integer: "constant.numeric",
+    Token.Number.Float: "constant.numeric",
+    Token.Name.Function: "entity.name.function",
+    Token.Name.Class: "entity.name.class",
+    Token.Name.Builtin: "support.function",
+    Token.Name.Variable: "variable",
+    Token.Operator: "keyword.operator",
+    Token.Punctuation: "punctuation",
+    Token.Name.Decorator: "entity.name.function.decorator",
+    Token.Literal.String.Doc: "comment",
+}
+
+
+def scope_for_token(token_type, scope_map: Dict = TOKEN_SCOPE_MAP) -> Optional[str]:
+    """Map Pygments token to VSCode scope"""
+    # Direct mapping
+    if token_type in scope_map:
+        return scope_map[token_type]
+
+    # Try parent token types
+    for parent_type in token_type.split():
+        if parent_type in scope_map:
+            return scope_map[parent_type]
+
+    return None
+
+
+def _token_types(token_type):
+    """Yield ``token_type`` and all of its (known) subtypes"""
+    yield token_type
+    for subtype in token_type.subtypes:
+        yield from _token_types(subtype)
 
 
 class SyntaxHighlighter:
@@ -57,12 +133,42 @@ class SyntaxHighlighter:
         self.text_widget = text_widget
         self.theme_loader = theme_loader
         self.lexer = None
-        self.configured_tags = set()
-        self.configured_washed_tags = set()
+        self.token_index = None
 
-        # Initialize lexer if Pygments is available
-        if PYGMENTS_AVAILABLE:
-            self.lexer = PythonLexer()
+        # Language of the current file, and the one stored in its .cw archive
+        self.language = None
+        self.language_hint = None
+
+        # Token table from a .cw archive, used instead of lexing if it matches
+        self._token_cache = None
+
+        # Syntax tag -> the style it was configured with, and the overlays
+        # that show typed characters in their normal color
+        self.configured_tags: Dict[str, TokenStyle] = {}
+        self.typed_tags = set()
+
+        # Typed overlay carried by each character of ``_render_text``, so a
+        # keystroke swaps one tag instead of removing them all
+        self.render_state = RenderState()
+        self._render_text = None
+
+        # Whether syntax tags currently use the washed-out (practice) palette
+        self.washed_out = False
+
+        # Overlays are created above this tag, syntax tags below it
+        self.text_widget.tag_configure(TYPED_FLOOR_TAG)
+
+        # Coalesces edit and scroll requests into prioritized tagging jobs
+        self.scheduler = HighlightScheduler(self)
+        self._edit_file_path = None
+
+        # Background tokenization of large documents
+        self.worker = HighlightWorker(self.lexer, self._get_scope_for_token)
+        self._background_text = None
+
+        # Positions typed correctly while the background lex was running;
+        # their overlays are drawn once its index arrives
+        self._pending_typed = set()
 
         # Configure base font
         self.base_font = tkfont.Font(family='Fira Code', size=12)
@@ -71,100 +177,150 @@ class SyntaxHighlighter:
         self.bold_italic_font = tkfont.Font(family='Fira Code', size=12, weight='bold', slant='italic')
         
         # Map Pygments tokens to VSCode scopes
-        self.token_scope_map = {
-            Token.Comment: "comment",
-            Token.Comment.Single: "comment",
-            Token.Comment.Multiline: "comment",
-            Token.Keyword: "keyword",
-            Token.Keyword.Constant: "keyword.control",
-            Token.Keyword.Declaration: "keyword.control",
-            Token.Keyword.Namespace: "keyword.control.import",
-            Token.Keyword.Reserved: "keyword.control",
-            Token.String: "string",
-            Token.String.Double: "string",
-            Token.String.Single: "string",
-            Token.Number: "constant.numeric",
-            Token.Number.Integer: "constant.numeric",
-            Token.Number.Float: "constant.numeric",
-            Token.Name.Function: "entity.name.function",
-            Token.Name.Class: "entity.name.class",
-            Token.Name.Builtin: "support.function",
-            Token.Name.Variable: "variable",
-            Token.Operator: "keyword.operator",
-            Token.Punctuation: "punctuation",
-            Token.Name.Decorator: "entity.name.function.decorator",
-            Token.Literal.String.Doc: "comment",
-        }
-
-    def _hex_to_rgb(self, hex_color: str) -> tuple:
-        """Convert hex color to RGB tuple"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-
-    def _rgb_to_hex(self, rgb: tuple) -> str:
-        """Convert RGB tuple to hex color"""
-        return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+        self.token_scope_map = dict(TOKEN_SCOPE_MAP)
 
-    def _wash_out_color(self, hex_color: str, wash_factor: float = 0.3) -> str:
-        """Create a washed-out version of a color by blending with background"""
-        # Background color from theme
-        bg_color = self.theme_loader.get_editor_color("editor.background", "#333333")
+        # Token type -> scope -> style, resolved once instead of per token
+        self.theme = self._compile_theme()
 
-        # Convert colors to RGB
-        fg_rgb = self._hex_to_rgb(hex_color)
-        bg_rgb = self._hex_to_rgb(bg_color)
+    def _compile_theme(self) -> CompiledTheme:
+        """Build the style table for the loaded theme"""
+        theme = CompiledTheme(self.theme_loader,
+                              lambda token_type: scope_for_token(token_type, self.token_scope_map))
+        if PYGMENTS_AVAILABLE:
+            theme.compile_tokens(_token_types(Token))
+        return theme
 
-        # Blend colors (wash_factor determines how much of original color to keep)
-        washed_rgb = tuple(
-            int(fg_rgb[i] * wash_factor + bg_rgb[i] * (1 - wash_factor))
-            for i in range(3)
-        )
+    def reload_theme(self) -> bool:
+        """Reload the theme file and recolor the configured tags in place
+
+        Only ``tag_configure`` is called, twice per configured tag: the text
+        is neither re-lexed nor re-tagged, so this is fast for any document.
+        """
+        loaded = self.theme_loader.load_theme()
+        self.theme = self._compile_theme()
+        for tag_name, style in self.configured_tags.items():
+            self._apply_style(tag_name, self.theme.style(style.scope))
+        return loaded
+
+    def _wash_out_color(self, hex_color: str, wash_factor: float = 0.3) -> str:
+        """Create a washed-out version of a color by blending with background"""
+        return wash_out_color(hex_color, self.theme.background, wash_factor)
 
-        return self._rgb_to_hex(washed_rgb)
-    
     def is_python_file(self, file_path: str) -> bool:
         """Check if file should have Python syntax highlighting"""
-        if not file_path:
-            return False
-        return file_path.lower().endswith(('.py', '.py.cw'))
+        return language_for_file(file_path) == "python"
+
+    def supports_file(self, file_path: str) -> bool:
+        """Check if the file gets highlighting, switching to its language's lexer"""
+        language = language_for_file(file_path, self.language_hint)
+        if language != self.language:
+            lexer = get_lexer(language) if language and PYGMENTS_AVAILABLE else None
+            if lexer is None:
+                language = None
+            self._set_language(language, lexer)
+        return self.language is not None
+
+    def _set_language(self, language: Optional[str], lexer):
+        """Switch lexers; tokens of the previous language are dropped"""
+        self.language = language
+        if lexer is None or lexer is self.lexer:
+            return
+        self.lexer = lexer
+        self.worker.lexer = lexer
+        self.worker.cancel()
+        self._background_text = None
+        self._pending_typed.clear()
+        self.token_index = None
     
-    def configure_tag(self, tag_name: str, scope: str, washed_out: bool = False):
-        """Configure a text widget tag based on theme scope"""
-        tag_set = self.configured_washed_tags if washed_out else self.configured_tags
-
-        if tag_name in tag_set:
+    def configure_tag(self, tag_name: str, scope: Optional[str]):
+        """Configure a syntax tag and its typed overlay based on theme scope
+
+        The tag gets the color of the active palette; its ``_typed`` overlay
+        always gets the normal color. ``scope`` None configures the default
+        text tags.
+        """
+        if tag_name not in self.configured_tags:
+            self._configure_style(tag_name, self.theme.style(scope))
+
+    def _configure_style(self, tag_name: str, style: TokenStyle):
+        """Create ``tag_name`` and its typed overlay with ``style``"""
+        self._apply_style(tag_name, style)
+        self.text_widget.tag_lower(tag_name, TYPED_FLOOR_TAG)
+        self.typed_tags.add(tag_name + TYPED_SUFFIX)
+
+    def _apply_style(self, tag_name: str, style: TokenStyle):
+        """Give ``tag_name`` and its typed overlay the colors and font of ``style``"""
+        self.configured_tags[tag_name] = style
+
+        # The washed-out palette also dims text without a scope
+        font = self._font_for(style) if style.scope is not None else None
+        options = {"font": font} if font is not None else {}
+        self.text_widget.tag_configure(
+            tag_name, foreground=style.washed if self.washed_out else style.normal, **options)
+        self.text_widget.tag_configure(tag_name + TYPED_SUFFIX, foreground=style.foreground, **options)
+
+    def _font_for(self, style: TokenStyle):
+        """Choose the font matching the theme's bold/italic style"""
+        if style.bold and style.italic:
+            return self.bold_italic_font
+        elif style.bold:
+            return self.bold_font
+        elif style.italic:
+            return self.italic_font
+        return self.base_font
+
+    def _tag_for_scope(self, scope: Optional[str]) -> str:
+        """Return the (configured) syntax tag for ``scope``"""
+        style = self.theme.style(scope)
+        if style.tag not in self.configured_tags:
+            self._configure_style(style.tag, style)
+        return style.tag
+
+    def set_washed_out(self, washed_out: bool):
+        """Switch the syntax tags between the normal and washed-out palettes
+
+        Only the tag colors are reconfigured, so this costs one Tk call per
+        configured tag no matter how long the document is.
+        """
+        if washed_out == self.washed_out:
             return
+        self.washed_out = washed_out
+        for tag_name, style in self.configured_tags.items():
+            self.text_widget.tag_configure(
+                tag_name, foreground=style.washed if washed_out else style.normal)
 
-        foreground = self.theme_loader.get_foreground_color(scope)
-
-        # Apply wash-out effect if needed
-        if washed_out:
-            foreground = self._wash_out_color(foreground)
-
-        bold, italic = self.theme_loader.get_font_style(scope)
-
-        # Choose appropriate font
-        font = self.base_font
-        if bold and italic:
-            font = self.bold_italic_font
-        elif bold:
-            font = self.bold_font
-        elif italic:
-            font = self.italic_font
-
-        self.text_widget.tag_configure(tag_name, foreground=foreground, font=font)
-        tag_set.add(tag_name)
-    
     def clear_syntax_tags(self):
         """Clear all syntax highlighting tags"""
-        for tag in self.configured_tags:
-            self.text_widget.tag_remove(tag, "1.0", tk.END)
-        for tag in self.configured_washed_tags:
-            self.text_widget.tag_remove(tag, "1.0", tk.END)
+        remove_tags(self.text_widget, self.configured_tags)
+
+    def clear_typed(self):
+        """Remove the typed-character overlay from the whole text"""
+        remove_tags(self.text_widget, self.typed_tags)
+        self.render_state.reset()
+        self._pending_typed.clear()
+
+    def draw_typed(self, runs: Iterable[Tuple[int, int]]):
+        """Give the characters in the ``(start, end)`` offset runs their typed overlay
+
+        Redraws typed progress in one Tk call per overlay tag; characters
+        are expected to carry no overlay yet.
+        """
+        index = self.token_index
+        if index is None:
+            return
+        state = self._render_state_for(index)
+        batch = TagBatch()
+        for start, end in runs:
+            for token_start, token_end, scope in index.spans(start, end):
+                token_start, token_end = max(token_start, start), min(token_end, end)
+                typed_tag = self._tag_for_scope(scope) + TYPED_SUFFIX
+                batch.add(typed_tag, token_start, token_end)
+                state.fill(token_start, token_end, typed_tag)
+        batch.flush(self.text_widget, index.position_of)
 
     def highlight_text_practice_mode(self, file_path: str = None):
         """Apply washed-out syntax highlighting for practice mode"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+        if not self.supports_file(file_path):
             return
 
         # Get text content
@@ -172,168 +328,188 @@ class SyntaxHighlighter:
         if not content.strip():
             return
 
-        # Clear existing syntax tags
-        self.clear_syntax_tags()
-
         try:
-            # First, apply a default washed-out color to ALL text
-            self._apply_default_washed_color()
-
-            # Then, tokenize the content and apply specific syntax highlighting
-            tokens = list(self.lexer.get_tokens(content))
-
-            # Apply washed-out highlighting for syntax tokens
-            self._apply_token_highlighting(tokens, washed_out=True)
+            self.set_washed_out(True)
+            self._highlight_content(content)
 
         except Exception as e:
             print(f"Error during practice mode syntax highlighting: {e}")
 
-    def _apply_default_washed_color(self):
-        """Apply default washed-out color to all text"""
-        # Get the default foreground color from theme
-        default_color = self.theme_loader.get_editor_color("editor.foreground", "#C1E4F6")
-        washed_default_color = self._wash_out_color(default_color)
-
-        # Configure a default washed tag
-        default_washed_tag = "default_text_washed"
-        self.text_widget.tag_configure(default_washed_tag, foreground=washed_default_color)
-
-        # Apply to all text
-        self.text_widget.tag_add(default_washed_tag, "1.0", tk.END)
-        self.configured_washed_tags.add(default_washed_tag)
-
-    def restore_normal_color_at_position(self, position: str, file_path: str = None):
-        """Restore normal syntax highlighting color at a specific position"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+    def _highlight_content(self, content: str):
+        """Tag ``content`` from the cached index, a fresh lex or a background lex"""
+        index = self.token_index
+        if index is None or index.text != content:
+            index = self._load_token_cache(content)
+
+        if index is not None:
+            # The text has not changed since it was last lexed
+            self.token_index = index
+            self._apply_document_highlighting(index)
+        elif len(content) > BACKGROUND_HIGHLIGHT_THRESHOLD:
+            if self._background_text != content:
+                self.token_index = None
+                self._background_text = content
+                self._pending_typed.clear()
+                generation = self.worker.submit(content)
+                self.text_widget.after(BACKGROUND_POLL_INTERVAL, self._poll_worker, generation)
+        else:
+            index = self._rebuild_token_index(content)
+            self._apply_document_highlighting(index)
+
+    def cancel_pending(self):
+        """Drop scheduled tagging and any background lex, before a new document loads"""
+        self.scheduler.reset()
+        self.worker.cancel()
+        self._background_text = None
+        self._pending_typed.clear()
+
+    def preload_token_cache(self, data: bytes):
+        """Keep a token table from a .cw archive for the next highlight"""
+        self._token_cache = data
+
+    def _load_token_cache(self, content: str) -> Optional[TokenIndex]:
+        """Use the preloaded token table if it was built from ``content``"""
+        data, self._token_cache = self._token_cache, None
+        if data is None or self.lexer is None:
+            return None
+        return load_token_index(data, content, lexer_key(self.language, self.lexer))
+
+    def export_token_cache(self) -> Optional[bytes]:
+        """Serialize the token index if it matches the text in the widget"""
+        index = self.token_index
+        if index is None or self.language is None:
+            return None
+        if index.text != self.text_widget.get("1.0", tk.END):
+            return None
+        return dump_token_index(index, lexer_key(self.language, self.lexer))
+
+    def _poll_worker(self, generation: int):
+        """Apply the background lex result once it is ready"""
+        if not self.worker.is_current(generation):
             return
 
-        # Get the character at the position
-        char = self.text_widget.get(position)
-        if not char or char == '\n':
+        result = self.worker.poll()
+        if result is None:
+            self.text_widget.after(BACKGROUND_POLL_INTERVAL, self._poll_worker, generation)
             return
 
-        # Find which syntax tag should apply to this position
-        # We'll need to re-tokenize to find the correct scope
-        self._update_position_highlighting(position, file_path)
-
-    def apply_incorrect_color_at_position(self, position: str):
-        """Apply bright red color for incorrect typing at a specific position"""
-        # Remove any existing syntax highlighting tags at this position
-        for tag in list(self.configured_tags) + list(self.configured_washed_tags):
-            self.text_widget.tag_remove(tag, position)
+        try:
+            _, index = result
+            self._background_text = None
+            if index is None:
+                # The background lex failed; lex the current text here instead
+                index = self._rebuild_token_index(self.text_widget.get("1.0", tk.END))
+            self.token_index = index
+            self._apply_document_highlighting(index)
+            self._apply_pending_typed(index)
 
-        # Also remove default tags
-        self.text_widget.tag_remove("default_text_normal", position)
-        self.text_widget.tag_remove("default_text_washed", position)
+        except Exception as e:
+            print(f"Error applying background syntax highlighting: {e}")
+
+    def _apply_pending_typed(self, index: TokenIndex):
+        """Draw the overlays of the characters typed before ``index`` was ready"""
+        pending, self._pending_typed = self._pending_typed, set()
+        text = index.text
+        offsets = sorted(index.offset_of(position) for position in pending)
+        self.draw_typed((offset, offset + 1) for offset in offsets
+                        if offset < len(text) and text[offset] != '\n')
+
+    def _apply_document_highlighting(self, index: TokenIndex):
+        """Replace all syntax tags with the ones for ``index``"""
+        # Clear existing syntax tags
+        self.clear_syntax_tags()
+        self._highlight_document(index)
 
-        # The incorrect tag will be applied by the main typing logic
-        # This method just ensures syntax tags are cleared
+    def restore_normal_color_at_position(self, position: str, file_path: str = None,
+                                         offset: Optional[int] = None):
+        """Restore normal syntax highlighting color at a specific position
 
-    def restore_washed_color_at_position(self, position: str, file_path: str = None):
-        """Restore washed-out syntax highlighting for a specific position"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+        ``offset`` is the offset of ``position``, when the caller knows it.
+        """
+        if not self.supports_file(file_path):
             return
 
-        # Remove any existing tags at this position
-        for tag in list(self.configured_tags) + list(self.configured_washed_tags):
-            self.text_widget.tag_remove(tag, position)
+        index = self.token_index
+        if index is None:
+            # Never lex from a keystroke; a running background lex draws it later
+            if self._background_text is not None:
+                self._pending_typed.add(position)
+            return
 
-        # Also remove default tags
-        self.text_widget.tag_remove("default_text_normal", position)
-        self.text_widget.tag_remove("default_text_washed", position)
+        try:
+            if offset is None:
+                offset = index.offset_of(position)
+            if offset >= len(index.text) or index.text[offset] == '\n':
+                return
+
+            # Show the character through the overlay of its scope's tag,
+            # replacing the one overlay it may already carry
+            scope = index.scope_at(offset)
+            typed_tag = self._tag_for_scope(scope) + TYPED_SUFFIX
+            previous = self._render_state_for(index).set(offset, typed_tag)
+            if previous == typed_tag:
+                return
+            if previous is not None:
+                self.text_widget.tag_remove(previous, position)
+            self.text_widget.tag_add(typed_tag, position)
 
-        # Get the character at the position
-        char = self.text_widget.get(position)
-        if not char or char == '\n':
-            return
+        except Exception as e:
+            print(f"Error updating position highlighting: {e}")
 
-        # Find which syntax tag should apply to this position
-        self._apply_washed_color_at_position(position, file_path)
+    def apply_incorrect_color_at_position(self, position: str, offset: Optional[int] = None):
+        """Apply bright red color for incorrect typing at a specific position"""
+        # Drop the typed overlay; the incorrect tag applied by the main typing
+        # logic sits above the syntax palette
+        self._remove_typed_at(position, offset)
 
-    def _apply_washed_color_at_position(self, position: str, file_path: str):
-        """Apply washed-out syntax highlighting for a specific position"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+    def restore_washed_color_at_position(self, position: str, file_path: str = None,
+                                         offset: Optional[int] = None):
+        """Restore washed-out syntax highlighting for a specific position"""
+        if not self.supports_file(file_path):
             return
 
-        # Get text content
-        content = self.text_widget.get("1.0", tk.END)
-        if not content.strip():
+        # The syntax tag underneath shows through once the overlay is gone
+        self._remove_typed_at(position, offset)
+
+    def _remove_typed_at(self, position: str, offset: Optional[int] = None):
+        """Remove the typed overlay from the character at ``position`` (``offset``)"""
+        index = self.token_index
+        if index is None:
+            # Overlays cannot be located without the index; remove any of them
+            self._pending_typed.discard(position)
+            remove_tags(self.text_widget, self.typed_tags, position, f"{position}+1c")
             return
 
         try:
-            # Convert position to character index
-            line, col = position.split('.')
-            line_num = int(line)
-            col_num = int(col)
-            next_pos = f"{line}.{int(col)+1}"
-
-            # Tokenize the content
-            tokens = list(self.lexer.get_tokens(content))
-
-            # Find the token that contains this position
-            current_line = 1
-            current_col = 0
-            found_token = False
-
-            for token_type, text in tokens:
-                if not text:
-                    continue
-
-                # Calculate token end position
-                lines = text.split('\n')
-                if len(lines) > 1:
-                    end_line = current_line + len(lines) - 1
-                    end_col = len(lines[-1])
-                else:
-                    end_line = current_line
-                    end_col = current_col + len(text)
-
-                # Check if our position is within this token
-                if (current_line < line_num < end_line or
-                    (current_line == line_num and current_col <= col_num < end_col) or
-                    (end_line == line_num and col_num < end_col)):
-
-                    found_token = True
-                    # Apply washed-out tag for this position
-                    scope = self._get_scope_for_token(token_type)
-                    if scope:
-                        washed_tag = f"syntax_{scope.replace('.', '_')}_washed"
-                        # Configure and apply washed tag
-                        self.configure_tag(washed_tag, scope, washed_out=True)
-                        self.text_widget.tag_add(washed_tag, position, next_pos)
-                    else:
-                        # No specific scope, apply default washed color
-                        self._apply_default_washed_at_position(position, next_pos)
-                    break
-
-                # Update position for next token
-                current_line = end_line
-                current_col = end_col
-
-            # If no token was found, apply default washed color
-            if not found_token:
-                self._apply_default_washed_at_position(position, next_pos)
+            if offset is None:
+                offset = index.offset_of(position)
+            previous = self._render_state_for(index).clear(offset)
+            if previous is not None:
+                self.text_widget.tag_remove(previous, position)
 
         except Exception as e:
-            print(f"Error applying washed color at position: {e}")
-
-    def _apply_default_washed_at_position(self, position: str, next_pos: str):
-        """Apply default washed color to a specific position"""
-        default_washed_tag = "default_text_washed"
+            print(f"Error updating position highlighting: {e}")
 
-        # Configure the tag if not already done
-        if default_washed_tag not in self.configured_washed_tags:
-            default_color = self.theme_loader.get_editor_color("editor.foreground", "#C1E4F6")
-            washed_default_color = self._wash_out_color(default_color)
-            self.text_widget.tag_configure(default_washed_tag, foreground=washed_default_color)
-            self.configured_washed_tags.add(default_washed_tag)
+    def _render_state_for(self, index: TokenIndex) -> RenderState:
+        """Return the overlay state of ``index.text``
+
+        After an edit (or a new document) the state is read back from the
+        widget, where Tk has kept each overlay on the characters it moved
+        with: one ``tag ranges`` call per overlay tag.
+        """
+        if index.text != self._render_text:
+            state = self.render_state
+            state.reset()
+            for typed_tag in self.typed_tags:
+                ranges = self.text_widget.tag_ranges(typed_tag)
+                for start, end in zip(ranges[0::2], ranges[1::2]):
+                    state.fill(index.offset_of(str(start)), index.offset_of(str(end)), typed_tag)
+            self._render_text = index.text
+        return self.render_state
 
-        # Apply the tag
-        self.text_widget.tag_add(default_washed_tag, position, next_pos)
-    
     def highlight_text(self, file_path: str = None):
         """Apply syntax highlighting to the entire text"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+        if not self.supports_file(file_path):
             return
         
         # Get text content
@@ -341,151 +517,141 @@ class SyntaxHighlighter:
         if not content.strip():
             return
         
-        # Clear existing syntax tags
-        self.clear_syntax_tags()
-        
         try:
-            # Tokenize the content
-            tokens = list(self.lexer.get_tokens(content))
-            
-            # Apply highlighting
-            self._apply_token_highlighting(tokens)
+            self.set_washed_out(False)
+            self._highlight_content(content)
             
         except Exception as e:
             print(f"Error during syntax highlighting: {e}")
     
-    def _apply_token_highlighting(self, tokens: List[Tuple], washed_out: bool = False):
-        """Apply highlighting based on tokens"""
-        line_num = 1
-        col_num = 0
-
-        for token_type, text in tokens:
-            if not text:
-                continue
-
-            # Calculate positions
-            start_pos = f"{line_num}.{col_num}"
-
-            # Update position based on text content
-            lines = text.split('\n')
-            if len(lines) > 1:
-                line_num += len(lines) - 1
-                col_num = len(lines[-1])
-            else:
-                col_num += len(text)
-
-            end_pos = f"{line_num}.{col_num}"
-
-            # Get scope for this token type
-            scope = self._get_scope_for_token(token_type)
-            if scope:
-                suffix = "_washed" if washed_out else ""
-                tag_name = f"syntax_{scope.replace('.', '_')}{suffix}"
-                self.configure_tag(tag_name, scope, washed_out=washed_out)
-                self.text_widget.tag_add(tag_name, start_pos, end_pos)
-    
-    def _get_scope_for_token(self, token_type) -> Optional[str]:
-        """Map Pygments token to VSCode scope"""
-        # Direct mapping
-        if token_type in self.token_scope_map:
-            return self.token_scope_map[token_type]
+    def _apply_token_highlighting(self, index: TokenIndex, start: int = 0,
+                                  end: Optional[int] = None):
+        """Apply highlighting based on the token index"""
+        batch = TagBatch()
 
-        # Try parent token types
-        for parent_type in token_type.split():
-            if parent_type in self.token_scope_map:
-                return self.token_scope_map[parent_type]
+        for token_start, token_end, scope in index.spans(start, end):
+            batch.add(self._tag_for_scope(scope), token_start, token_end)
 
-        return None
+        batch.flush(self.text_widget, index.position_of)
 
-    def _update_position_highlighting(self, position: str, file_path: str):
-        """Update syntax highlighting for a specific position"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+    def _highlight_document(self, index: TokenIndex):
+        """Tag the whole document, or the viewport first for large files"""
+        size = len(index.text)
+
+        if size <= BACKGROUND_HIGHLIGHT_THRESHOLD:
+            self.scheduler.reset()
+            self._apply_token_highlighting(index)
             return
 
-        # Get text content
-        content = self.text_widget.get("1.0", tk.END)
-        if not content.strip():
+        # Tag the viewport now; the scheduler tags the rest in time-boxed
+        # chunks, or only as it scrolls into view for very large files
+        self.scheduler.reset(size, tag_rest=size <= LAZY_HIGHLIGHT_THRESHOLD)
+        self.scheduler.tag_region(*self.visible_range())
+        self.scheduler.request_view()
+
+    def _line_range(self, first_line: int, last_line: int) -> Tuple[int, int]:
+        """Offsets spanning lines ``first_line..last_line`` (1-based) plus the margin"""
+        index = self.token_index
+        if index is None:
+            return 0, 0
+        line_starts = index.line_starts
+        first = min(max(first_line - LAZY_HIGHLIGHT_MARGIN, 1), len(line_starts))
+        last = last_line + LAZY_HIGHLIGHT_MARGIN
+        start = line_starts[first - 1]
+        end = line_starts[last] if last < len(line_starts) else len(index.text)
+        return start, end
+
+    def visible_range(self) -> Tuple[int, int]:
+        """Offsets of the visible lines plus a margin"""
+        first_line = int(self.text_widget.index("@0,0").split('.')[0])
+        last_line = int(self.text_widget.index(
+            f"@0,{self.text_widget.winfo_height()}").split('.')[0])
+        return self._line_range(first_line, last_line)
+
+    def cursor_range(self) -> Tuple[int, int]:
+        """Offsets of the lines around the insertion (practice) cursor"""
+        line = int(self.text_widget.index("insert").split('.')[0])
+        return self._line_range(line, line)
+
+    def document_length(self) -> int:
+        """Length of the indexed document"""
+        return len(self.token_index.text) if self.token_index is not None else 0
+
+    def ensure_highlighted_around(self, line: int):
+        """Tag untagged lines around ``line`` of the practice cursor right away"""
+        if not self.scheduler.dirty or self.token_index is None:
+            return
+
+        self.scheduler.tag_region(*self._line_range(line, line))
+
+    def on_view_changed(self, first=None, last=None):
+        """``yscrollcommand`` hook: tag newly visible lines once the view settles"""
+        self.scheduler.request_view()
+
+    def _rebuild_token_index(self, content: str) -> TokenIndex:
+        """Lex ``content`` once and cache the resulting token index"""
+        self.token_index = lex_document(self.lexer, content, self._get_scope_for_token)
+        return self.token_index
+
+    def _get_scope_for_token(self, token_type) -> Optional[str]:
+        """Map Pygments token to VSCode scope"""
+        return self.theme.scope_for_token(token_type)
+
+    def schedule_update(self, file_path: str = None):
+        """Queue an incremental update; bursts of requests share one job"""
+        self._edit_file_path = file_path
+        self.scheduler.request_update()
+
+    def update_highlighting(self, file_path: str = None):
+        """Re-lex and re-tag only the region damaged by the last edit"""
+        self._edit_file_path = file_path
+        self.scheduler.update_pending = True
+        self.scheduler.run_now()
+
+    def apply_pending_edit(self):
+        """Re-lex the edited text and mark the damaged region dirty"""
+        file_path = self._edit_file_path
+        if not self.supports_file(file_path):
+            return
+
+        if self.token_index is None:
+            # Nothing to update incrementally yet (or a background lex is running)
+            self.highlight_text(file_path)
             return
 
+        content = self.text_widget.get("1.0", tk.END)
+        old_length = len(self.token_index.text)
+
         try:
-            # Convert position to character index
-            line, col = position.split('.')
-            line_num = int(line)
-            col_num = int(col)
-            next_pos = f"{line}.{int(col)+1}"
-
-            # Remove all washed tags from this position first
-            for tag in self.configured_washed_tags:
-                self.text_widget.tag_remove(tag, position)
-
-            # Tokenize the content
-            tokens = list(self.lexer.get_tokens(content))
-
-            # Find the token that contains this position
-            current_line = 1
-            current_col = 0
-            found_token = False
-
-            for token_type, text in tokens:
-                if not text:
-                    continue
-
-                # Calculate token end position
-                lines = text.split('\n')
-                if len(lines) > 1:
-                    end_line = current_line + len(lines) - 1
-                    end_col = len(lines[-1])
-                else:
-                    end_line = current_line
-                    end_col = current_col + len(text)
-
-                # Check if our position is within this token
-                if (current_line < line_num < end_line or
-                    (current_line == line_num and current_col <= col_num < end_col) or
-                    (end_line == line_num and col_num < end_col)):
-
-                    found_token = True
-                    # Apply normal syntax highlighting for this position
-                    scope = self._get_scope_for_token(token_type)
-                    if scope:
-                        normal_tag = f"syntax_{scope.replace('.', '_')}"
-                        # Configure and apply normal tag
-                        self.configure_tag(normal_tag, scope, washed_out=False)
-                        self.text_widget.tag_add(normal_tag, position, next_pos)
-                    else:
-                        # No specific scope, apply default normal color
-                        self._apply_default_normal_at_position(position, next_pos)
-                    break
-
-                # Update position for next token
-                current_line = end_line
-                current_col = end_col
-
-            # If no token was found, apply default normal color
-            if not found_token:
-                self._apply_default_normal_at_position(position, next_pos)
+            index, start, end = relex(self.token_index, content, self.lexer,
+                                      self._get_scope_for_token)
+            self.token_index = index
+            if start < end:
+                self.scheduler.edited(start, end - (len(content) - old_length), end)
 
         except Exception as e:
-            print(f"Error updating position highlighting: {e}")
+            print(f"Error during incremental syntax highlighting: {e}")
 
-    def _apply_default_normal_at_position(self, position: str, next_pos: str):
-        """Apply default normal color to a specific position"""
-        default_normal_tag = "default_text_normal"
+    def _clear_region(self, index: TokenIndex, start: int, end: int):
+        """Remove the syntax tags from ``[start, end)``"""
+        remove_tags(self.text_widget, self.configured_tags,
+                    index.position_of(start), index.position_of(end))
 
-        # Configure the tag if not already done
-        if default_normal_tag not in self.configured_tags:
-            default_color = self.theme_loader.get_editor_color("editor.foreground", "#C1E4F6")
-            self.text_widget.tag_configure(default_normal_tag, foreground=default_color)
-            self.configured_tags.add(default_normal_tag)
+    def retag_region(self, start: int, end: int):
+        """Replace the syntax tags on ``[start, end)`` with the indexed tokens"""
+        index = self.token_index
+        if index is None:
+            return
+        self._clear_region(index, start, end)
+        self._apply_token_highlighting(index, start, end)
 
-        # Apply the tag
-        self.text_widget.tag_add(default_normal_tag, position, next_pos)
-    
     def highlight_range(self, start: str, end: str, file_path: str = None):
         """Highlight a specific range of text (for incremental updates)"""
-        if not PYGMENTS_AVAILABLE or not self.is_python_file(file_path):
+        if not self.supports_file(file_path):
             return
-        
-        # For now, just re-highlight the entire text
-        # This could be optimized for better performance
-        self.highlight_text(file_path)
+
+        self.update_highlighting(file_path)
+        index = self.token_index
+        if index is not None:
+            self.retag_region(index.offset_of(self.text_widget.index(start)),
+                              index.offset_of(self.text_widget.index(end)))
@@ -0,0 +1,64 @@
+"""
+Batched tag operations for CoPywork syntax highlighting
+"""
+from typing import Callable, Dict, Iterable, List
+
+# Tcl lambda removing several tags from a range; run with ``apply`` so its
+# loop variable stays local instead of being left in the global scope
+_REMOVE_TAGS = "{widget tags start end} {foreach tag $tags {$widget tag remove $tag $start $end}}"
+
+
+class TagBatch:
+    """Collects tag ranges and sends them to a Text widget in bulk
+
+    Every ``tag_add`` is a separate round-trip into Tcl, but Tk's
+    ``tag add`` accepts any number of index pairs. Ranges are therefore
+    grouped per tag and flushed with one call per tag. A range that starts
+    where the previous range of the same tag ended extends it instead of
+    adding a new pair.
+    """
+
+    def __init__(self):
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def add(self, tag: str, start: int, end: int):
+        """Queue ``[start, end)`` (character offsets) for ``tag``"""
+        ends = self._ends.get(tag)
+        if ends is None:
+            self._starts[tag] = [start]
+            self._ends[tag] = [end]
+        elif ends[-1] == start:
+            ends[-1] = end
+        else:
+            self._starts[tag].append(start)
+            ends.append(end)
+
+    def ranges(self, tag: str) -> List[tuple]:
+        """Return the merged ``(start, end)`` ranges queued for ``tag``"""
+        return list(zip(self._starts.get(tag, ()), self._ends.get(tag, ())))
+
+    def flush(self, text_widget, position_of: Callable[[int], str]) -> int:
+        """Apply every queued range and return the number of Tk calls made"""
+        calls = 0
+        for tag, starts in self._starts.items():
+            indices = []
+            for start, end in zip(starts, self._ends[tag]):
+                indices.append(position_of(start))
+                indices.append(position_of(end))
+            text_widget.tag_add(tag, *indices)
+            calls += 1
+        self._starts = {}
+        self._ends = {}
+        return calls
+
+
+def remove_tags(text_widget, tags: Iterable[str], start: str = "1.0", end: str = "end"):
+    """Remove several tags from ``start..end`` in a single Tcl call"""
+    tags = tuple(tags)
+    if not tags:
+        return
+    text_widget.tk.call("apply", _REMOVE_TAGS, str(text_widget), tags, start, end)
@@ -14,10 +14,16 @@ class ThemeLoader:
         self.theme_data = None
         self.token_colors = {}
         self.editor_colors = {}
+        # Scope -> resolved style (or None), filled in by get_token_style
+        self._style_cache: Dict[str, Optional[Dict]] = {}
+        # Modification time of the theme file when it was last loaded
+        self.theme_mtime = None
         self.load_theme()
     
     def load_theme(self) -> bool:
         """Load theme from JSON file"""
+        self._style_cache.clear()
+        self.theme_mtime = self._file_mtime()
         try:
             if not os.path.exists(self.theme_path):
                 print(f"Warning: Theme file {self.theme_path} not found. Using defaults.")
@@ -35,8 +41,22 @@ class ThemeLoader:
             self._load_default_theme()
             return False
     
+    def _file_mtime(self) -> Optional[int]:
+        """Modification time of the theme file (None if it does not exist)"""
+        try:
+            return os.stat(self.theme_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def has_changed(self) -> bool:
+        """Check if the theme file was modified since it was last loaded"""
+        return self._file_mtime() != self.theme_mtime
+
     def _parse_theme(self):
         """Parse the loaded theme data"""
+        self.editor_colors = {}
+        self.token_colors = {}
+
         # Parse editor colors
         if 'colors' in self.theme_data:
             self.editor_colors = self.theme_data['colors']
@@ -76,19 +96,22 @@ class ThemeLoader:
     
     def get_token_style(self, scope: str) -> Optional[Dict]:
         """Get style for a specific scope with fallback logic"""
-        # Direct match
-        if scope in self.token_colors:
-            return self.token_colors[scope]
-        
-        # Try fallback to parent scope
-        # e.g., "keyword.control.import" -> "keyword.control" -> "keyword"
-        parts = scope.split('.')
-        for i in range(len(parts) - 1, 0, -1):
-            parent_scope = '.'.join(parts[:i])
-            if parent_scope in self.token_colors:
-                return self.token_colors[parent_scope]
-        
-        return None
+        if scope in self._style_cache:
+            return self._style_cache[scope]
+
+        style = self.token_colors.get(scope)
+        if style is None:
+            # Try fallback to parent scope
+            # e.g., "keyword.control.import" -> "keyword.control" -> "keyword"
+            parts = scope.split('.')
+            for i in range(len(parts) - 1, 0, -1):
+                parent_scope = '.'.join(parts[:i])
+                if parent_scope in self.token_colors:
+                    style = self.token_colors[parent_scope]
+                    break
+
+        self._style_cache[scope] = style
+        return style
     
     def get_editor_color(self, key: str, default: str = "#C1E4F6") -> str:
         """Get editor color with fallback to default"""
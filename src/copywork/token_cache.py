@@ -0,0 +1,138 @@
+"""
+Persisted token tables for CoPywork .cw archives
+"""
+import hashlib
+import json
+import struct
+import sys
+from array import array
+from typing import Optional
+
+try:
+    import pygments
+    PYGMENTS_VERSION = pygments.__version__
+except ImportError:
+    PYGMENTS_VERSION = None
+
+from .token_index import TokenIndex
+
+# Archive member holding the table
+TOKEN_CACHE_NAME = "tokens.bin"
+
+# Bump when the table layout or the token -> scope mapping changes
+TOKEN_CACHE_VERSION = 1
+
+_MAGIC = b"CWTK"
+_HEADER = struct.Struct("<4sHI")
+
+
+def content_hash(text: str) -> str:
+    """Hash of the text a token table was built from"""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def lexer_key(language: str, lexer) -> str:
+    """Identify the lexer (and its version) that produced a token table
+
+    The Python version is part of the key: the ``tokenize`` engine's output
+    differs between interpreters.
+    """
+    lexer_class = type(lexer)
+    python_version = "%d.%d" % sys.version_info[:2]
+    return (f"{language}:{lexer_class.__module__}.{lexer_class.__name__}:"
+            f"{PYGMENTS_VERSION}:py{python_version}")
+
+
+def little_endian(values: array) -> bytes:
+    """Serialize an array in little-endian byte order"""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def read_array(typecode: str, data: bytes, offset: int, count: int) -> array:
+    """Read ``count`` little-endian items of ``typecode`` at ``offset``"""
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(data):
+        raise ValueError("binary data is truncated")
+    values.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def dump_token_index(index: TokenIndex, key: str) -> bytes:
+    """Serialize ``index`` into a compact binary token table
+
+    Layout: magic, format version, header length, a JSON header (content
+    hash, lexer key, scope names, checkpoint states) and then one array of
+    uint32 token start offsets, one of uint16 scope ids and one of uint16
+    state ids (0 = no checkpoint). Token lengths follow from consecutive
+    offsets, so they are not stored.
+    """
+    state_table = []
+    state_ids = {}
+    state_column = array("H")
+    for state in index.states:
+        if state is None:
+            state_column.append(0)
+            continue
+        state_id = state_ids.get(state)
+        if state_id is None:
+            state_table.append(list(state))
+            state_id = state_ids[state] = len(state_table)
+        state_column.append(state_id)
+
+    header = json.dumps({
+        "hash": content_hash(index.text),
+        "lexer": key,
+        "count": len(index),
+        "scopes": index.scopes[1:],
+        "states": state_table,
+    }).encode("utf-8")
+
+    return b"".join((
+        _HEADER.pack(_MAGIC, TOKEN_CACHE_VERSION, len(header)),
+        header,
+        little_endian(array("I", index.starts)),
+        little_endian(index.scope_ids),
+        little_endian(state_column),
+    ))
+
+
+def load_token_index(data: bytes, text: str, key: str) -> Optional[TokenIndex]:
+    """Rebuild the index for ``text`` from a token table
+
+    Returns None if the table is damaged, from another format version, or
+    was built from different text or by a different lexer.
+    """
+    try:
+        magic, version, header_length = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != TOKEN_CACHE_VERSION:
+            return None
+        offset = _HEADER.size
+        header = json.loads(data[offset:offset + header_length].decode("utf-8"))
+        if header["lexer"] != key or header["hash"] != content_hash(text):
+            return None
+
+        count = header["count"]
+        offset += header_length
+        starts = read_array("I", data, offset, count)
+        offset += count * starts.itemsize
+        scope_ids = read_array("H", data, offset, count)
+        offset += count * scope_ids.itemsize
+        state_column = read_array("H", data, offset, count)
+
+        scopes = [None] + header["scopes"]
+        state_table = [None] + [tuple(state) for state in header["states"]]
+        if count and (starts[-1] >= len(text) or max(scope_ids) >= len(scopes)
+                      or max(state_column) >= len(state_table)):
+            return None
+
+        states = [state_table[state_id] for state_id in state_column]
+        return TokenIndex.from_arrays(text, array("l", starts), scope_ids, scopes, states)
+
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,154 @@
+"""
+Token span index for CoPywork syntax highlighting
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .line_index import LineIndex
+
+
+class TokenIndex:
+    """Sorted offset -> scope index over a lexed document
+
+    Tokens are stored as parallel arrays: the start offset of every
+    non-empty token and the id of its scope in ``scopes``. Scope id 0 is
+    reserved for text without a theme scope. Lookups bisect over the start
+    offsets, so finding the scope of a character is O(log n) instead of a
+    re-lex of the whole document.
+
+    ``states`` holds the lexer state for tokens that start a line (None
+    elsewhere); these are the checkpoints incremental re-lexing restarts from.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = array('l')
+        self.scope_ids = array('H')
+        self.states: List[Optional[tuple]] = []
+        self.scopes: List[Optional[str]] = [None]
+        self._scope_ids = {None: 0}
+        self._lines: Optional[LineIndex] = None
+
+    @classmethod
+    def from_tokens(cls, text: str, tokens: Iterable[Tuple[int, object, str]],
+                    scope_for: Callable[[object], Optional[str]]) -> 'TokenIndex':
+        """Build an index from ``(offset, token_type, value)`` tuples"""
+        index = cls(text)
+        for offset, token_type, value in tokens:
+            if value:
+                index.append(offset, scope_for(token_type))
+        return index
+
+    @classmethod
+    def from_arrays(cls, text: str, starts: array, scope_ids: array,
+                    scopes: List[Optional[str]], states: List[Optional[tuple]]) -> 'TokenIndex':
+        """Build an index from ready-made arrays (``scopes[0]`` must be None)"""
+        index = cls(text)
+        index.starts = starts
+        index.scope_ids = scope_ids
+        index.states = states
+        index.scopes = scopes
+        index._scope_ids = {scope: i for i, scope in enumerate(scopes)}
+        return index
+
+    def scope_id(self, scope: Optional[str]) -> int:
+        """Intern a scope name and return its id"""
+        scope_id = self._scope_ids.get(scope)
+        if scope_id is None:
+            scope_id = len(self.scopes)
+            self.scopes.append(scope)
+            self._scope_ids[scope] = scope_id
+        return scope_id
+
+    def append(self, offset: int, scope: Optional[str], state: Optional[tuple] = None):
+        """Append a token starting at ``offset``; offsets must be increasing"""
+        self.starts.append(offset)
+        self.scope_ids.append(self.scope_id(scope))
+        self.states.append(state)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def token_at(self, offset: int) -> int:
+        """Return the index of the token containing ``offset`` (-1 if none)"""
+        if offset < 0 or offset >= len(self.text):
+            return -1
+        return bisect_right(self.starts, offset) - 1
+
+    def scope_at(self, offset: int) -> Optional[str]:
+        """Return the theme scope of the character at ``offset``"""
+        i = self.token_at(offset)
+        if i < 0:
+            return None
+        return self.scopes[self.scope_ids[i]]
+
+    def token_end(self, i: int) -> int:
+        """Return the end offset of token ``i``"""
+        if i + 1 < len(self.starts):
+            return self.starts[i + 1]
+        return len(self.text)
+
+    def spans(self, start: int = 0, end: Optional[int] = None
+              ) -> Iterator[Tuple[int, int, Optional[str]]]:
+        """Yield ``(start, end, scope)`` for tokens overlapping ``[start, end)``"""
+        if end is None:
+            end = len(self.text)
+        scopes = self.scopes
+        first = max(bisect_right(self.starts, start) - 1, 0)
+        last = bisect_left(self.starts, end)
+        for i in range(first, last):
+            yield self.starts[i], self.token_end(i), scopes[self.scope_ids[i]]
+
+    @property
+    def lines(self) -> LineIndex:
+        """Line index of ``text``, built on first use"""
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        return self._lines
+
+    @property
+    def line_starts(self) -> List[int]:
+        """Offsets at which each line starts (line 1 is element 0)"""
+        return self.lines.starts
+
+    def share_lines(self, lines: LineIndex):
+        """Use ``lines``, an index of the same text held elsewhere, as the line index"""
+        self._lines = lines
+
+    def holds(self, text: str) -> bool:
+        """True if this index was lexed from ``text`` plus the widget's trailing newline"""
+        return len(self.text) == len(text) + 1 and self.text.startswith(text)
+
+    def shared_lines(self, text: str) -> Optional[LineIndex]:
+        """The line index shared for ``text``, if edits have kept it in step with it"""
+        lines = self._lines
+        if lines is not None and lines.length == len(text) and self.holds(text):
+            return lines
+        return None
+
+    def edit_lines(self, start: int, old_end: int, new_text: str):
+        """Update the line index after ``[start, old_end)`` became ``new_text``
+
+        Called once ``text`` holds the edited text. A line index shared with
+        a holder of the text without the widget's trailing newline is one
+        character shorter; an edit reaching that newline is clamped to it
+        and replays the rest of the new text up to the new trailing newline.
+        """
+        lines = self._lines
+        if lines is None:
+            return
+        if old_end > lines.length:
+            new_length = len(self.text) - 1
+            start = min(start, lines.length, new_length)
+            old_end = lines.length
+            new_text = self.text[start:new_length]
+        lines.edit(start, old_end, new_text)
+
+    def offset_of(self, position: str) -> int:
+        """Convert a Tk ``"line.col"`` index into an absolute offset"""
+        return self.lines.offset_of(position)
+
+    def position_of(self, offset: int) -> str:
+        """Convert an absolute offset into a Tk ``"line.col"`` index"""
+        return self.lines.index_of(offset)
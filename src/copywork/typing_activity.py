@@ -0,0 +1,49 @@
+"""
+Active typing time for CoPywork practice sessions
+"""
+from typing import Optional
+
+from .wpm_window import words_per_minute
+
+# Pauses at least this long count as idle time, not typing time
+IDLE_TIMEOUT_NS = 5_000_000_000
+
+
+class TypingActivity:
+    """Typing time and session average WPM, measured from keystroke timestamps
+
+    The gap between two keystrokes counts as typing time unless it is at
+    least IDLE_TIMEOUT_NS long, in which case the earlier keystroke ended a
+    burst. This is the rule ``SessionReplay`` applies to logged sessions, so
+    the live average and a replay of the same keystrokes agree exactly.
+    """
+
+    __slots__ = ('active_ns', 'correct', 'last_ns')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget every keystroke, as for a newly opened text"""
+        self.active_ns = 0
+        self.correct = 0
+        self.last_ns: Optional[int] = None
+
+    def keystroke(self, now_ns: int, correct: bool = False) -> bool:
+        """Record a keystroke at ``now_ns``; returns True if it starts a burst"""
+        starts_burst = self.is_idle(now_ns)
+        if not starts_burst:
+            self.active_ns += now_ns - self.last_ns
+        self.last_ns = now_ns
+        if correct:
+            self.correct += 1
+        return starts_burst
+
+    def is_idle(self, now_ns: int) -> bool:
+        """True if no keystroke was made in the IDLE_TIMEOUT_NS before ``now_ns``"""
+        return self.last_ns is None or now_ns - self.last_ns >= IDLE_TIMEOUT_NS
+
+    @property
+    def wpm(self) -> float:
+        """Correct words per minute of typing time"""
+        return words_per_minute(self.correct, self.active_ns)
@@ -0,0 +1,167 @@
+"""
+Inter-key latency and bigram statistics for CoPywork practice sessions
+"""
+import heapq
+import math
+from array import array
+from typing import List, NamedTuple, Optional
+
+from .keystroke_log import BACKSPACE
+from .typing_activity import IDLE_TIMEOUT_NS
+
+# Latency histogram buckets: four per doubling, from 1 ms up to the idle timeout
+BUCKETS_PER_OCTAVE = 4
+MIN_LATENCY_NS = 1_000_000
+LATENCY_BUCKETS = math.ceil(math.log2(IDLE_TIMEOUT_NS / MIN_LATENCY_NS) * BUCKETS_PER_OCTAVE)
+
+# Characters are counted in fixed slots: printable ASCII, newline, everything else
+CHAR_SLOTS = 97
+_NEWLINE_SLOT = 95
+_OTHER_SLOT = 96
+
+# Bigrams seen fewer times than this are left out of the rankings
+MIN_BIGRAM_SAMPLES = 3
+
+
+def _slot(char: str) -> int:
+    """Counter slot of ``char``"""
+    code = ord(char)
+    if 32 <= code < 127:
+        return code - 32
+    return _NEWLINE_SLOT if char == '\n' else _OTHER_SLOT
+
+
+def slot_name(slot: int) -> str:
+    """Printable name of a counter slot"""
+    if slot == _NEWLINE_SLOT:
+        return "⏎"
+    if slot == _OTHER_SLOT:
+        return "…"
+    return "␣" if slot == 0 else chr(slot + 32)
+
+
+class LatencyHistogram:
+    """Latencies counted in log-spaced buckets
+
+    Buckets are 19% wide, so quantiles come back within about 10% of the
+    exact figure from a fixed LATENCY_BUCKETS counters.
+    """
+
+    __slots__ = ('counts', 'total')
+
+    def __init__(self):
+        self.counts = array('I', [0]) * LATENCY_BUCKETS
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def add(self, latency_ns: int):
+        """Count one latency"""
+        if latency_ns < MIN_LATENCY_NS:
+            bucket = 0
+        else:
+            bucket = min(int(math.log2(latency_ns / MIN_LATENCY_NS) * BUCKETS_PER_OCTAVE),
+                         LATENCY_BUCKETS - 1)
+        self.counts[bucket] += 1
+        self.total += 1
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Latency below which a share ``q`` of the counts fall (None if empty)"""
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # Geometric middle of the bucket
+                return int(MIN_LATENCY_NS * 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE))
+        return None
+
+
+class BigramStat(NamedTuple):
+    """Timing and errors of one character-to-character transition"""
+    bigram: str
+    count: int
+    mean_ns: int
+    error_rate: float
+
+
+class TypingStats:
+    """Latency and bigram statistics of a keystroke stream, in bounded memory
+
+    The latency of a keystroke is the time since the previous one. It goes
+    into an overall histogram and into the histogram of the expected
+    character; the transition from the previous character is counted in a
+    fixed CHAR_SLOTS x CHAR_SLOTS table with its total latency and its
+    errors. Backspaces and pauses of IDLE_TIMEOUT_NS or more break the
+    chain, so corrections and breaks are not counted as slow transitions.
+    """
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.char_latency = [LatencyHistogram() for _ in range(CHAR_SLOTS)]
+        self.char_counts = array('I', [0]) * CHAR_SLOTS
+        self.char_errors = array('I', [0]) * CHAR_SLOTS
+        self.bigram_counts = array('I', [0]) * (CHAR_SLOTS * CHAR_SLOTS)
+        self.bigram_errors = array('I', [0]) * (CHAR_SLOTS * CHAR_SLOTS)
+        self.bigram_ns = array('Q', [0]) * (CHAR_SLOTS * CHAR_SLOTS)
+        self._prev_slot: Optional[int] = None
+        self._prev_ns: Optional[int] = None
+
+    def record(self, time_ns: int, expected: str, typed: str, error: bool):
+        """Count a keystroke; ``expected`` is "" at the end of the text"""
+        prev_slot, prev_ns = self._prev_slot, self._prev_ns
+        self._prev_ns = time_ns
+        if typed == BACKSPACE or not expected:
+            self._prev_slot = None
+            return
+
+        slot = self._prev_slot = _slot(expected)
+        self.char_counts[slot] += 1
+        if error:
+            self.char_errors[slot] += 1
+
+        if prev_ns is None or time_ns - prev_ns >= IDLE_TIMEOUT_NS:
+            return
+        latency = time_ns - prev_ns
+        self.latency.add(latency)
+        self.char_latency[slot].add(latency)
+
+        if prev_slot is not None:
+            bigram = prev_slot * CHAR_SLOTS + slot
+            self.bigram_counts[bigram] += 1
+            self.bigram_ns[bigram] += latency
+            if error:
+                self.bigram_errors[bigram] += 1
+
+    def pause(self):
+        """Do not time the next keystroke against the previous one"""
+        self._prev_slot = None
+        self._prev_ns = None
+
+    def _bigrams(self, min_count: int):
+        """Every bigram counted at least ``min_count`` times"""
+        counts, errors, total_ns = self.bigram_counts, self.bigram_errors, self.bigram_ns
+        for bigram, count in enumerate(counts):
+            if count >= min_count:
+                first, second = divmod(bigram, CHAR_SLOTS)
+                yield BigramStat(slot_name(first) + slot_name(second), count,
+                                 total_ns[bigram] // count, errors[bigram] / count)
+
+    def slowest_bigrams(self, n: int = 5, min_count: int = MIN_BIGRAM_SAMPLES) -> List[BigramStat]:
+        """The ``n`` transitions with the highest mean latency"""
+        return heapq.nlargest(n, self._bigrams(min_count), key=lambda stat: stat.mean_ns)
+
+    def error_prone_bigrams(self, n: int = 5, min_count: int = MIN_BIGRAM_SAMPLES) -> List[BigramStat]:
+        """The ``n`` transitions most often ending in a wrong character"""
+        stats = [stat for stat in self._bigrams(min_count) if stat.error_rate > 0]
+        return heapq.nlargest(n, stats, key=lambda stat: (stat.error_rate, stat.count))
+
+    def slowest_chars(self, n: int = 5) -> List[tuple]:
+        """The ``n`` characters with the highest median latency, as (name, median_ns)"""
+        medians = ((slot_name(slot), histogram.quantile(0.5))
+                   for slot, histogram in enumerate(self.char_latency)
+                   if len(histogram) >= MIN_BIGRAM_SAMPLES)
+        return heapq.nlargest(n, medians, key=lambda item: item[1])
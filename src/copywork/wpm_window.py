@@ -0,0 +1,130 @@
+"""
+Sliding-window typing speed for CoPywork
+"""
+import time
+from array import array
+from typing import List, Optional, Sequence
+
+# Window lengths shown by default, in seconds
+DEFAULT_WPM_WINDOWS = (1, 10, 60)
+
+# The maximum is tracked over the configured window closest to this length
+MAX_WPM_WINDOW = 10
+
+# Buckets per window; figures are exact to within one bucket
+WINDOW_SLOTS = 20
+
+# Characters per word
+CHARS_PER_WORD = 5
+
+NS_PER_MINUTE = 60_000_000_000
+
+
+def words_per_minute(chars: int, elapsed_ns: int) -> float:
+    """Words of CHARS_PER_WORD characters per minute (0 if no time elapsed)"""
+    if elapsed_ns <= 0:
+        return 0.0
+    return chars / CHARS_PER_WORD * NS_PER_MINUTE / elapsed_ns
+
+
+class SlidingWindow:
+    """Count of events in the last ``window_ns`` nanoseconds
+
+    Events are summed into a ring of ``slots`` buckets that the window slides
+    over, with the running total kept beside it. Adding an event or reading
+    the rate first clears the buckets that slid out since the last call, so
+    both cost O(1) amortized and the memory is fixed however fast the typing.
+    """
+
+    __slots__ = ('window_ns', 'slot_ns', 'counts', 'total', 'slot')
+
+    def __init__(self, window_ns: int, slots: int = WINDOW_SLOTS):
+        self.slot_ns = max(window_ns // slots, 1)
+        self.window_ns = self.slot_ns * slots
+        self.counts = array('I', [0]) * slots
+        self.total = 0
+        self.slot: Optional[int] = None  # Bucket number of the newest bucket
+
+    def reset(self):
+        """Forget every event"""
+        self.counts[:] = array('I', [0]) * len(self.counts)
+        self.total = 0
+        self.slot = None
+
+    def _advance(self, now_ns: int) -> int:
+        """Slide the window to ``now_ns``; returns the ring index of its bucket"""
+        slot = now_ns // self.slot_ns
+        counts = self.counts
+        size = len(counts)
+        if self.slot is None:
+            self.slot = slot
+        elif slot > self.slot:
+            if slot - self.slot >= size:
+                self.reset()
+                self.slot = slot
+            else:
+                for expired in range(self.slot + 1, slot + 1):
+                    i = expired % size
+                    self.total -= counts[i]
+                    counts[i] = 0
+                self.slot = slot
+        return self.slot % size
+
+    def add(self, now_ns: int, count: int = 1):
+        """Record ``count`` events at ``now_ns``"""
+        i = self._advance(now_ns)
+        self.counts[i] += count
+        self.total += count
+
+    def per_minute(self, now_ns: int) -> float:
+        """Events per minute over the window ending at ``now_ns``"""
+        self._advance(now_ns)
+        return self.total * NS_PER_MINUTE / self.window_ns
+
+
+class WpmMeter:
+    """Words per minute over several sliding windows, plus the maximum seen
+
+    ``windows`` are lengths in seconds. Each correct character is recorded
+    once per window; the maximum follows the window closest to
+    MAX_WPM_WINDOW and only changes when a character is recorded. Raises
+    ValueError if ``windows`` is not a non-empty list of positive numbers.
+    """
+
+    def __init__(self, windows: Sequence[float] = DEFAULT_WPM_WINDOWS):
+        if (isinstance(windows, (str, bytes)) or not windows
+                or not all(isinstance(s, (int, float)) and s > 0 for s in windows)):
+            raise ValueError(f"WPM windows must be positive numbers of seconds, not {windows!r}")
+        self.seconds = sorted(windows)
+        self.windows = [SlidingWindow(int(s * 1_000_000_000)) for s in self.seconds]
+        self._max_window = min(self.windows,
+                               key=lambda w: abs(w.window_ns - MAX_WPM_WINDOW * 1_000_000_000))
+        self.max_wpm = 0.0
+
+    def reset(self):
+        """Start over, keeping the maximum"""
+        for window in self.windows:
+            window.reset()
+
+    def record(self, now_ns: Optional[int] = None):
+        """Count one correct character typed at ``now_ns`` (default: now)"""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        for window in self.windows:
+            window.add(now_ns)
+        wpm = self._max_window.per_minute(now_ns) / CHARS_PER_WORD
+        if wpm > self.max_wpm:
+            self.max_wpm = wpm
+
+    def is_empty(self, now_ns: int) -> bool:
+        """True once every recorded character has slid out of every window"""
+        # The longest window holds everything the shorter ones do
+        window = self.windows[-1]
+        window.per_minute(now_ns)
+        return window.total == 0
+
+    def wpm(self, now_ns: Optional[int] = None) -> List[float]:
+        """Words per minute over each window, shortest first"""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        return [window.per_minute(now_ns) / CHARS_PER_WORD for window in self.windows]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the compiled theme style table
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def test_styles_match_theme_loader():
+    """Test that compiled styles agree with the theme loader's answers"""
+    from copywork.theme_loader import ThemeLoader
+    from copywork.compiled_theme import CompiledTheme, wash_out_color
+
+    loader = ThemeLoader()
+    theme = CompiledTheme(loader, lambda token_type: token_type)
+    background = loader.get_editor_color("editor.background", "#333333")
+
+    for scope in ("keyword", "keyword.control.import", "comment", "string", "no.such.scope"):
+        style = theme.style(scope)
+        assert style.tag == f"syntax_{scope.replace('.', '_')}"
+        assert style.foreground == style.normal == loader.get_foreground_color(scope)
+        assert style.washed == wash_out_color(style.foreground, background)
+        assert (style.bold, style.italic) == loader.get_font_style(scope)
+
+    default = theme.default
+    assert default.scope is None and default.tag == "default_text"
+    assert default.normal == ""
+    assert default.foreground == loader.get_editor_color("editor.foreground", "#C1E4F6")
+    print("✓ Compiled styles match ThemeLoader")
+    return True
+
+
+def test_token_types_resolved_once():
+    """Test that each token type is mapped to a scope only once"""
+    from pygments.token import Token
+    from copywork.theme_loader import ThemeLoader
+    from copywork.compiled_theme import CompiledTheme
+    from copywork.syntax_highlighter import scope_for_token
+
+    calls = []
+
+    def scope_for(token_type):
+        calls.append(token_type)
+        return scope_for_token(token_type)
+
+    theme = CompiledTheme(ThemeLoader(), scope_for)
+    theme.compile_tokens([Token.Keyword, Token.Name.Function])
+    assert len(calls) == 2
+
+    for _ in range(3):
+        assert theme.scope_for_token(Token.Keyword) == "keyword"
+        assert theme.style_for_token(Token.Name.Function).tag == "syntax_entity_name_function"
+        assert theme.scope_for_token(Token.Keyword.Namespace) == "keyword.control.import"
+    assert len(calls) == 3
+    assert theme.style_for_token(Token.Keyword) is theme.style("keyword")
+    print("✓ Token types resolve through the table without string work")
+    return True
+
+
+def test_theme_loader_memoizes_fallback():
+    """Test that parent-scope fallback is cached until the theme reloads"""
+    from copywork.theme_loader import ThemeLoader
+
+    loader = ThemeLoader()
+    style = loader.get_token_style("keyword.control.import.extra")
+    assert "keyword.control.import.extra" in loader._style_cache
+    assert loader.get_token_style("keyword.control.import.extra") is style
+
+    loader.load_theme()
+    assert not loader._style_cache
+    print("✓ Scope fallback is resolved once per scope")
+    return True
+
+
+def test_theme_file_reload():
+    """Test that edits to the theme file are detected and fully re-parsed"""
+    import json
+    import tempfile
+    from copywork.theme_loader import ThemeLoader
+    from copywork.compiled_theme import CompiledTheme
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        theme_path = os.path.join(temp_dir, 'theme.json')
+        theme = {
+            "colors": {"editor.background": "#000000"},
+            "tokenColors": [
+                {"scope": "keyword", "settings": {"foreground": "#111111"}},
+                {"scope": "string", "settings": {"foreground": "#222222"}},
+            ],
+        }
+        with open(theme_path, 'w', encoding='utf-8') as f:
+            json.dump(theme, f)
+
+        loader = ThemeLoader(theme_path)
+        assert not loader.has_changed()
+        assert loader.get_foreground_color("keyword.control") == "#111111"
+
+        theme["tokenColors"] = [{"scope": "keyword", "settings": {"foreground": "#333333"}}]
+        with open(theme_path, 'w', encoding='utf-8') as f:
+            json.dump(theme, f)
+        os.utime(theme_path, ns=(0, loader.theme_mtime + 1))
+
+        assert loader.has_changed()
+        assert loader.load_theme()
+        assert not loader.has_changed()
+        assert loader.get_foreground_color("keyword.control") == "#333333"
+        assert "string" not in loader.token_colors
+
+        style = CompiledTheme(loader, str).style("keyword")
+        assert style.washed == "#0f0f0f"
+
+    print("✓ Theme file changes are picked up on reload")
+    return True
+
+
+def main():
+    """Run all compiled theme tests"""
+    print("Testing CoPywork Compiled Theme")
+    print("=" * 40)
+
+    tests = [
+        ("Styles Match Theme Loader", test_styles_match_theme_loader),
+        ("Token Types Resolved Once", test_token_types_resolved_once),
+        ("Theme Loader Memoization", test_theme_loader_memoizes_fallback),
+        ("Theme File Reload", test_theme_file_reload),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Compiled theme working correctly!")
+        return 0
+    else:
+        print("❌ Some compiled theme tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script to verify .cw archives are written atomically and read by streaming
+"""
+
+import sys
+import os
+import stat
+import tempfile
+import zipfile
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def test_writes_members_in_order():
+    """Test the archive holds every member, in order, and no temp file is left"""
+    from copywork.cw_archive import write_cw_archive
+
+    members = {
+        "content.txt": "print('hi')\n".encode('utf-8'),
+        "colors.json": b'{"correct": [], "incorrect": []}',
+        "manifest.json": b'{"language": "python"}',
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "script.py.cw")
+        write_cw_archive(path, members)
+
+        with zipfile.ZipFile(path) as zip_file:
+            assert zip_file.namelist() == list(members)
+            for name, data in members.items():
+                assert zip_file.read(name) == data
+        assert os.listdir(temp_dir) == ["script.py.cw"]
+
+    print("✓ Members written in order without a leftover temp file")
+    return True
+
+
+def test_replaces_existing_archive():
+    """Test saving over an archive replaces it and keeps its permissions"""
+    from copywork.cw_archive import write_cw_archive
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "notes.cw")
+        write_cw_archive(path, {"content.txt": b"old"})
+        os.chmod(path, 0o640)
+
+        write_cw_archive(path, {"content.txt": b"new"})
+        with zipfile.ZipFile(path) as zip_file:
+            assert zip_file.read("content.txt") == b"new"
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+        assert os.listdir(temp_dir) == ["notes.cw"]
+
+    print("✓ Existing archive replaced with its permissions kept")
+    return True
+
+
+def test_failed_write_keeps_old_archive():
+    """Test a failure part-way through leaves the previous archive untouched"""
+    from copywork.cw_archive import write_cw_archive
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "notes.cw")
+        write_cw_archive(path, {"content.txt": b"old"})
+
+        with mock.patch("copywork.cw_archive.os.fsync", side_effect=OSError("disk full")):
+            try:
+                write_cw_archive(path, {"content.txt": b"new"})
+            except OSError:
+                pass
+            else:
+                raise AssertionError("the failure should propagate")
+
+        with zipfile.ZipFile(path) as zip_file:
+            assert zip_file.read("content.txt") == b"old"
+        assert os.listdir(temp_dir) == ["notes.cw"]
+
+    print("✓ Failed save leaves the old archive and no temp file")
+    return True
+
+
+def test_reader_streams_members():
+    """Test members are read from the archive in chunks, with newlines translated"""
+    from copywork.cw_archive import CwReader, write_cw_archive
+
+    text = "line one\r\nline two\n" * 100
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "notes.cw")
+        write_cw_archive(path, {
+            "content.txt": text.encode('utf-8'),
+            "colors.json": b'{"correct": [["1.0", "1.4"]], "incorrect": []}',
+        })
+        with CwReader(path) as archive:
+            assert "content.txt" in archive
+            assert "manifest.json" not in archive
+            chunks = list(archive.iter_text("content.txt", chunk_size=64))
+            assert len(chunks) > 1
+            assert "".join(chunks) == text.replace("\r\n", "\n")
+            assert archive.read_json("colors.json")["correct"] == [["1.0", "1.4"]]
+        assert os.listdir(temp_dir) == ["notes.cw"]
+
+    print("✓ Members streamed without extracting")
+    return True
+
+
+def test_reader_refuses_oversized_members():
+    """Test members over the size limits are refused before decompression"""
+    from copywork.cw_archive import CwReader
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bomb.cw")
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("content.txt", b"a" * 100_000)
+            zip_file.writestr("colors.json", b" " * 60_000 + b"{}")
+        assert os.path.getsize(path) < 2_000
+
+        with CwReader(path, max_member_size=50_000) as archive:
+            try:
+                archive.read("content.txt")
+            except ValueError as e:
+                assert "too large" in str(e)
+            else:
+                raise AssertionError("oversized member should be refused")
+
+        with CwReader(path, max_archive_size=150_000) as archive:
+            assert len(archive.read("content.txt")) == 100_000
+            try:
+                archive.read_json("colors.json")
+            except ValueError as e:
+                assert "too large" in str(e)
+            else:
+                raise AssertionError("archive total should be limited")
+
+    print("✓ Oversized members refused")
+    return True
+
+
+def main():
+    """Run all .cw archive tests"""
+    print("Testing .cw Archive Reading and Writing")
+    print("=" * 40)
+
+    tests = [
+        ("Members", test_writes_members_in_order),
+        ("Replace", test_replaces_existing_archive),
+        ("Failed Write", test_failed_write_keeps_old_archive),
+        ("Streaming Reads", test_reader_streams_members),
+        ("Size Limits", test_reader_refuses_oversized_members),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 .cw archives working correctly!")
+        return 0
+    else:
+        print("❌ Some .cw archive tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
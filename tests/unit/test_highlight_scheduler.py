@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script to verify coalesced, prioritized highlight scheduling
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+class _Widget:
+    """Minimal stand-in for the Tk after() queue"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next_id = 0
+
+    def after(self, _ms, func):
+        self._next_id += 1
+        self.jobs[self._next_id] = func
+        return self._next_id
+
+    def after_idle(self, func):
+        return self.after(0, func)
+
+    def after_cancel(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def drain(self):
+        runs = 0
+        while self.jobs:
+            job_id = min(self.jobs)
+            self.jobs.pop(job_id)()
+            runs += 1
+        return runs
+
+
+class _Highlighter:
+    """Records which regions the scheduler asks to be re-tagged"""
+
+    def __init__(self, length, visible, cursor):
+        self.text_widget = _Widget()
+        self.length = length
+        self.visible = visible
+        self.cursor = cursor
+        self.tagged = []
+        self.edits = 0
+
+    def visible_range(self):
+        return self.visible
+
+    def cursor_range(self):
+        return self.cursor
+
+    def document_length(self):
+        return self.length
+
+    def retag_region(self, start, end):
+        self.tagged.append((start, end))
+
+    def apply_pending_edit(self):
+        self.edits += 1
+
+
+def test_requests_are_coalesced():
+    """Test that a burst of requests results in a single job"""
+    from copywork.highlight_scheduler import HighlightScheduler
+
+    highlighter = _Highlighter(100, (0, 50), (0, 10))
+    scheduler = HighlightScheduler(highlighter)
+    scheduler.reset(100)
+    highlighter.tagged.clear()
+
+    for _ in range(10):
+        scheduler.request_update()
+    assert scheduler.pending
+    assert scheduler.requests == 10
+    assert scheduler.merged == 9
+
+    runs = highlighter.text_widget.drain()
+    assert runs == 1
+    assert highlighter.edits == 1
+    assert not scheduler.dirty
+    print("✓ Ten requests merged into one job")
+    return True
+
+
+def test_priority_order():
+    """Test that the viewport and cursor are tagged before the rest"""
+    from copywork.highlight_scheduler import HighlightScheduler
+
+    highlighter = _Highlighter(1000, (400, 500), (800, 850))
+    scheduler = HighlightScheduler(highlighter)
+    scheduler.reset(1000)
+    scheduler.run_now()
+
+    assert highlighter.tagged[0] == (400, 500)
+    assert highlighter.tagged[1] == (800, 850)
+    assert not scheduler.dirty
+
+    covered = set()
+    for start, end in highlighter.tagged:
+        assert not covered & set(range(start, end)), "text tagged twice"
+        covered.update(range(start, end))
+    assert covered == set(range(1000))
+    print("✓ Visible text, then cursor, then the rest; nothing tagged twice")
+    return True
+
+
+def test_reset_drops_pending_work():
+    """Test that a full re-highlight discards the scheduled job"""
+    from copywork.highlight_scheduler import HighlightScheduler
+
+    highlighter = _Highlighter(100, (0, 10), (0, 10))
+    scheduler = HighlightScheduler(highlighter)
+    scheduler.request_update()
+    scheduler.reset(100, tag_rest=False)
+
+    assert not scheduler.pending
+    assert scheduler.dropped == 2
+    assert highlighter.text_widget.drain() == 0
+    assert highlighter.edits == 0
+
+    scheduler.request_view()
+    highlighter.text_widget.drain()
+    assert highlighter.tagged == [(0, 10)]
+    assert list(scheduler.dirty) == [(10, 100)]
+    print("✓ Superseded work is dropped and lazy mode leaves off-screen text")
+    return True
+
+
+def test_edit_shifts_dirty_ranges():
+    """Test that dirty ranges follow insertions"""
+    from copywork.highlight_scheduler import HighlightScheduler
+
+    highlighter = _Highlighter(100, (0, 10), (0, 10))
+    scheduler = HighlightScheduler(highlighter)
+    scheduler.reset(0)
+    scheduler.dirty.add(50, 60)
+    scheduler.edited(20, 22, 25)
+    assert list(scheduler.dirty) == [(20, 25), (53, 63)]
+    print("✓ Dirty ranges move with the text")
+    return True
+
+
+def main():
+    """Run all highlight scheduler tests"""
+    print("Testing CoPywork Highlight Scheduler")
+    print("=" * 40)
+
+    tests = [
+        ("Request Coalescing", test_requests_are_coalesced),
+        ("Priority Order", test_priority_order),
+        ("Dropped Work", test_reset_drops_pending_work),
+        ("Edit Bookkeeping", test_edit_shifts_dirty_ranges),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Highlight scheduler working correctly!")
+        return 0
+    else:
+        print("❌ Some highlight scheduler tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script to verify background tokenization and stale-job cancellation
+"""
+
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+
+def _wait_for(worker, timeout=10.0):
+    """Poll the worker like the Tk main loop would"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    return None
+
+
+def test_background_lex_matches_foreground():
+    """Test that the worker produces the same index as lexing on the main thread"""
+    from pygments.lexers import PythonLexer
+    from copywork.highlight_worker import HighlightWorker
+    from copywork.incremental import lex_document
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read() * 20
+
+    lexer = PythonLexer()
+    worker = HighlightWorker(lexer, str)
+    generation = worker.submit(text)
+
+    result = _wait_for(worker)
+    assert result is not None, "worker did not finish"
+    result_generation, index = result
+    reference = lex_document(lexer, text, str)
+
+    assert result_generation == generation
+    assert list(index.starts) == list(reference.starts)
+    assert [index.scopes[i] for i in index.scope_ids] == \
+        [reference.scopes[i] for i in reference.scope_ids]
+    assert index.states == reference.states
+    print(f"✓ Background index matches ({len(index)} tokens)")
+    return True
+
+
+def test_stale_jobs_are_dropped():
+    """Test that only the most recent submission is ever delivered"""
+    from pygments.lexers import PythonLexer
+    from copywork.highlight_worker import HighlightWorker
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    worker = HighlightWorker(PythonLexer(), str)
+    worker.submit(text * 50)
+    latest = worker.submit(text)
+
+    result = _wait_for(worker)
+    assert result is not None, "worker did not finish"
+    assert result[0] == latest
+    assert result[1].text == text
+
+    # Give the stale job time to finish or bail out; it must never surface
+    time.sleep(0.2)
+    assert worker.poll() is None
+
+    worker.submit(text)
+    worker.cancel()
+    time.sleep(0.2)
+    assert worker.poll() is None
+    print("✓ Superseded and cancelled jobs are never delivered")
+    return True
+
+
+def test_failed_job_is_delivered():
+    """Test that a job whose lexer raises delivers None instead of never finishing"""
+    from pygments.lexers import PythonLexer
+    from copywork.highlight_worker import HighlightWorker
+
+    def broken_scope(token_type):
+        raise RuntimeError("lexer blew up")
+
+    worker = HighlightWorker(PythonLexer(), broken_scope)
+    generation = worker.submit("x = 1\n")
+
+    result = _wait_for(worker)
+    assert result == (generation, None), result
+    print("✓ Failed jobs are reported to the poller")
+    return True
+
+
+def main():
+    """Run all background worker tests"""
+    print("Testing CoPywork Background Highlight Worker")
+    print("=" * 40)
+
+    tests = [
+        ("Background Lexing", test_background_lex_matches_foreground),
+        ("Stale Job Cancellation", test_stale_jobs_are_dropped),
+        ("Failed Job", test_failed_job_is_delivered),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Background worker working correctly!")
+        return 0
+    else:
+        print("❌ Some background worker tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
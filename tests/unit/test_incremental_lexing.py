@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script to verify incremental re-lexing only touches the damaged lines
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+
+def _scope_for(token_type):
+    """Use the token type name as scope so every token kind is compared"""
+    return str(token_type)
+
+
+def _tokens(index):
+    return [(start, index.scopes[scope_id])
+            for start, scope_id in zip(index.starts, index.scope_ids)]
+
+
+def test_stateful_lexing_matches_pygments():
+    """Test that checkpointed lexing yields exactly the Pygments token stream"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import iter_tokens_with_states
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    lexer = PythonLexer()
+    expected = [(o, t, v) for o, t, v in lexer.get_tokens_unprocessed(text) if v]
+    actual = [(o, t, v) for o, t, v, state in iter_tokens_with_states(lexer, text)]
+    assert actual == expected
+
+    line_starts = {0} | {i + 1 for i, ch in enumerate(text) if ch == '\n'}
+    checkpoints = [o for o, t, v, state in iter_tokens_with_states(lexer, text)
+                   if state is not None]
+    assert set(checkpoints) <= line_starts
+    print(f"✓ {len(actual)} tokens, {len(checkpoints)} line checkpoints")
+    return True
+
+
+def test_relex_matches_full_lex():
+    """Test that a series of edits re-lexed incrementally equals a full lex"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document, relex
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    lexer = PythonLexer()
+    index = lex_document(lexer, text, _scope_for)
+
+    edits = [
+        (text.index("class Calculator"), "# "),        # comment out a line
+        (text.index("return self.result"), '"""'),     # open a docstring
+        (text.index("# Main execution"), '"""'),       # ...and close it again
+        (len(text) - 1, "\nprint('done')"),            # append at the end
+    ]
+    for offset, insertion in edits:
+        text = text[:offset] + insertion + text[offset:]
+        index, start, end = relex(index, text, lexer, _scope_for)
+        reference = lex_document(lexer, text, _scope_for)
+        assert _tokens(index) == _tokens(reference), insertion
+        assert index.states == reference.states
+        assert start <= offset < end or insertion.startswith('\n')
+
+    print("✓ Incremental token stream matches a full re-lex after every edit")
+    return True
+
+
+def test_relex_stops_after_damaged_line():
+    """Test that a one-character edit only re-lexes a few lines"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document, relex
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    lexer = PythonLexer()
+    index = lex_document(lexer, text, _scope_for)
+
+    offset = text.index("squares = ")
+    text = text[:offset] + "x" + text[offset:]
+    index, start, end = relex(index, text, lexer, _scope_for)
+
+    damaged_lines = text.count('\n', start, end)
+    print(f"Re-lexed {end - start} of {len(text)} characters ({damaged_lines} lines)")
+    assert damaged_lines <= 3
+    print("✓ Re-lexing converged right after the damaged line")
+    return True
+
+
+def main():
+    """Run all incremental lexing tests"""
+    print("Testing CoPywork Incremental Lexing")
+    print("=" * 40)
+
+    tests = [
+        ("Stateful Lexing", test_stateful_lexing_matches_pygments),
+        ("Relex Equivalence", test_relex_matches_full_lex),
+        ("Relex Convergence", test_relex_stops_after_damaged_line),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Incremental lexing working correctly!")
+        return 0
+    else:
+        print("❌ Some incremental lexing tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the practice keystroke log
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def test_session_logs_keystrokes():
+    """Test that every practice keystroke is logged with its outcome"""
+    from copywork.keystroke_log import BACKSPACE, Keystroke
+    from copywork.practice_session import CORRECT, INCORRECT, UNTYPED, PracticeSession
+
+    session = PracticeSession("ab\nc")
+    session.type_char("a", now_ns=1_000)
+    session.type_char("x", now_ns=1_500)
+    session.backspace(now_ns=2_000)
+    session.type_char("b", now_ns=2_600)
+    session.type_char("z", now_ns=3_000)
+
+    assert list(session.log) == [
+        Keystroke(0, 0, "a", "a", CORRECT),
+        Keystroke(500, 1, "b", "x", INCORRECT),
+        Keystroke(1_000, 2, "\n", BACKSPACE, UNTYPED),
+        Keystroke(1_600, 1, "b", "b", CORRECT),
+        Keystroke(2_000, 2, "\n", "z", UNTYPED),
+    ]
+    print("✓ Keystrokes are logged with offsets, characters and states")
+    return True
+
+
+def test_round_trip():
+    """Test that a dumped log loads back identically"""
+    from copywork.keystroke_log import KeystrokeLog, dump_keystroke_log, load_keystroke_log
+    from copywork.practice_session import CORRECT
+
+    log = KeystrokeLog()
+    for i in range(1000):
+        log.record(i, "é", "é", CORRECT, now_ns=i * 120_000_000)
+
+    data = dump_keystroke_log(log)
+    assert len(data) < 22 * len(log) + 16
+    loaded = load_keystroke_log(data)
+    assert loaded is not None
+    assert list(loaded) == list(log)
+
+    # Appending after a reload continues from the last entry
+    loaded.record(1000, "x", "x", CORRECT, now_ns=5)
+    assert loaded.times[-1] == log.times[-1]
+    print(f"✓ {len(log)} keystrokes stored in {len(data)} bytes")
+    return True
+
+
+def test_damaged_data_rejected():
+    """Test that truncated or foreign data is not loaded"""
+    from copywork.keystroke_log import KeystrokeLog, dump_keystroke_log, load_keystroke_log
+
+    log = KeystrokeLog()
+    log.record(0, "a", "a", 1, now_ns=0)
+    data = dump_keystroke_log(log)
+
+    assert load_keystroke_log(data[:-1]) is None
+    assert load_keystroke_log(data + b"\0") is None
+    assert load_keystroke_log(b"CWTK" + data[4:]) is None
+    assert load_keystroke_log(b"") is None
+    print("✓ Damaged logs are rejected")
+    return True
+
+
+def main():
+    """Run all keystroke log tests"""
+    print("Testing CoPywork Keystroke Log")
+    print("=" * 40)
+
+    tests = [
+        ("Session Logging", test_session_logs_keystrokes),
+        ("Round Trip", test_round_trip),
+        ("Damaged Data", test_damaged_data_rejected),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Keystroke log working correctly!")
+        return 0
+    else:
+        print("❌ Some keystroke log tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the multi-language lexer registry
+"""
+
+import sys
+import os
+import subprocess
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+
+def test_language_detection():
+    """Test picking a language by extension, through .cw, and by hint"""
+    from copywork.lexers import language_for_file
+
+    cases = [
+        ("script.py", "python"),
+        ("script.py.cw", "python"),
+        ("main.go", "go"),
+        ("main.go.cw", "go"),
+        ("lib.RS", "rust"),
+        ("deploy.sh", "bash"),
+        ("config.yml", "yaml"),
+        ("config.yaml.cw", "yaml"),
+        ("notes.txt", None),
+        ("notes.cw", None),
+        ("Makefile", None),
+        (None, None),
+    ]
+    for file_path, expected in cases:
+        assert language_for_file(file_path) == expected, file_path
+
+    assert language_for_file("notes.cw", "go") == "go"
+    assert language_for_file("script.py", "rust") == "rust"
+    assert language_for_file("script.py", "cobol") == "python"
+    print(f"✓ {len(cases)} file names and 3 hints resolved correctly")
+    return True
+
+
+def test_lexers_are_cached():
+    """Test that each language gets one shared lexer instance"""
+    from copywork.lexers import get_lexer
+
+    for language in ("python", "go", "rust", "bash", "yaml"):
+        lexer = get_lexer(language)
+        assert lexer is not None, language
+        assert get_lexer(language) is lexer
+    assert get_lexer("cobol") is None
+    print("✓ One cached lexer per language")
+    return True
+
+
+def test_lazy_import():
+    """Test that importing the registry imports no lexer modules"""
+    script = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import copywork.lexers as lexers\n"
+        "assert 'pygments.lexers.rust' not in sys.modules\n"
+        "lexers.get_lexer('rust')\n"
+        "assert 'pygments.lexers.rust' in sys.modules\n"
+        "assert 'pygments.lexers.go' not in sys.modules\n" % SRC_DIR
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    print("✓ Lexer modules are imported on first use")
+    return True
+
+
+def main():
+    """Run all lexer registry tests"""
+    print("Testing CoPywork Lexer Registry")
+    print("=" * 40)
+
+    tests = [
+        ("Language Detection", test_language_detection),
+        ("Lexer Cache", test_lexers_are_cached),
+        ("Lazy Import", test_lazy_import),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Lexer registry working correctly!")
+        return 0
+    else:
+        print("❌ Some lexer registry tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the line start index shared by practice and highlighting
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+
+def test_conversions():
+    """Test converting offsets to Tk indices and back, with clamping"""
+    from copywork.line_index import LineIndex
+
+    text = "def f():\n    return 1\n"
+    lines = LineIndex(text)
+    assert lines.starts == [0, 9, 22] and len(lines) == 3
+    for offset in range(len(text) + 1):
+        assert lines.offset_of(lines.index_of(offset)) == offset
+    assert lines.index_of(13) == "2.4"
+    assert lines.line_of(8) == 1 and lines.line_of(9) == 2
+    assert lines.offset_of("1.99") == 8
+    assert lines.offset_of("0.5") == 5
+    assert lines.offset_of("9.0") == len(text)
+    print("✓ Offsets and Tk indices convert both ways")
+    return True
+
+
+def test_edits_match_rescan():
+    """Test that in-place edits keep the starts equal to a fresh scan"""
+    from copywork.line_index import LineIndex, line_starts
+
+    rng = random.Random(0)
+    text = "".join(rng.choice("ab\n") for _ in range(500))
+    lines = LineIndex(text)
+    for _ in range(2000):
+        start = rng.randrange(len(text) + 1)
+        end = rng.randrange(start, min(len(text), start + 12) + 1)
+        new = "".join(rng.choice("xy\n") for _ in range(rng.randrange(8)))
+        text = text[:start] + new + text[end:]
+        lines.edit(start, end, new)
+        assert lines.starts == line_starts(text) and lines.length == len(text)
+    print("✓ Edits update the starts in place")
+    return True
+
+
+def test_relex_updates_shared_lines():
+    """Test that incremental re-lexing keeps a shared line index current"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document, relex
+    from copywork.line_index import line_starts
+    from copywork.practice_session import PracticeSession
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    lexer = PythonLexer()
+    index = lex_document(lexer, text, str)
+    session = PracticeSession(text)
+    index.share_lines(session.lines)
+
+    rng = random.Random(1)
+    for _ in range(20):
+        pos = rng.randrange(len(text))
+        text = text[:pos] + rng.choice(["\n", "x = 1\n", "", "#"]) + text[pos + rng.randrange(3):]
+        index, _, _ = relex(index, text, lexer, str)
+        assert index.lines is session.lines
+        assert index.line_starts == line_starts(text)
+    print("✓ Re-lexing edits the shared index")
+    return True
+
+
+def test_widget_index_shares_session_lines():
+    """Test the session and a token index lexed with Tk's trailing newline share one index"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document, relex
+    from copywork.line_index import line_starts
+    from copywork.practice_session import PracticeSession
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    lexer = PythonLexer()
+
+    # Opening: the widget text carries a sentinel newline the session does not
+    session = PracticeSession(text)
+    index = lex_document(lexer, text + "\n", str)
+    assert index.holds(session.text)
+    assert not index.holds(text + "x")
+    index.share_lines(session.lines)
+    assert index.lines is session.lines
+
+    # Editing, then syncing: the session reuses the index the edits kept current
+    text = "import os\n" + text.replace("def ", "def  ", 1)
+    index, _, _ = relex(index, text + "\n", lexer, str)
+    lines = index.shared_lines(text)
+    assert lines is session.lines
+    session.set_text(text, lines)
+    assert session.lines is index.lines
+    assert session.lines.starts == line_starts(text)
+    assert session.lines.length == len(text)
+
+    # An index whose own line index was built from the widget text is not reused
+    fresh = lex_document(lexer, text + "\n", str)
+    fresh.line_starts
+    assert fresh.shared_lines(text) is None
+    print("✓ Session and widget token index share one line index")
+    return True
+
+
+def test_edits_at_end_of_shared_index():
+    """Test appending and pressing Enter at the end keep a shared index in step"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document, relex
+    from copywork.line_index import line_starts
+    from copywork.practice_session import PracticeSession
+
+    lexer = PythonLexer()
+    session = PracticeSession("x = 1")
+    index = lex_document(lexer, "x = 1\n", str)
+    index.share_lines(session.lines)
+
+    # Append a line at the end of the file
+    index, _, _ = relex(index, "x = 1\ny = 2\n", lexer, str)
+    assert index.lines is session.lines
+    assert index.line_starts == [0, 6]
+    assert index.position_of(6) == "2.0"
+    assert index.shared_lines("x = 1\ny = 2") is session.lines
+
+    # Enter at the end of the file, then delete it again
+    index, _, _ = relex(index, "x = 1\ny = 2\n\n", lexer, str)
+    assert index.line_starts == line_starts("x = 1\ny = 2\n")
+    index, _, _ = relex(index, "x = 1\ny = 2\n", lexer, str)
+    assert index.line_starts == [0, 6]
+
+    # Random edits near the end
+    rng = random.Random(22)
+    text = "x = 1\ny = 2"
+    for _ in range(200):
+        pos = rng.randrange(max(len(text) - 8, 0), len(text) + 1)
+        text = text[:pos] + rng.choice(["\n", "z\n", "", "w"]) + text[pos + rng.randrange(3):]
+        index, _, _ = relex(index, text + "\n", lexer, str)
+        assert index.line_starts == line_starts(text), text
+        assert index.shared_lines(text) is session.lines
+    print("✓ Edits at the end of the file keep the shared index in step")
+    return True
+
+
+def main():
+    """Run all line index tests"""
+    print("Testing CoPywork Line Index")
+    print("=" * 40)
+
+    tests = [
+        ("Conversions", test_conversions),
+        ("Edits", test_edits_match_rescan),
+        ("Shared With Re-lexing", test_relex_updates_shared_lines),
+        ("Shared With The Widget Index", test_widget_index_shares_session_lines),
+        ("Edits At The End", test_edits_at_end_of_shared_index),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Line index working correctly!")
+        return 0
+    else:
+        print("❌ Some line index tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
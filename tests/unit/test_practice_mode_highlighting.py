@@ -116,12 +116,16 @@ def test_tag_configuration():
         highlighter = SyntaxHighlighter(text_widget, theme_loader)
         
         # Test normal tag configuration
-        highlighter.configure_tag("test_normal", "keyword", washed_out=False)
-        assert "test_normal" in highlighter.configured_tags
+        highlighter.configure_tag("test_keyword", "keyword")
+        assert "test_keyword" in highlighter.configured_tags
+        assert "test_keyword_typed" in highlighter.typed_tags
+        normal = str(text_widget.tag_cget("test_keyword", "foreground"))
         
-        # Test washed-out tag configuration
-        highlighter.configure_tag("test_washed", "keyword", washed_out=True)
-        assert "test_washed" in highlighter.configured_washed_tags
+        # Test washed-out palette swap
+        highlighter.set_washed_out(True)
+        washed = str(text_widget.tag_cget("test_keyword", "foreground"))
+        assert washed == highlighter._wash_out_color(normal)
+        assert str(text_widget.tag_cget("test_keyword_typed", "foreground")) == normal
         
         print("✓ Tag configuration test passed")
         root.destroy()
@@ -160,7 +164,7 @@ def main():
         print("✓ Normal color restoration when typed correctly")
         print("✓ Bright red color for incorrect typing")
         print("✓ Intelligent color blending algorithm")
-        print("✓ Separate tag management for normal/washed modes")
+        print("✓ Palette swap between normal/washed modes")
         return 0
     else:
         print("❌ Some tests failed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the headless practice session
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_TEXT = "def f():\n    return 1\n"
+
+
+def test_typing_marks_characters():
+    """Test that keystrokes mark characters correct or incorrect"""
+    from copywork.practice_session import CORRECT, INCORRECT, Change, PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    assert session.type_char("d") == Change(0, "1.0", CORRECT)
+    assert session.type_char("x") == Change(1, "1.1", INCORRECT)
+    assert session.cursor_index == "1.2"
+    assert session.correct_chars == 1 and session.incorrect_chars == 1
+    assert session.accuracy == 50
+    print("✓ Keystrokes produce change records")
+    return True
+
+
+def test_newlines_are_skipped():
+    """Test that the cursor steps over newlines without marking them"""
+    from copywork.practice_session import CORRECT, Change, PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    for char in "def f():":
+        session.type_char(char)
+    assert session.type_char("a") is None
+    assert session.cursor_index == "2.0"
+    assert session.type_char(" ") == Change(9, "2.0", CORRECT)
+    assert session.correct_chars == 9 and session.incorrect_chars == 0
+
+    session.move_to(len(SAMPLE_TEXT))
+    assert session.type_char("x") is None
+    print("✓ Newlines and the end of the text are skipped")
+    return True
+
+
+def test_backspace_across_lines():
+    """Test that backspace steps back over a line break"""
+    from copywork.practice_session import UNTYPED, Change, PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    assert session.backspace() is None
+
+    session.move_to_index("2.0")
+    assert session.backspace() == Change(8, "1.8", UNTYPED)
+    assert session.backspace() == Change(7, "1.7", UNTYPED)
+    assert session.line == 1
+    print("✓ Backspace returns to the end of the previous line")
+    return True
+
+
+def test_tk_index_conversion():
+    """Test converting Tk indices, including ones past a line's end"""
+    from copywork.practice_session import PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    assert session.offset_of("2.4") == 13
+    assert session.offset_of("1.99") == 8
+    assert session.offset_of("9.0") == len(SAMPLE_TEXT)
+
+    session.move_to_index("2.4")
+    assert session.cursor_index == "2.4"
+    assert session.type_char("r").offset == 13
+
+    session.set_text("abc")
+    assert session.cursor_index == "1.0"
+    assert session.correct_chars == 1
+    print("✓ Tk indices map to offsets")
+    return True
+
+
+def test_progress_states():
+    """Test the per-character states and the merged runs drawn from them"""
+    from copywork.practice_session import CORRECT, INCORRECT, UNTYPED, PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    for char in "defxf":
+        session.type_char(char)
+    session.backspace()
+    assert list(session.states[:6]) == [CORRECT] * 3 + [INCORRECT, UNTYPED, UNTYPED]
+    assert list(session.progress_runs(CORRECT)) == [(0, 3)]
+    assert list(session.progress_runs(INCORRECT)) == [(3, 4)]
+
+    session.mark(5, 100, CORRECT)
+    assert list(session.progress_runs(CORRECT)) == [(0, 3), (5, len(SAMPLE_TEXT))]
+    session.clear_progress()
+    assert not any(session.states) and len(session.states) == len(SAMPLE_TEXT)
+    print("✓ States record progress and merge into runs")
+    return True
+
+
+def test_snapshot_restore():
+    """Test a snapshot puts back the progress cleared in between (as a replay does)"""
+    from copywork.practice_session import CORRECT, PracticeSession
+
+    session = PracticeSession(SAMPLE_TEXT)
+    for char in "defx":
+        session.type_char(char)
+    session.mark(20, 30, CORRECT)
+    snapshot = session.snapshot()
+    before = (bytes(session.states), session.offset, session.line,
+              session.correct_chars, session.incorrect_chars)
+
+    session.clear_progress()
+    session.move_to(0)
+    session.type_char("d")
+    session.restore(snapshot)
+    assert (bytes(session.states), session.offset, session.line,
+            session.correct_chars, session.incorrect_chars) == before
+    print("✓ Snapshot restores states, cursor and counters")
+    return True
+
+
+def main():
+    """Run all practice session tests"""
+    print("Testing CoPywork Practice Session")
+    print("=" * 40)
+
+    tests = [
+        ("Typing", test_typing_marks_characters),
+        ("Newline Skipping", test_newlines_are_skipped),
+        ("Backspace", test_backspace_across_lines),
+        ("Tk Index Conversion", test_tk_index_conversion),
+        ("Progress States", test_progress_states),
+        ("Snapshot", test_snapshot_restore),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Practice session working correctly!")
+        return 0
+    else:
+        print("❌ Some practice session tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the v2 binary progress format and reading of v1 colors
+"""
+
+import sys
+import os
+import json
+import random
+import zipfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'data', 'dfir_Navigating Through The Fog.cw')
+
+
+def test_round_trip():
+    """Test random states survive a dump and load, compressed or not"""
+    from copywork.progress_format import COMPRESSION_NONE, dump_progress, load_progress
+
+    rng = random.Random(25)
+    text = "".join(rng.choice("ab \n") for _ in range(5000))
+    states = bytearray(rng.choice((0, 0, 1, 1, 1, 2)) for _ in range(len(text)))
+
+    assert load_progress(dump_progress(states, text), text) == states
+    assert load_progress(dump_progress(states, text, COMPRESSION_NONE), text) == states
+    assert load_progress(dump_progress(bytearray(3), "abc"), "abc") == bytearray(3)
+    assert load_progress(dump_progress(bytearray(), ""), "") == bytearray()
+
+    print("✓ States round-trip through the binary format")
+    return True
+
+
+def test_rejects_bad_data():
+    """Test damaged data and progress saved for another text are rejected"""
+    from copywork.progress_format import dump_progress, is_progress_data, load_progress
+
+    text = "def f():\n    return 1\n"
+    data = dump_progress(bytearray([1] * 5 + [2] * 3 + [0] * (len(text) - 8)), text)
+    assert is_progress_data(data)
+    assert not is_progress_data(b'{"correct": []}')
+
+    assert load_progress(data, text.replace("1", "2")) is None
+    assert load_progress(data, text + "x") is None
+    assert load_progress(data[:-3], text) is None
+    assert load_progress(b"CWPG", text) is None
+    assert load_progress(b"not progress at all" * 4, text) is None
+
+    print("✓ Damaged or mismatched progress rejected")
+    return True
+
+
+def test_v1_fixture_converts():
+    """Test a v1 colors.json fixture converts to v2 without losing progress"""
+    from copywork.line_index import LineIndex
+    from copywork.progress_format import (PROGRESS_TAGS, dump_progress, load_progress,
+                                          states_from_colors)
+
+    with zipfile.ZipFile(FIXTURE) as zip_file:
+        text = zip_file.read("content.txt").decode('utf-8')
+        colors = zip_file.read("colors.json")
+
+    lines = LineIndex(text)
+    states = states_from_colors(json.loads(colors), lines)
+    assert len(states) == len(text)
+
+    color_data = json.loads(colors)
+    for tag, state in PROGRESS_TAGS:
+        for start, end in color_data[tag]:
+            start, end = lines.offset_of(start), lines.offset_of(end)
+            assert set(states[start:end]) <= {state}
+
+    data = dump_progress(states, text)
+    assert load_progress(data, text) == states
+    assert len(data) < len(colors) / 4
+
+    print(f"✓ v1 progress converted ({len(colors)} bytes of JSON -> {len(data)} bytes)")
+    return True
+
+
+def main():
+    """Run all progress format tests"""
+    print("Testing CoPywork Progress Format")
+    print("=" * 40)
+
+    tests = [
+        ("Round Trip", test_round_trip),
+        ("Bad Data", test_rejects_bad_data),
+        ("v1 Fixture", test_v1_fixture_converts),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Progress format working correctly!")
+        return 0
+    else:
+        print("❌ Some progress format tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the tokenize-based Python engine
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+TRICKY_SOURCE = '''#!/usr/bin/env python3
+"""Module docstring"""
+import os.path as osp, sys
+from . import sibling
+from ..pkg.mod import (name, print as echo)
+
+
+@dataclass(frozen=True)
+class Point(Base):
+    r"""Raw docstring"""
+    x: int = 0x1F
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__()
+        self.print = print
+        value = f"{self.x!r:>{width}} {{literal}} {len(args) + 1}"
+        return b'bytes' if value is not None else rb"raw"
+
+def gen():
+    yield from range(3)
+    raise ValueError("bad") from None
+
+match command.split():
+    case [action, _]:
+        pass
+    case _:
+        result = a @ b @decorated
+'''
+
+BROKEN_SOURCE = '''def broken(:
+    s = 'unterminated
+    t = (1, 2]]
+    return s
+x = """never closed
+'''
+
+
+def _scopes(lexer, text):
+    """One scope per character, checking the tokens cover ``text`` in order"""
+    from copywork.syntax_highlighter import scope_for_token
+
+    scopes = []
+    for offset, token_type, value in lexer.get_tokens_unprocessed(text):
+        assert offset == len(scopes), f"gap or overlap at {offset}"
+        scopes.extend([scope_for_token(token_type)] * len(value))
+    assert len(scopes) == len(text)
+    return scopes
+
+
+def _differences(text):
+    """Offsets where the two engines disagree on the scope"""
+    from pygments.lexers import PythonLexer
+    from copywork.python_tokenize import TokenizeLexer
+
+    expected = _scopes(PythonLexer(), text)
+    actual = _scopes(TokenizeLexer(), text)
+    return [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+
+
+def test_sample_file_scopes():
+    """Test that the sample file gets the same scopes as with Pygments"""
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    assert _differences(text) == []
+    print(f"✓ {len(text)} characters scoped exactly like PythonLexer")
+    return True
+
+
+def test_tricky_constructs():
+    """Test docstrings, imports, decorators, f-strings and soft keywords"""
+    differences = _differences(TRICKY_SOURCE)
+    assert differences == [], repr(TRICKY_SOURCE[differences[0]:differences[0] + 20])
+    print("✓ Docstrings, imports, decorators, f-strings and match/case agree")
+    return True
+
+
+def test_broken_source():
+    """Test that code tokenize rejects is still covered without gaps"""
+    from copywork.python_tokenize import TokenizeLexer
+
+    scopes = _scopes(TokenizeLexer(), BROKEN_SOURCE)
+    assert scopes[BROKEN_SOURCE.index("'unterminated")] == "string"
+    assert scopes[BROKEN_SOURCE.index("return")] == "keyword"
+    assert scopes[BROKEN_SOURCE.index("never closed")] == "string"
+    print("✓ Unterminated strings and stray brackets are recovered from")
+    return True
+
+
+def test_incremental_relex():
+    """Test that relexing from checkpoints matches lexing from scratch"""
+    from copywork.python_tokenize import TokenizeLexer
+    from copywork.incremental import lex_document, relex
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    lexer = TokenizeLexer()
+    index = lex_document(lexer, text, str)
+    assert index.states[0] is not None
+
+    middle = text.index('\n', len(text) // 2) + 1
+    edits = [text[:middle] + 'x = """\n' + text[middle:],
+             text[:middle] + 'y = [\n' + text[middle:],
+             text[:middle] + '# comment\n' + text[middle:],
+             text]
+    for edited in edits:
+        index, start, end = relex(index, edited, lexer, str)
+        fresh = lex_document(lexer, edited, str)
+        assert list(index.starts) == list(fresh.starts)
+        assert [index.scopes[i] for i in index.scope_ids] == [fresh.scopes[i] for i in fresh.scope_ids]
+        assert start <= end
+    print("✓ Incremental re-lexing matches a full lex")
+    return True
+
+
+def test_engine_selection():
+    """Test that the Python engine is chosen through settings"""
+    from pygments.lexers import PythonLexer
+    from copywork.lexers import DEFAULT_PYTHON_ENGINE, get_lexer, set_python_engine
+    from copywork.python_tokenize import TokenizeLexer
+    from copywork.settings import Settings
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings_path = os.path.join(temp_dir, 'settings.json')
+        assert Settings(settings_path).get("python_engine") == DEFAULT_PYTHON_ENGINE
+
+        with open(settings_path, 'w', encoding='utf-8') as f:
+            json.dump({"python_engine": "pygments"}, f)
+        engine = Settings(settings_path).get("python_engine")
+
+    try:
+        assert set_python_engine(engine)
+        assert isinstance(get_lexer("python"), PythonLexer)
+        assert not set_python_engine("cobol")
+    finally:
+        set_python_engine(DEFAULT_PYTHON_ENGINE)
+    assert isinstance(get_lexer("python"), TokenizeLexer)
+    print("✓ python_engine setting switches between tokenize and Pygments")
+    return True
+
+
+def test_split_memo_is_bounded():
+    """Test the memo of split spellings stops growing at PARTS_CACHE_SIZE"""
+    from copywork.python_tokenize import PARTS_CACHE_SIZE, TokenizeLexer
+
+    lexer = TokenizeLexer()
+    text = "".join(f"name_{i} = {i}\n" for i in range(PARTS_CACHE_SIZE * 2))
+    reference = list(lexer.get_tokens_unprocessed(text))
+    assert len(lexer._parts) <= PARTS_CACHE_SIZE
+    assert list(lexer.get_tokens_unprocessed(text)) == reference
+    print(f"✓ Split memo bounded at {PARTS_CACHE_SIZE} spellings")
+    return True
+
+
+def main():
+    """Run all tokenize engine tests"""
+    print("Testing CoPywork Tokenize Engine")
+    print("=" * 40)
+
+    tests = [
+        ("Sample File Scopes", test_sample_file_scopes),
+        ("Tricky Constructs", test_tricky_constructs),
+        ("Broken Source", test_broken_source),
+        ("Incremental Relex", test_incremental_relex),
+        ("Engine Selection", test_engine_selection),
+        ("Bounded Memo", test_split_memo_is_bounded),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Tokenize engine working correctly!")
+        return 0
+    else:
+        print("❌ Some tokenize engine tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the range set used for lazy highlighting bookkeeping
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def test_add_remove_against_reference():
+    """Test add/remove/overlapping against a plain Python set of offsets"""
+    from copywork.range_set import RangeSet
+
+    rng = random.Random(7)
+    ranges = RangeSet()
+    reference = set()
+
+    for _ in range(500):
+        start = rng.randrange(200)
+        end = start + rng.randrange(1, 30)
+        if rng.random() < 0.6:
+            ranges.add(start, end)
+            reference.update(range(start, end))
+        else:
+            ranges.remove(start, end)
+            reference.difference_update(range(start, end))
+
+        covered = set()
+        previous_end = -1
+        for s, e in ranges:
+            assert s > previous_end, "ranges must stay merged and sorted"
+            covered.update(range(s, e))
+            previous_end = e
+        assert covered == reference
+
+        query_start = rng.randrange(200)
+        query_end = query_start + rng.randrange(1, 50)
+        inside = set()
+        for s, e in ranges.overlapping(query_start, query_end):
+            assert query_start <= s < e <= query_end
+            inside.update(range(s, e))
+        assert inside == set(range(query_start, query_end)) & reference
+
+    print("✓ RangeSet matches a reference set over 500 random operations")
+    return True
+
+
+def test_shift():
+    """Test shifting ranges after an insertion or deletion"""
+    from copywork.range_set import RangeSet
+
+    ranges = RangeSet()
+    ranges.add(0, 10)
+    ranges.add(20, 30)
+    ranges.shift(15, 5)
+    assert list(ranges) == [(0, 10), (25, 35)]
+    ranges.shift(15, -5)
+    assert list(ranges) == [(0, 10), (20, 30)]
+    print("✓ Ranges after the edit point move with the text")
+    return True
+
+
+def main():
+    """Run all range set tests"""
+    print("Testing CoPywork RangeSet")
+    print("=" * 40)
+
+    tests = [
+        ("Add/Remove", test_add_remove_against_reference),
+        ("Shift", test_shift),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 RangeSet working correctly!")
+        return 0
+    else:
+        print("❌ Some RangeSet tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
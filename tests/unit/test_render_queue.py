@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that practice changes are coalesced per frame
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def _draw(shown, change):
+    """Draw ``change`` the way the app does: untyped clears, typed adds a tag"""
+    from copywork.practice_session import UNTYPED
+
+    if change.state == UNTYPED:
+        shown[change.offset] = set()
+    else:
+        shown.setdefault(change.offset, set()).add(change.state)
+
+
+def test_typed_and_backspaced_in_one_frame():
+    """Test that only the changes after a character's last untyped change remain"""
+    from copywork.practice_session import CORRECT, INCORRECT, UNTYPED, Change
+    from copywork.render_queue import PendingChanges
+
+    pending = PendingChanges()
+    pending.add(Change(0, "1.0", INCORRECT))
+    pending.add(Change(1, "1.1", CORRECT))
+    pending.add(Change(1, "1.1", UNTYPED))
+    pending.add(Change(0, "1.0", UNTYPED))
+    pending.add(Change(0, "1.0", CORRECT))
+    assert len(pending) == 2
+
+    assert [(c.offset, c.state) for c in pending.drain()] == [
+        (0, UNTYPED), (0, CORRECT), (1, UNTYPED)]
+    assert len(pending) == 0 and list(pending.drain()) == []
+    print("✓ A burst leaves at most the final changes of each character")
+    return True
+
+
+def test_same_result_as_drawing_every_change():
+    """Test that drawing once per frame ends where drawing every keystroke does"""
+    from copywork.practice_session import PracticeSession
+    from copywork.render_queue import PendingChanges
+
+    text = "def main():\n    print('hello')\n" * 20
+    rng = random.Random(0)
+    session = PracticeSession(text)
+    pending = PendingChanges()
+    every, framed = {}, {}
+    drawn = 0
+    for _ in range(3000):
+        if rng.random() < 0.3:
+            change = session.backspace()
+        else:
+            char = text[session.offset:session.offset + 1]
+            change = session.type_char(char if rng.random() < 0.8 else "#")
+        if change is None:
+            continue
+        _draw(every, change)
+        pending.add(change)
+        if rng.random() < 0.1:
+            for queued in pending.drain():
+                _draw(framed, queued)
+                drawn += 1
+    for queued in pending.drain():
+        _draw(framed, queued)
+        drawn += 1
+
+    assert {o: s for o, s in every.items() if s} == {o: s for o, s in framed.items() if s}
+    assert drawn < 3000 * 0.7
+    print(f"✓ Same final colors with {drawn} draws")
+    return True
+
+
+def main():
+    """Run all render queue tests"""
+    print("Testing CoPywork Render Queue")
+    print("=" * 40)
+
+    tests = [
+        ("Typed and Backspaced", test_typed_and_backspaced_in_one_frame),
+        ("Same Result", test_same_result_as_drawing_every_change),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Render queue working correctly!")
+        return 0
+    else:
+        print("❌ Some render queue tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
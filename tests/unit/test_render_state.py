@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the per-character render state of typed overlays
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def test_set_returns_previous_overlay():
+    """Test that recording an overlay reports the one it replaces"""
+    from copywork.render_state import RenderState
+
+    state = RenderState()
+    assert not state
+    assert state.tag_at(5) is None
+
+    assert state.set(5, "syntax_keyword_typed") is None
+    assert state.set(5, "syntax_keyword_typed") == "syntax_keyword_typed"
+    assert state.set(5, "syntax_string_typed") == "syntax_keyword_typed"
+    assert state.tag_at(5) == "syntax_string_typed"
+    assert state.tag_at(4) is None
+    assert state.count == 1
+    print("✓ Each character carries at most one overlay")
+    return True
+
+
+def test_clear_and_reset():
+    """Test that clearing forgets exactly the overlay that was recorded"""
+    from copywork.render_state import RenderState
+
+    state = RenderState()
+    state.set(0, "syntax_keyword_typed")
+    state.set(1, "default_text_typed")
+
+    assert state.clear(0) == "syntax_keyword_typed"
+    assert state.clear(0) is None
+    assert state.clear(100) is None
+    assert state.count == 1
+
+    state.reset()
+    assert not state
+    assert state.tag_at(1) is None
+    print("✓ Clearing returns the single tag to remove")
+    return True
+
+
+def test_fill_ranges():
+    """Test rebuilding the state from tag ranges"""
+    from copywork.render_state import RenderState
+
+    state = RenderState()
+    state.fill(2, 6, "syntax_keyword_typed")
+    state.fill(4, 8, "syntax_string_typed")
+    state.fill(9, 9, "syntax_string_typed")
+
+    assert [state.tag_at(i) for i in range(10)] == (
+        [None, None] + ["syntax_keyword_typed"] * 2 + ["syntax_string_typed"] * 4 + [None, None])
+    assert state.count == 6
+    print("✓ Ranges fill the state with their overlay")
+    return True
+
+
+def main():
+    """Run all render state tests"""
+    print("Testing CoPywork Render State")
+    print("=" * 40)
+
+    tests = [
+        ("Overlay Swap", test_set_returns_previous_overlay),
+        ("Clear and Reset", test_clear_and_reset),
+        ("Fill Ranges", test_fill_ranges),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Render state working correctly!")
+        return 0
+    else:
+        print("❌ Some render state tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
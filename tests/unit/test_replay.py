@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script to verify replaying logged practice sessions
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+SECOND = 1_000_000_000
+
+
+def _practice(text, keystrokes, seed=0):
+    """Type ``keystrokes`` keys on ``text`` with some mistakes and backspaces"""
+    from copywork.practice_session import PracticeSession
+
+    rng = random.Random(seed)
+    session = PracticeSession(text)
+    now = 0
+    for _ in range(keystrokes):
+        now += rng.randrange(50, 400) * 1_000_000
+        r = rng.random()
+        if r < 0.05:
+            session.backspace(now_ns=now)
+        elif r < 0.12:
+            session.type_char("#", now_ns=now)
+        else:
+            expected = text[session.offset:session.offset + 1]
+            session.type_char(expected or "x", now_ns=now)
+    return session
+
+
+def test_replay_matches_session():
+    """Test that replaying the log reproduces progress and figures"""
+    from copywork.practice_session import CORRECT, INCORRECT
+    from copywork.replay import SessionReplay
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    session = _practice(text, 2000)
+
+    replay = SessionReplay(text, session.log)
+    final = replay.final
+    assert final.events == 2000
+    assert final.offset == session.offset
+    assert (final.correct, final.incorrect) == (session.correct_chars, session.incorrect_chars)
+    assert final.accuracy == session.accuracy
+
+    # Replaying change by change ends in the same place
+    state = replay.state_after(0)
+    marks = {}
+    while state.events < len(replay):
+        change = replay.apply(state)
+        if change is not None:
+            marks[change.offset] = change.state
+    assert state.states == final.states
+    assert {o for o, s in marks.items() if s == CORRECT} == {
+        o for o, s in enumerate(final.states) if s == CORRECT}
+    assert INCORRECT in final.states
+    print(f"✓ {len(replay)} keystrokes replayed to the same progress")
+    return True
+
+
+def test_seek_uses_keyframes():
+    """Test that seeking from keyframes matches replaying from the start"""
+    from copywork.replay import SessionReplay
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    session = _practice(text, 1500, seed=1)
+
+    replay = SessionReplay(text, session.log, interval=100)
+    full = SessionReplay(text, session.log, interval=len(session.log))
+    assert len(replay.keyframes) == 15
+
+    rng = random.Random(2)
+    for _ in range(50):
+        time_ns = rng.randrange(-SECOND, replay.duration_ns + SECOND)
+        a, b = replay.state_at(time_ns), full.state_at(time_ns)
+        assert (a.events, a.offset, a.correct, a.incorrect, a.active_ns, a.states) == \
+            (b.events, b.offset, b.correct, b.incorrect, b.active_ns, b.states)
+        assert a.events == 0 or session.log.times[a.events - 1] <= time_ns
+    print("✓ Seeking from keyframes matches a full replay")
+    return True
+
+
+def test_idle_time_and_mismatch():
+    """Test that idle pauses do not count and foreign logs are rejected"""
+    from copywork.practice_session import PracticeSession
+    from copywork.replay import SessionReplay
+
+    session = PracticeSession("hello world")
+    for i, char in enumerate("hello"):
+        session.type_char(char, now_ns=i * SECOND // 5)
+    for i, char in enumerate(" worl"):
+        session.type_char(char, now_ns=60 * SECOND + i * SECOND // 5)
+
+    state = SessionReplay(session.text, session.log).final
+    assert state.active_ns == 8 * SECOND // 5
+    assert round(state.wpm) == round(10 / 5 / (1.6 / 60))
+
+    try:
+        SessionReplay("jello world", session.log)
+        assert False, "log typed on another text was accepted"
+    except ValueError:
+        pass
+    print("✓ Idle pauses are skipped and mismatched logs rejected")
+    return True
+
+
+def main():
+    """Run all replay tests"""
+    print("Testing CoPywork Session Replay")
+    print("=" * 40)
+
+    tests = [
+        ("Replay Matches Session", test_replay_matches_session),
+        ("Keyframe Seeking", test_seek_uses_keyframes),
+        ("Idle Time and Mismatch", test_idle_time_and_mismatch),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Session replay working correctly!")
+        return 0
+    else:
+        print("❌ Some session replay tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
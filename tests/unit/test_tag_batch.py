@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script to verify batched tag operations
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+
+class _RecordingWidget:
+    """Stand-in for tk.Text that records every Tcl round-trip"""
+
+    def __init__(self):
+        self.calls = []
+        self.tk = self
+
+    def __str__(self):
+        return ".text"
+
+    def tag_add(self, tag, *indices):
+        self.calls.append(("tag_add", tag) + indices)
+
+    def call(self, *args):
+        self.calls.append(args)
+
+
+def test_adjacent_ranges_merge():
+    """Test that touching ranges of one tag collapse into a single pair"""
+    from copywork.tag_batch import TagBatch
+
+    batch = TagBatch()
+    batch.add("syntax_keyword", 0, 3)
+    batch.add("syntax_string", 3, 8)
+    batch.add("syntax_keyword", 8, 10)
+    batch.add("syntax_keyword", 10, 12)
+    batch.add("syntax_keyword", 20, 22)
+
+    assert batch.ranges("syntax_keyword") == [(0, 3), (8, 12), (20, 22)]
+    assert batch.ranges("syntax_string") == [(3, 8)]
+    print("✓ Adjacent same-tag ranges are merged")
+    return True
+
+
+def test_one_call_per_tag():
+    """Test that flushing sends every range of a tag in one tag_add"""
+    from copywork.tag_batch import TagBatch
+
+    widget = _RecordingWidget()
+    batch = TagBatch()
+    for start in range(0, 100, 10):
+        batch.add("syntax_keyword", start, start + 2)
+        batch.add("syntax_string", start + 5, start + 7)
+
+    calls = batch.flush(widget, lambda offset: f"1.{offset}")
+    assert calls == 2
+    assert len(widget.calls) == 2
+    keyword_call = widget.calls[0]
+    assert keyword_call[:4] == ("tag_add", "syntax_keyword", "1.0", "1.2")
+    assert len(keyword_call) == 2 + 2 * 10
+    assert not batch
+    print("✓ 20 ranges flushed in 2 Tk calls")
+    return True
+
+
+def test_remove_tags_single_call():
+    """Test that clearing many tags is one Tcl call"""
+    from copywork.tag_batch import remove_tags
+
+    widget = _RecordingWidget()
+    remove_tags(widget, ["syntax_a", "syntax_b", "syntax_c"], "2.0", "5.0")
+    assert len(widget.calls) == 1
+    assert widget.calls[0][0] == "apply"
+
+    remove_tags(widget, [])
+    assert len(widget.calls) == 1
+    print("✓ Three tags removed in one Tcl call")
+    return True
+
+
+def test_remove_tags_in_tcl():
+    """Test the Tcl script removes each tag and leaves no global variable behind"""
+    import tkinter
+    from copywork.tag_batch import remove_tags
+
+    interp = tkinter.Tcl()
+    # A stand-in widget command that records its arguments
+    interp.eval("proc .text {args} {lappend ::removed $args}")
+
+    class _TclWidget:
+        tk = interp
+
+        def __str__(self):
+            return ".text"
+
+    remove_tags(_TclWidget(), ["syntax_a", "syntax b"], "2.0", "end")
+    removed = [interp.splitlist(call) for call in interp.splitlist(interp.getvar("removed"))]
+    assert removed == [("tag", "remove", "syntax_a", "2.0", "end"),
+                       ("tag", "remove", "syntax b", "2.0", "end")], removed
+    assert interp.eval("info exists ::tag") == "0"
+    print("✓ Tags removed in Tcl without leaking a global variable")
+    return True
+
+
+def test_document_call_count():
+    """Test that tagging a lexed file needs one call per scope, not per token"""
+    from pygments.lexers import PythonLexer
+    from copywork.incremental import lex_document
+    from copywork.tag_batch import TagBatch
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    index = lex_document(PythonLexer(), text, lambda token_type: str(token_type))
+    widget = _RecordingWidget()
+    batch = TagBatch()
+    for start, end, scope in index.spans():
+        batch.add(scope, start, end)
+
+    calls = batch.flush(widget, index.position_of)
+    assert calls == len(set(index.scopes[i] for i in index.scope_ids))
+    assert calls < len(index)
+    print(f"✓ {len(index)} tokens tagged in {calls} Tk calls")
+    return True
+
+
+def main():
+    """Run all tag batch tests"""
+    print("Testing CoPywork Tag Batching")
+    print("=" * 40)
+
+    tests = [
+        ("Range Merging", test_adjacent_ranges_merge),
+        ("Batched tag_add", test_one_call_per_tag),
+        ("Batched tag_remove", test_remove_tags_single_call),
+        ("tag_remove In Tcl", test_remove_tags_in_tcl),
+        ("Document Call Count", test_document_call_count),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Tag batching working correctly!")
+        return 0
+    else:
+        print("❌ Some tag batching tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
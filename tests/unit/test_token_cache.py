@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script to verify token tables persisted in .cw archives
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), 'test_python.py')
+
+
+def _sample_index():
+    """Lex the sample file the way the highlighter does"""
+    from copywork.incremental import lex_document
+    from copywork.lexers import get_lexer
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    lexer = get_lexer("python")
+    return lexer, lex_document(lexer, text, lambda token_type: str(token_type))
+
+
+def test_round_trip():
+    """Test that a saved table rebuilds an identical index"""
+    from copywork.token_cache import dump_token_index, lexer_key, load_token_index
+
+    lexer, index = _sample_index()
+    key = lexer_key("python", lexer)
+    data = dump_token_index(index, key)
+    loaded = load_token_index(data, index.text, key)
+
+    assert loaded is not None
+    assert list(loaded.starts) == list(index.starts)
+    assert [loaded.scopes[i] for i in loaded.scope_ids] == \
+        [index.scopes[i] for i in index.scope_ids]
+    assert loaded.states == index.states
+    print(f"✓ {len(index)} tokens round-tripped in {len(data)} bytes")
+    return True
+
+
+def test_stale_tables_are_rejected():
+    """Test that changed text, another lexer or damaged data fall back to lexing"""
+    from copywork.token_cache import dump_token_index, lexer_key, load_token_index
+    from copywork.lexers import get_lexer
+
+    lexer, index = _sample_index()
+    key = lexer_key("python", lexer)
+    data = dump_token_index(index, key)
+
+    assert load_token_index(data, index.text + "x", key) is None
+    assert load_token_index(data, index.text, lexer_key("go", get_lexer("go"))) is None
+    assert load_token_index(data[:len(data) // 2], index.text, key) is None
+    assert load_token_index(b"not a token table", index.text, key) is None
+
+    # Tables from another interpreter are not trusted either
+    python_version = "py%d.%d" % sys.version_info[:2]
+    assert key.endswith(python_version)
+    other_key = key[:-len(python_version)] + "py2.7"
+    assert load_token_index(dump_token_index(index, other_key), index.text, key) is None
+    print("✓ Mismatched or damaged tables are ignored")
+    return True
+
+
+def test_loaded_index_relexes():
+    """Test that checkpoints survive, so edits after loading stay incremental"""
+    from copywork.incremental import lex_document, relex
+    from copywork.token_cache import dump_token_index, lexer_key, load_token_index
+
+    lexer, index = _sample_index()
+    key = lexer_key("python", lexer)
+    loaded = load_token_index(dump_token_index(index, key), index.text, key)
+
+    position = len(index.text) // 2
+    text = index.text[:position] + "\n'''" + index.text[position:]
+    scope_for = lambda token_type: str(token_type)
+    updated, _, _ = relex(loaded, text, lexer, scope_for)
+    reference = lex_document(lexer, text, scope_for)
+
+    assert list(updated.starts) == list(reference.starts)
+    assert [updated.scopes[i] for i in updated.scope_ids] == \
+        [reference.scopes[i] for i in reference.scope_ids]
+    print("✓ Loaded index re-lexes incrementally")
+    return True
+
+
+def main():
+    """Run all token cache tests"""
+    print("Testing CoPywork Token Cache")
+    print("=" * 40)
+
+    tests = [
+        ("Round Trip", test_round_trip),
+        ("Stale Tables", test_stale_tables_are_rejected),
+        ("Incremental After Load", test_loaded_index_relexes),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Token cache working correctly!")
+        return 0
+    else:
+        print("❌ Some token cache tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the token span index used for per-keystroke lookups
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SAMPLE_CODE = '''
+
+import os
+
+def hello(name: str = "World") -> str:
+    """Greet someone"""
+    # A comment
+    return f"Hello, {name}!" + str(42)
+'''
+
+
+def _scope_for(token_type):
+    """Scope function matching SyntaxHighlighter._get_scope_for_token for a few types"""
+    from pygments.token import Token
+    for parent_type in token_type.split():
+        if parent_type is Token.Keyword:
+            return "keyword"
+        if parent_type is Token.Literal.String:
+            return "string"
+        if parent_type is Token.Comment:
+            return "comment"
+    return None
+
+
+def test_scope_lookup_matches_linear_walk():
+    """Test that bisection returns the same scope as walking the token stream"""
+    from pygments.lexers import PythonLexer
+    from copywork.token_index import TokenIndex
+
+    lexer = PythonLexer()
+    tokens = list(lexer.get_tokens_unprocessed(SAMPLE_CODE))
+    index = TokenIndex.from_tokens(SAMPLE_CODE, tokens, _scope_for)
+
+    expected = [None] * len(SAMPLE_CODE)
+    for offset, token_type, value in tokens:
+        for i in range(offset, offset + len(value)):
+            expected[i] = _scope_for(token_type)
+
+    for offset in range(len(SAMPLE_CODE)):
+        assert index.scope_at(offset) == expected[offset], offset
+
+    assert index.scope_at(-1) is None
+    assert index.scope_at(len(SAMPLE_CODE)) is None
+    print(f"✓ {len(SAMPLE_CODE)} offsets resolved through {len(index)} tokens")
+    return True
+
+
+def test_position_conversion():
+    """Test conversion between Tk "line.col" indices and offsets"""
+    from copywork.token_index import TokenIndex
+
+    index = TokenIndex(SAMPLE_CODE)
+    for offset in range(len(SAMPLE_CODE)):
+        position = index.position_of(offset)
+        assert index.offset_of(position) == offset, position
+
+    # Leading blank lines must not shift the first real token
+    assert index.offset_of("3.0") == SAMPLE_CODE.index("import")
+    assert index.position_of(SAMPLE_CODE.index("def")) == "5.0"
+    print("✓ Position conversion round-trips for every offset")
+    return True
+
+
+def main():
+    """Run all token index tests"""
+    print("Testing CoPywork Token Index")
+    print("=" * 40)
+
+    tests = [
+        ("Scope Lookup", test_scope_lookup_matches_linear_walk),
+        ("Position Conversion", test_position_conversion),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Token index working correctly!")
+        return 0
+    else:
+        print("❌ Some token index tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
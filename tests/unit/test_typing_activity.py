@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script to verify active typing time measured from keystrokes
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SECOND = 1_000_000_000
+
+
+def test_bursts_and_idle_gaps():
+    """Test that only gaps shorter than the idle timeout are typing time"""
+    from copywork.typing_activity import IDLE_TIMEOUT_NS, TypingActivity
+
+    activity = TypingActivity()
+    assert activity.is_idle(0)
+    assert activity.wpm == 0.0
+
+    assert activity.keystroke(10 * SECOND, correct=True)
+    assert not activity.keystroke(11 * SECOND, correct=True)
+    assert not activity.keystroke(12 * SECOND)
+    assert not activity.is_idle(12 * SECOND + IDLE_TIMEOUT_NS - 1)
+    assert activity.is_idle(12 * SECOND + IDLE_TIMEOUT_NS)
+
+    # A long pause starts a new burst and adds no time
+    assert activity.keystroke(100 * SECOND, correct=True)
+    assert not activity.keystroke(100 * SECOND + SECOND // 2, correct=True)
+    assert activity.active_ns == 2 * SECOND + SECOND // 2
+    assert activity.correct == 4
+    assert abs(activity.wpm - 4 / 5 / (2.5 / 60)) < 1e-9
+
+    # A newly opened text starts from nothing
+    activity.reset()
+    assert activity.active_ns == 0 and activity.correct == 0 and activity.is_idle(101 * SECOND)
+    print("✓ Typing time is the sum of the short gaps")
+    return True
+
+
+def test_matches_replay():
+    """Test that the live figures agree with a replay of the same keystrokes"""
+    from copywork.practice_session import CORRECT, PracticeSession
+    from copywork.replay import SessionReplay
+    from copywork.typing_activity import TypingActivity
+
+    text = "def f():\n    return 1\n"
+    session = PracticeSession(text)
+    activity = TypingActivity()
+    now = 0
+    for i, char in enumerate(text.replace("1", "2")):
+        now += (7 * SECOND) if i == 10 else (i % 4 + 1) * SECOND // 10
+        change = session.type_char(char, now_ns=now)
+        activity.keystroke(now, change is not None and change.state == CORRECT)
+
+    state = SessionReplay(text, session.log).final
+    assert state.active_ns == activity.active_ns
+    assert state.correct == activity.correct
+    assert state.wpm == activity.wpm
+    print("✓ Live and replayed session averages agree")
+    return True
+
+
+def main():
+    """Run all typing activity tests"""
+    print("Testing CoPywork Typing Activity")
+    print("=" * 40)
+
+    tests = [
+        ("Bursts and Idle Gaps", test_bursts_and_idle_gaps),
+        ("Matches Replay", test_matches_replay),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Typing activity working correctly!")
+        return 0
+    else:
+        print("❌ Some typing activity tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script to verify inter-key latency and bigram statistics
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+MS = 1_000_000
+
+
+def test_latency_quantiles():
+    """Test that histogram quantiles land within a bucket of the exact ones"""
+    from copywork.typing_stats import LatencyHistogram, LATENCY_BUCKETS
+
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) is None
+
+    rng = random.Random(0)
+    latencies = sorted(int(rng.lognormvariate(5, 0.6) * MS) for _ in range(5000))
+    for latency in latencies:
+        histogram.add(latency)
+    assert len(histogram) == 5000 and len(histogram.counts) == LATENCY_BUCKETS
+
+    for q in (0.5, 0.95):
+        exact = latencies[int(q * len(latencies)) - 1]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.2, q
+
+    # Out-of-range latencies fall into the end buckets
+    histogram.add(0)
+    histogram.add(60_000 * MS)
+    assert histogram.counts[0] >= 1 and histogram.counts[-1] >= 1
+    print("✓ Median and p95 come from fixed buckets")
+    return True
+
+
+def test_bigrams_and_errors():
+    """Test bigram timing, error-prone transitions and chain breaks"""
+    from copywork.keystroke_log import BACKSPACE
+    from copywork.typing_stats import TypingStats
+
+    stats = TypingStats()
+    now = 0
+    for _ in range(4):
+        for expected, typed, gap in (("t", "t", 100), ("h", "h", 300), ("e", "r", 80),
+                                     ("e", BACKSPACE, 90), ("e", "e", 200), (" ", " ", 100)):
+            now += gap * MS
+            stats.record(now, expected, typed, typed not in (expected, BACKSPACE))
+
+    slowest = stats.slowest_bigrams(2)
+    assert slowest[0].bigram == "th" and slowest[0].mean_ns == 300 * MS
+    assert slowest[0].count == 4
+
+    prone = stats.error_prone_bigrams()
+    assert [stat.bigram for stat in prone] == ["he"]
+    assert prone[0].error_rate == 1.0
+
+    # The retyped "e" follows a backspace, so it starts no bigram
+    assert all(stat.bigram != "ee" for stat in stats.slowest_bigrams(50))
+    assert stats.slowest_chars(1)[0][0] == "h"
+    print("✓ Slow and error-prone bigrams are ranked")
+    return True
+
+
+def test_session_stats_bounded():
+    """Test that the session keeps its stats in fixed tables and rebuilds them from a log"""
+    from copywork.practice_session import PracticeSession
+    from copywork.typing_stats import CHAR_SLOTS
+
+    text = "for i in range(10):\n    print(i)\n" * 200
+    session = PracticeSession(text)
+    rng = random.Random(1)
+    now = 0
+    while session.offset < len(text):
+        now += rng.randrange(40, 400) * MS
+        char = text[session.offset]
+        session.type_char("#" if rng.random() < 0.05 else char, now_ns=now)
+    stats = session.stats
+    assert len(stats.bigram_counts) == CHAR_SLOTS * CHAR_SLOTS
+    assert len(stats.latency) == len(session.log) - 1
+
+    reloaded = PracticeSession(text)
+    reloaded.set_log(session.log)
+    assert reloaded.stats.latency.counts == stats.latency.counts
+    assert reloaded.stats.bigram_errors == stats.bigram_errors
+    print("✓ Statistics stay bounded and match the keystroke log")
+    return True
+
+
+def main():
+    """Run all typing statistics tests"""
+    print("Testing CoPywork Typing Statistics")
+    print("=" * 40)
+
+    tests = [
+        ("Latency Quantiles", test_latency_quantiles),
+        ("Bigrams and Errors", test_bigrams_and_errors),
+        ("Session Stats", test_session_stats_bounded),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Typing statistics working correctly!")
+        return 0
+    else:
+        print("❌ Some typing statistics tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script to verify sliding-window WPM
+"""
+
+import sys
+import os
+import random
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+SECOND = 1_000_000_000
+
+
+def test_window_slides():
+    """Test that events leave the window once it has slid past them"""
+    from copywork.wpm_window import SlidingWindow
+
+    window = SlidingWindow(10 * SECOND, slots=10)
+    for i in range(10):
+        window.add(i * SECOND)
+    assert window.per_minute(9 * SECOND) == 60
+    assert window.per_minute(10 * SECOND) == 54
+    assert window.per_minute(15 * SECOND) == 24
+    assert window.per_minute(19 * SECOND) == 0
+    window.add(100 * SECOND, count=3)
+    assert window.total == 3
+    print("✓ Counts slide out one bucket at a time")
+    return True
+
+
+def test_window_matches_brute_force():
+    """Test the ring against counting timestamps directly"""
+    from copywork.wpm_window import SlidingWindow
+
+    rng = random.Random(0)
+    window = SlidingWindow(SECOND, slots=20)
+    slot_ns = window.slot_ns
+    times = []
+    now = 0
+    for _ in range(3000):
+        now += rng.choice((10, 60, 150, 900, 3000)) * 1_000_000
+        window.add(now)
+        times.append(now)
+        # The window holds the current bucket and the 19 before it
+        first = (now // slot_ns - 19) * slot_ns
+        assert window.total == sum(1 for t in times if t >= first)
+    print("✓ Running total matches a brute-force count")
+    return True
+
+
+def test_meter_windows_and_max():
+    """Test the meter's figures, its maximum and invalid windows"""
+    from copywork.wpm_window import WpmMeter
+
+    meter = WpmMeter((60, 1, 10))
+    assert meter.seconds == [1, 10, 60]
+    # 10 characters per second is 120 WPM
+    for i in range(200):
+        meter.record(now_ns=i * SECOND // 10)
+    now = 199 * SECOND // 10
+    one, ten, sixty = meter.wpm(now)
+    assert 100 <= one <= 130 and 115 <= ten <= 125 and sixty == 200 / 5
+    assert meter.max_wpm == max(meter.max_wpm, ten)
+
+    # Idle time empties the windows but keeps the maximum
+    assert meter.wpm(now + 61 * SECOND) == [0, 0, 0]
+    meter.reset()
+    assert meter.wpm(now) == [0, 0, 0] and meter.max_wpm >= 115
+
+    for windows in ([], [0, 10], "10", None):
+        try:
+            WpmMeter(windows)
+            assert False, f"{windows!r} was accepted"
+        except ValueError:
+            pass
+    print("✓ Each window reports its own rate")
+    return True
+
+
+def main():
+    """Run all sliding-window WPM tests"""
+    print("Testing CoPywork Sliding-Window WPM")
+    print("=" * 40)
+
+    tests = [
+        ("Window Slides", test_window_slides),
+        ("Brute-Force Count", test_window_matches_brute_force),
+        ("Meter Windows and Max", test_meter_windows_and_max),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        print(f"\nTesting {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"✗ {test_name} failed: {e}")
+
+    print(f"\n{'='*40}")
+    print(f"Tests passed: {passed}/{total}")
+
+    if passed == total:
+        print("🎉 Sliding-window WPM working correctly!")
+        return 0
+    else:
+        print("❌ Some sliding-window WPM tests failed!")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())